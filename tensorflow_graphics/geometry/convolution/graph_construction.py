@@ -0,0 +1,432 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module implements ops building neighborhood graphs of point clouds.
+
+The graphs are returned as row-normalized `SparseTensor`s, which can be used as
+the `neighbors` input of the ops in `graph_convolution`.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import itertools
+
+import tensorflow as tf
+
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import shape
+
+
+def _check_valid_points(points, sizes):
+  """Checks that the inputs are valid for graph construction ops.
+
+  Args:
+    points: A `float` tensor with shape `[A1, ..., An, V, D]`.
+    sizes: An `int` tensor of shape `[A1, ..., An]`. Optional, can be `None`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  if not points.dtype.is_floating:
+    raise TypeError("'points' must have a float type.")
+  if sizes is not None and not sizes.dtype.is_integer:
+    raise TypeError("'sizes' must have an integer type.")
+
+  shape.check_static(
+      tensor=points, tensor_name="points", has_rank_greater_than=1)
+  if sizes is not None and points.shape.ndims > 2:
+    shape.check_static(
+        tensor=sizes, tensor_name="sizes", has_rank=points.shape.ndims - 2)
+    shape.compare_batch_dimensions(
+        tensors=(points, sizes),
+        tensor_names=("points", "sizes"),
+        last_axes=(-3, -1),
+        broadcast_compatible=False)
+
+
+def _flatten_points(points, sizes):
+  """Flattens the batch dimensions of `points`.
+
+  Args:
+    points: A `float` tensor with shape `[A1, ..., An, V, D]`.
+    sizes: An `int` tensor of shape `[A1, ..., An]`, or `None`.
+
+  Returns:
+    points: A `float` tensor with shape `[B, V, D]`, where `B = A1 * ... * An`.
+    valid: A `bool` tensor with shape `[B, V]`, which is `False` for the padded
+      vertices.
+    batch_shape: An `int64` tensor containing `[A1, ..., An]`.
+  """
+  points_shape = tf.shape(input=points, out_type=tf.int64)
+  batch_shape = points_shape[:-2]
+  num_vertices = points_shape[-2]
+  points = tf.reshape(
+      points, tf.concat(((-1,), points_shape[-2:]), axis=0))
+  if sizes is None or points_shape.shape[0] == 2:
+    valid = tf.ones(tf.shape(input=points)[:2], dtype=tf.bool)
+  else:
+    valid = tf.sequence_mask(
+        tf.reshape(tf.cast(sizes, tf.int64), (-1,)), num_vertices)
+  return points, valid, batch_shape
+
+
+def _blocked_edges(points, valid, block_size, edge_function):
+  """Finds the edges of a batch of graphs for blocks of query vertices.
+
+  The vertices are split in blocks of `block_size` consecutive vertices, and
+  the edges starting at each block are found one block after the other, such
+  that the memory used scales with `block_size * V` instead of `V * V`.
+
+  Args:
+    points: A `float` tensor with shape `[B, V, D]`.
+    valid: A `bool` tensor with shape `[B, V]`.
+    block_size: An `int`, the number of query vertices in each block.
+    edge_function: A callable taking the squared distances with shape
+      `[B, N, V]` between the `N` vertices of a block and all the vertices, the
+      `int64` indices with shape `[N]` of the block vertices, and returning an
+      `int64` tensor with shape `[M, 3]` containing the batch index, the row and
+      the column of the edges starting at the block vertices.
+
+  Returns:
+    An `int64` tensor with shape `[E, 3]` containing the edges of all blocks.
+  """
+  num_vertices = tf.shape(input=points, out_type=tf.int64)[1]
+  num_blocks = tf.cast((num_vertices + block_size - 1) // block_size, tf.int32)
+  squared_norms = tf.reduce_sum(input_tensor=points * points, axis=-1)
+
+  def _block_edges(index, edges):
+    """Finds the edges starting at the block `index`."""
+    start = tf.cast(index, tf.int64) * block_size
+    stop = tf.minimum(start + block_size, num_vertices)
+    block_points = points[:, start:stop]
+    # `|p - q|^2 = |p|^2 - 2 p.q + |q|^2`, computed without broadcasting the
+    # coordinate differences over all pairs.
+    squared_distances = (
+        tf.expand_dims(squared_norms[:, start:stop], axis=-1) -
+        2.0 * tf.matmul(block_points, points, transpose_b=True) +
+        tf.expand_dims(squared_norms, axis=-2))
+    is_valid = tf.logical_and(
+        tf.expand_dims(valid[:, start:stop], axis=-1),
+        tf.expand_dims(valid, axis=-2))
+    squared_distances = tf.compat.v1.where(
+        is_valid, tf.maximum(squared_distances, 0.0),
+        tf.fill(tf.shape(input=squared_distances),
+                tf.constant(float("inf"), dtype=points.dtype)))
+    block_edges = edge_function(squared_distances, tf.range(start, stop))
+    return index + 1, edges.write(index, block_edges)
+
+  edges = tf.TensorArray(
+      dtype=tf.int64, size=num_blocks, infer_shape=False,
+      element_shape=tf.TensorShape((None, 3)))
+  # Blocks are processed sequentially to bound the memory usage.
+  _, edges = tf.while_loop(
+      cond=lambda index, _: index < num_blocks,
+      body=_block_edges,
+      loop_vars=(tf.constant(0), edges),
+      parallel_iterations=1)
+  return tf.reshape(edges.concat(), (-1, 3))
+
+
+def _neighbors_from_edges(edges, batch_shape, num_vertices, dtype):
+  """Builds row-normalized neighborhoods from a list of edges.
+
+  Args:
+    edges: An `int64` tensor with shape `[E, 3]` containing the batch index, the
+      row and the column of each edge, in any order.
+    batch_shape: An `int64` tensor containing `[A1, ..., An]`.
+    num_vertices: An `int64` scalar tensor, the number of vertices `V`.
+    dtype: The type of the output.
+
+  Returns:
+    A `SparseTensor` with shape `[A1, ..., An, V, V]` and entries in canonical
+    row-major order, with value `1 / degree(v_i)` for each edge `(v_i, v_j)`.
+  """
+  batch_ids, rows, cols = tf.unstack(edges, axis=-1)
+  row_keys = batch_ids * num_vertices + rows
+  order = tf.argsort(row_keys * num_vertices + cols)
+  batch_ids = tf.gather(batch_ids, order)
+  rows = tf.gather(rows, order)
+  cols = tf.gather(cols, order)
+  row_keys = tf.gather(row_keys, order)
+  batch_size = tf.reduce_prod(input_tensor=batch_shape)
+  degree = tf.math.unsorted_segment_sum(
+      data=tf.ones_like(row_keys),
+      segment_ids=row_keys,
+      num_segments=batch_size * num_vertices)
+  values = 1.0 / tf.cast(tf.gather(degree, row_keys), dtype)
+  batch_indices = tf.transpose(
+      a=tf.unravel_index(batch_ids, tf.maximum(batch_shape, 1)))
+  batch_indices = batch_indices[:, :tf.size(input=batch_shape)]
+  indices = tf.concat(
+      (batch_indices, tf.stack((rows, cols), axis=-1)), axis=-1)
+  dense_shape = tf.concat((batch_shape, (num_vertices, num_vertices)), axis=0)
+  return tf.SparseTensor(indices, values, dense_shape)
+
+
+def knn_graph(points,
+              sizes,
+              num_neighbors,
+              include_self=True,
+              block_size=1024,
+              name=None):
+  #  pyformat: disable
+  """Builds the k-nearest neighbor graphs of a batch of point clouds.
+
+  Each vertex is connected to its `num_neighbors` nearest vertices in the same
+  point cloud, or to all of them if the point cloud has fewer vertices. The
+  distances are computed for blocks of `block_size` query vertices at a time,
+  so a `[V, V]` distance matrix is never built.
+
+  The shorthands used below are
+    `V`: The number of vertices.
+    `D`: The dimensionality of the points.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    points: A `float` tensor with shape `[A1, ..., An, V, D]`.
+    sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+      sizes in case of padding (`sizes=None` indicates no padding). Padded
+      vertices have no neighbors and are not neighbors of any vertex. If
+      `points` is 2-D, `sizes` will be ignored.
+    num_neighbors: A positive `int`, the number of neighbors `k` of each vertex.
+    include_self: A `bool`. If `True`, each vertex is its own nearest neighbor,
+      otherwise it is excluded from its neighborhood.
+    block_size: A positive `int`, the number of query vertices for which the
+      distances are computed at once.
+    name: A name for this op. Defaults to `graph_construction_knn_graph`.
+
+  Returns:
+    A `SparseTensor` with the same type as `points` and with shape
+    `[A1, ..., An, V, V]`, with value `1 / degree(v_i)` for each vertex `v_j` in
+    the neighborhood of `v_i`, which can be used as the `neighbors` input of
+    `graph_convolution.feature_steered_convolution` and
+    `graph_convolution.edge_convolution_template`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions, `num_neighbors` or `block_size` are
+      invalid.
+  """
+  #  pyformat: enable
+  with tf.compat.v1.name_scope(name, "graph_construction_knn_graph",
+                               [points, sizes]):
+    points = tf.convert_to_tensor(value=points)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_points(points, sizes)
+    if num_neighbors < 1:
+      raise ValueError("'num_neighbors' must be positive.")
+    if block_size < 1:
+      raise ValueError("'block_size' must be positive.")
+
+    flat_points, valid, batch_shape = _flatten_points(points, sizes)
+    num_vertices = tf.shape(input=flat_points, out_type=tf.int64)[1]
+    num_candidates = tf.cast(
+        tf.minimum(tf.cast(num_neighbors, tf.int64), num_vertices), tf.int32)
+
+    def _knn_edges(squared_distances, block_ids):
+      """Keeps the `num_neighbors` closest vertices of each block vertex."""
+      if not include_self:
+        is_self = tf.equal(
+            tf.expand_dims(block_ids, axis=-1),
+            tf.range(num_vertices, dtype=tf.int64))
+        squared_distances = tf.compat.v1.where(
+            tf.broadcast_to(is_self, tf.shape(input=squared_distances)),
+            tf.fill(tf.shape(input=squared_distances),
+                    tf.constant(float("inf"), dtype=points.dtype)),
+            squared_distances)
+      negative_distances, cols = tf.math.top_k(
+          -squared_distances, k=num_candidates, sorted=False)
+      # Padded or excluded vertices have an infinite distance.
+      positions = tf.compat.v1.where(tf.math.is_finite(negative_distances))
+      cols = tf.cast(tf.gather_nd(cols, positions), tf.int64)
+      rows = tf.gather(block_ids, positions[:, 1])
+      return tf.stack((positions[:, 0], rows, cols), axis=-1)
+
+    edges = _blocked_edges(flat_points, valid, block_size, _knn_edges)
+    return _neighbors_from_edges(edges, batch_shape, num_vertices,
+                                 points.dtype)
+
+
+def _radius_edges_grid(points, valid, radius):
+  """Finds the pairs of vertices closer than `radius` with a voxel grid.
+
+  The vertices are hashed to the cells of a grid with cells of size `radius`
+  and sorted by cell. The neighbors of a vertex can only be in the `3^D` cells
+  around its own cell, whose vertices are found by binary search. The cells
+  are enlarged along the dimensions where the grid would have too many cells
+  for the keys of the cells of all the batch elements to fit in an `int64`.
+
+  Args:
+    points: A `float` tensor with shape `[B, V, D]` and a static `D`.
+    valid: A `bool` tensor with shape `[B, V]`.
+    radius: A positive `float`.
+
+  Returns:
+    An `int64` tensor with shape `[E, 3]` containing the batch index, the row
+    and the column of each edge.
+  """
+  num_dimensions = tf.compat.v1.dimension_value(points.shape[-1])
+  num_vertices = tf.shape(input=points, out_type=tf.int64)[1]
+  vertex_ids = tf.compat.v1.where(tf.reshape(valid, (-1,)))[:, 0]
+  vertex_points = tf.gather(
+      tf.reshape(points, (-1, num_dimensions)), vertex_ids)
+  batch_ids = vertex_ids // num_vertices
+
+  # The grid has at most max_num_cells + 3 cells along each dimension, such
+  # that batch_size * prod(grid_shape) < 2^62. Cells larger than `radius`
+  # still contain all the neighbors in the 3^D cells around a vertex.
+  batch_size = tf.cast(tf.shape(input=points)[0], tf.float64)
+  max_num_cells = tf.maximum(
+      tf.floor((2.0**62 / batch_size)**(1.0 / num_dimensions)) - 3.0, 1.0)
+  coordinates = tf.cast(
+      vertex_points - tf.reduce_min(input_tensor=vertex_points, axis=0),
+      tf.float64)
+  cell_size = tf.maximum(
+      tf.cast(radius, tf.float64),
+      tf.reduce_max(input_tensor=coordinates, axis=0) / max_num_cells)
+  # Cell coordinates start at 1, such that neighboring cells are positive.
+  cells = tf.cast(tf.floor(coordinates / cell_size), tf.int64) + 1
+  grid_shape = tf.reduce_max(input_tensor=cells, axis=0) + 2
+
+  def _cell_keys(batch_ids, cells):
+    """Linearizes the batch index and the cell coordinates."""
+    keys = batch_ids
+    for dimension in range(num_dimensions):
+      keys = keys * grid_shape[dimension] + cells[..., dimension]
+    return keys
+
+  keys = _cell_keys(batch_ids, cells)
+  order = tf.argsort(keys)
+  sorted_keys = tf.gather(keys, order)
+  offsets = tf.constant(
+      list(itertools.product((-1, 0, 1), repeat=num_dimensions)),
+      dtype=tf.int64)
+  neighbor_keys = tf.reshape(
+      _cell_keys(
+          tf.expand_dims(batch_ids, axis=-1),
+          tf.expand_dims(cells, axis=-2) + offsets), (-1,))
+  starts = tf.searchsorted(
+      sorted_keys, neighbor_keys, side="left", out_type=tf.int64)
+  limits = tf.searchsorted(
+      sorted_keys, neighbor_keys, side="right", out_type=tf.int64)
+  positions = tf.ragged.range(starts, limits)
+  queries = positions.value_rowids() // offsets.shape[0]
+  candidates = tf.gather(order, positions.flat_values)
+  differences = (
+      tf.gather(vertex_points, queries) - tf.gather(vertex_points, candidates))
+  is_edge = tf.reduce_sum(
+      input_tensor=differences * differences, axis=-1) <= radius * radius
+  rows = tf.gather(vertex_ids, tf.boolean_mask(tensor=queries, mask=is_edge))
+  cols = tf.gather(vertex_ids,
+                   tf.boolean_mask(tensor=candidates, mask=is_edge))
+  return tf.stack(
+      (rows // num_vertices, rows % num_vertices, cols % num_vertices),
+      axis=-1)
+
+
+def radius_graph(points,
+                 sizes,
+                 radius,
+                 include_self=True,
+                 use_grid=False,
+                 block_size=1024,
+                 name=None):
+  #  pyformat: disable
+  """Builds the radius neighborhood graphs of a batch of point clouds.
+
+  Each vertex is connected to all the vertices of the same point cloud within
+  a distance `radius`. By default, the distances are computed for blocks of
+  `block_size` query vertices at a time, so a `[V, V]` distance matrix is never
+  built. With `use_grid=True`, the vertices are instead hashed to a voxel grid
+  with cells of size `radius`, and the distances are only computed to the
+  vertices in the neighboring cells, which is faster for large sparse point
+  clouds.
+
+  The shorthands used below are
+    `V`: The number of vertices.
+    `D`: The dimensionality of the points.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    points: A `float` tensor with shape `[A1, ..., An, V, D]`. `D` must be
+      static if `use_grid` is `True`.
+    sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+      sizes in case of padding (`sizes=None` indicates no padding). Padded
+      vertices have no neighbors and are not neighbors of any vertex. If
+      `points` is 2-D, `sizes` will be ignored.
+    radius: A positive `float`, the radius of the neighborhoods.
+    include_self: A `bool`. If `True`, each vertex is in its own neighborhood.
+    use_grid: A `bool`. If `True`, a voxel grid is used to find the candidate
+      neighbors.
+    block_size: A positive `int`, the number of query vertices for which the
+      distances are computed at once if `use_grid` is `False`.
+    name: A name for this op. Defaults to `graph_construction_radius_graph`.
+
+  Returns:
+    A `SparseTensor` with the same type as `points` and with shape
+    `[A1, ..., An, V, V]`, with value `1 / degree(v_i)` for each vertex `v_j` in
+    the neighborhood of `v_i`, which can be used as the `neighbors` input of
+    `graph_convolution.feature_steered_convolution` and
+    `graph_convolution.edge_convolution_template`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions, `radius` or `block_size` are invalid.
+  """
+  #  pyformat: enable
+  with tf.compat.v1.name_scope(name, "graph_construction_radius_graph",
+                               [points, sizes]):
+    points = tf.convert_to_tensor(value=points)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_points(points, sizes)
+    if radius <= 0:
+      raise ValueError("'radius' must be positive.")
+    if block_size < 1:
+      raise ValueError("'block_size' must be positive.")
+    if use_grid and tf.compat.v1.dimension_value(points.shape[-1]) is None:
+      raise ValueError("The last dimension of 'points' must be static.")
+
+    flat_points, valid, batch_shape = _flatten_points(points, sizes)
+    num_vertices = tf.shape(input=flat_points, out_type=tf.int64)[1]
+
+    if use_grid:
+      edges = _radius_edges_grid(flat_points, valid, radius)
+    else:
+
+      def _radius_edges(squared_distances, block_ids):
+        """Keeps the vertices closer than `radius` to each block vertex."""
+        positions = tf.compat.v1.where(squared_distances <= radius * radius)
+        rows = tf.gather(block_ids, positions[:, 1])
+        return tf.stack((positions[:, 0], rows, positions[:, 2]), axis=-1)
+
+      edges = _blocked_edges(flat_points, valid, block_size, _radius_edges)
+    if not include_self:
+      edges = tf.boolean_mask(
+          tensor=edges, mask=tf.not_equal(edges[:, 1], edges[:, 2]))
+    return _neighbors_from_edges(edges, batch_shape, num_vertices,
+                                 points.dtype)
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
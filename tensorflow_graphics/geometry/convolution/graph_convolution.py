@@ -24,6 +24,55 @@ from tensorflow_graphics.util import export_api
 from tensorflow_graphics.util import shape
 
 
+def _feature_steered_weights(x_u, x_v, var_c, vertex_ids, neighbor_ids):
+  """Computes the normalized FeaStNet weights `q_m(x_i, x_j)` for all edges.
+
+  The weights are a softmax over `W` of the edge logits
+  `x_u[i] + x_v[j] + var_c`. The softmax subtracts the per-edge maximum logit
+  before exponentiation so that it does not overflow in low precision. The
+  gradient recomputes the `[E, W]` edge logits from the per-vertex `x_u` and
+  `x_v` instead of keeping them alive for the backward pass.
+
+  Args:
+    x_u: A tensor with shape `[V, W]`.
+    x_v: A tensor with shape `[V, W]`.
+    var_c: A tensor with shape `[W]`.
+    vertex_ids: An `int` tensor with shape `[E]` containing the index `i` of
+      each edge.
+    neighbor_ids: An `int` tensor with shape `[E]` containing the index `j` of
+      each edge.
+
+  Returns:
+    A tensor with shape `[E, W]`.
+  """
+
+  def _softmax(x_u, x_v, var_c):
+    logits = (tf.gather(x_u, vertex_ids) + tf.gather(x_v, neighbor_ids) +
+              tf.reshape(var_c, (1, -1)))
+    return tf.nn.softmax(logits, axis=-1)
+
+  @tf.custom_gradient
+  def _weights(x_u, x_v, var_c):
+    """Computes the weights with a rematerializing gradient."""
+
+    def grad(d_weights):
+      weights = _softmax(x_u, x_v, var_c)
+      d_logits = weights * (
+          d_weights -
+          tf.reduce_sum(input_tensor=d_weights * weights, axis=-1,
+                        keepdims=True))
+      num_vertices = tf.shape(input=x_u)[0]
+      d_x_u = tf.math.unsorted_segment_sum(d_logits, vertex_ids, num_vertices)
+      d_x_v = tf.math.unsorted_segment_sum(d_logits, neighbor_ids,
+                                           num_vertices)
+      d_var_c = tf.reduce_sum(input_tensor=d_logits, axis=0)
+      return d_x_u, d_x_v, d_var_c
+
+    return _softmax(x_u, x_v, var_c), grad
+
+  return _weights(x_u, x_v, var_c)
+
+
 def feature_steered_convolution(data,
                                 neighbors,
                                 sizes,
@@ -32,6 +81,7 @@ def feature_steered_convolution(data,
                                 var_c,
                                 var_w,
                                 var_b,
+                                fused=False,
                                 name=None):
   #  pyformat: disable
   """Implements the Feature Steered graph convolution.
@@ -64,7 +114,10 @@ def feature_steered_convolution(data,
       graph adjacency matrix with self-edges: `neighbors[A1, ..., An, i, j] > 0`
       if vertex j is a neighbor of i, and `neighbors[A1, ..., An, i, i] > 0` for
       all i, and `sum(neighbors, axis=-1)[A1, ..., An, i] == 1.0 for all i`.
-      These requirements are relaxed in this implementation.
+      These requirements are relaxed in this implementation. `neighbors` can
+      also be a `utils.PreparedGraph` returned by
+      `utils.prepare_graph_convolution_input`, or a `utils.PaddedGraph`
+      returned by `utils.prepare_padded_graph_convolution_input` for XLA.
     sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
       sizes in case of padding (`sizes=None` indicates no padding).Note that
       `sizes[A1, ..., An] <= V`. If `data` and `neighbors` are 2-D, `sizes` will
@@ -75,12 +128,20 @@ def feature_steered_convolution(data,
       sizes of each graph will be specified by `sizes=[V0, V1, V2]`
       `data[i, :Vi, :]` and `neighbors[i, :Vi, :Vi]` will be the vertex and
       neighborhood data of graph Gi. The `SparseTensor` `neighbors` should have
-      no nonzero entries in the padded regions.
+      no nonzero entries in the padded regions. `sizes` is ignored if
+      `neighbors` is a `utils.PreparedGraph` or a `utils.PaddedGraph`.
     var_u: A 2-D tensor with shape `[C, W]`.
     var_v: A 2-D tensor with shape `[C, W]`.
     var_c: A 1-D tensor with shape `[W]`.
     var_w: A 3-D tensor with shape `[W, C, D]`.
     var_b: A 1-D tensor with shape `[D]`.
+    fused: A `bool`. If `True`, the contributions of the `W` weight matrices
+      are computed with a single partition sum and a single matrix
+      multiplication, instead of one partition sum and one matrix
+      multiplication per weight matrix. Both modes compute the same result; the
+      fused mode creates a smaller graph, at the cost of keeping an
+      `[E, W, min(C, D)]` intermediate in memory, where `E` is the number of
+      edges in `neighbors`.
     name: A name for this op. Defaults to
       `graph_convolution_feature_steered_convolution`.
 
@@ -96,17 +157,22 @@ def feature_steered_convolution(data,
       name, "graph_convolution_feature_steered_convolution",
       [data, neighbors, sizes, var_u, var_v, var_c, var_w, var_b]):
     data = tf.convert_to_tensor(value=data)
-    neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=neighbors)
-    if sizes is not None:
-      sizes = tf.convert_to_tensor(value=sizes)
+    if isinstance(neighbors, (utils.PreparedGraph, utils.PaddedGraph)):
+      graph = neighbors
+      utils.check_valid_prepared_graph_input(data, graph, "neighbors")
+    else:
+      neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=neighbors)
+      if sizes is not None:
+        sizes = tf.convert_to_tensor(value=sizes)
+      utils.check_valid_graph_convolution_input(data, neighbors, sizes)
+      graph = None
     var_u = tf.convert_to_tensor(value=var_u)
     var_v = tf.convert_to_tensor(value=var_v)
     var_c = tf.convert_to_tensor(value=var_c)
     var_w = tf.convert_to_tensor(value=var_w)
     var_b = tf.convert_to_tensor(value=var_b)
 
-    data_ndims = data.shape.ndims
-    utils.check_valid_graph_convolution_input(data, neighbors, sizes)
     shape.compare_dimensions(
         tensors=(data, var_u, var_v, var_w),
         tensor_names=("data", "var_u", "var_v", "var_w"),
@@ -119,40 +185,60 @@ def feature_steered_convolution(data,
         tensors=(var_w, var_b), tensor_names=("var_w", "var_b"), axes=-1)
 
     # Flatten the batch dimensions and remove any vertex padding.
-    if data_ndims > 2:
-      if sizes is not None:
-        sizes_square = tf.stack((sizes, sizes), axis=-1)
-      else:
-        sizes_square = None
-      x_flat, unflatten = utils.flatten_batch_to_2d(data, sizes)
-      adjacency = utils.convert_to_block_diag_2d(neighbors, sizes_square)
-    else:
-      x_flat = data
-      adjacency = neighbors
+    if graph is None:
+      graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    x_flat = utils.flatten_prepared_graph_input(data, graph)
     x_u = tf.matmul(x_flat, var_u)
     x_v = tf.matmul(x_flat, var_v)
-    adjacency_ind_0 = adjacency.indices[:, 0]
-    adjacency_ind_1 = adjacency.indices[:, 1]
-    x_u_rep = tf.gather(x_u, adjacency_ind_0)
-    x_v_sep = tf.gather(x_v, adjacency_ind_1)
-    weights_q = tf.exp(x_u_rep + x_v_sep + tf.reshape(var_c, (1, -1)))
-    weights_q_sum = tf.reduce_sum(
-        input_tensor=weights_q, axis=-1, keepdims=True)
-    weights_q = weights_q / weights_q_sum
-    y_i_m = []
-    x_sep = tf.gather(x_flat, adjacency_ind_1)
-    q_m_list = tf.unstack(weights_q, axis=-1)
-    w_m_list = tf.unstack(var_w, axis=0)
-    for q_m, w_m in zip(q_m_list, w_m_list):
-      # Compute `y_i_m = sum_{j in neighborhood(i)} q_m(x_i, x_j) * w_m * x_j`.
-      q_m = tf.expand_dims(q_m, axis=-1)
-      p_sum = utils.partition_sums_2d(q_m * x_sep, adjacency_ind_0,
-                                      adjacency.values)
-      y_i_m.append(tf.matmul(p_sum, w_m))
-    y_out = tf.add_n(inputs=y_i_m) + tf.reshape(var_b, [1, -1])
-    if data_ndims > 2:
-      y_out = unflatten(y_out)
-    return y_out
+    adjacency_ind_0 = graph.row_ids
+    adjacency_ind_1 = graph.col_ids
+    weights_q = _feature_steered_weights(x_u, x_v, var_c, adjacency_ind_0,
+                                         adjacency_ind_1)
+    # Scale the `[E, W]` weights by the neighbor weights once, rather than each
+    # `[E, C]` product in the reduction.
+    weights_q *= tf.expand_dims(graph.values, axis=-1)
+    if fused:
+      # Computes `sum_m sum_{j in neighborhood(i)} q_m(x_i, x_j) * w_m * x_j`
+      # for all m at once. The per-edge tensor has `W * min(C, D)` channels:
+      # the inputs are either transformed by all `w_m` before being gathered
+      # along the edges, or aggregated along the edges before being multiplied
+      # with the stacked `[W * C, D]` weight matrix.
+      in_channels = tf.compat.v1.dimension_value(var_w.shape[1])
+      out_channels = tf.compat.v1.dimension_value(var_w.shape[2])
+      var_w_shape = tf.shape(input=var_w)
+      if (in_channels is not None and out_channels is not None and
+          out_channels <= in_channels):
+        w_concat = tf.reshape(
+            tf.transpose(a=var_w, perm=(1, 0, 2)),
+            (var_w_shape[1], var_w_shape[0] * var_w_shape[2]))
+        x_w = tf.reshape(
+            tf.matmul(x_flat, w_concat), (-1, var_w_shape[0], var_w_shape[2]))
+        x_w_sep = tf.gather(x_w, adjacency_ind_1)
+        q_x_w_sep = tf.reduce_sum(
+            input_tensor=tf.expand_dims(weights_q, axis=-1) * x_w_sep, axis=1)
+        y_out = utils.segment_reduce_2d(q_x_w_sep, graph, "sum")
+      else:
+        x_sep = tf.gather(x_flat, adjacency_ind_1)
+        num_stacked_channels = var_w_shape[0] * var_w_shape[1]
+        q_x_sep = tf.expand_dims(weights_q, axis=-1) * tf.expand_dims(
+            x_sep, axis=-2)
+        q_x_sep = tf.reshape(q_x_sep, (-1, num_stacked_channels))
+        p_sum = utils.segment_reduce_2d(q_x_sep, graph, "sum")
+        w_stacked = tf.reshape(var_w, (num_stacked_channels, var_w_shape[2]))
+        y_out = tf.matmul(p_sum, w_stacked)
+    else:
+      y_i_m = []
+      x_sep = tf.gather(x_flat, adjacency_ind_1)
+      q_m_list = tf.unstack(weights_q, axis=-1)
+      w_m_list = tf.unstack(var_w, axis=0)
+      for q_m, w_m in zip(q_m_list, w_m_list):
+        # Compute `y_i_m = sum_{j in neighborhood(i)} q_m(x_i, x_j) * w_m * x_j`.
+        q_m = tf.expand_dims(q_m, axis=-1)
+        p_sum = utils.segment_reduce_2d(q_m * x_sep, graph, "sum")
+        y_i_m.append(tf.matmul(p_sum, w_m))
+      y_out = tf.add_n(inputs=y_i_m)
+    y_out += tf.reshape(var_b, [1, -1])
+    return utils.unflatten_prepared_graph_output(y_out, graph)
 
 
 def edge_convolution_template(data,
@@ -198,7 +284,10 @@ def edge_convolution_template(data,
       `[A1, ..., An, V, V]` representing vertex neighborhoods. The neighborhood
       of a vertex defines the support region for convolution. The value at
       `neighbors[A1, ..., An, i, j]` corresponds to the weight \\(w_{ij}\\)
-      above. Each vertex must have at least one neighbor.
+      above. Each vertex must have at least one neighbor. `neighbors` can also
+      be a `utils.PreparedGraph` returned by
+      `utils.prepare_graph_convolution_input`, or a `utils.PaddedGraph`
+      returned by `utils.prepare_padded_graph_convolution_input` for XLA.
     sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
       sizes in case of padding (`sizes=None` indicates no padding). Note that
       `sizes[A1, ..., An] <= V`. If `data` and `neighbors` are 2-D, `sizes` will
@@ -209,7 +298,8 @@ def edge_convolution_template(data,
       each graph will be specified by `sizes=[V0, V1, V2]` and `data[i, :Vi, :]`
       and `neighbors[i, :Vi, :Vi]` will be the vertex and neighborhood data of
       graph Gi. The `SparseTensor` `neighbors` should have no nonzero entries in
-      the padded regions.
+      the padded regions. `sizes` is ignored if `neighbors` is a
+      `utils.PreparedGraph` or a `utils.PaddedGraph`.
     edge_function: A callable that takes at least two arguments of vertex
       features and returns a tensor of vertex features. `Y = f(X1, X2,
       **kwargs)`, where `X1` and `X2` have shape `[V3, C]` and `Y` must have
@@ -235,47 +325,185 @@ def edge_convolution_template(data,
                                "graph_convolution_edge_convolution_template",
                                [data, neighbors, sizes]):
     data = tf.convert_to_tensor(value=data)
-    neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=neighbors)
-    if sizes is not None:
-      sizes = tf.convert_to_tensor(value=sizes)
-
-    data_ndims = data.shape.ndims
-    utils.check_valid_graph_convolution_input(data, neighbors, sizes)
-
-    # Flatten the batch dimensions and remove any vertex padding.
-    if data_ndims > 2:
-      if sizes is not None:
-        sizes_square = tf.stack((sizes, sizes), axis=-1)
-      else:
-        sizes_square = None
-      x_flat, unflatten = utils.flatten_batch_to_2d(data, sizes)
-      adjacency = utils.convert_to_block_diag_2d(neighbors, sizes_square)
+    if isinstance(neighbors, (utils.PreparedGraph, utils.PaddedGraph)):
+      graph = neighbors
+      utils.check_valid_prepared_graph_input(data, graph, "neighbors")
     else:
-      x_flat = data
-      adjacency = neighbors
+      neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=neighbors)
+      if sizes is not None:
+        sizes = tf.convert_to_tensor(value=sizes)
+      utils.check_valid_graph_convolution_input(data, neighbors, sizes)
+      graph = utils.prepare_graph_convolution_input(neighbors, sizes)
 
-    adjacency_ind_0 = adjacency.indices[:, 0]
-    adjacency_ind_1 = adjacency.indices[:, 1]
+    # Flatten the batch dimensions and remove any vertex padding.
+    x_flat = utils.flatten_prepared_graph_input(data, graph)
+    adjacency_ind_0 = graph.row_ids
+    adjacency_ind_1 = graph.col_ids
     vertex_features = tf.gather(x_flat, adjacency_ind_0)
     neighbor_features = tf.gather(x_flat, adjacency_ind_1)
     edge_features = edge_function(vertex_features, neighbor_features,
                                   **edge_function_kwargs)
 
-    if reduction == "weighted":
-      features = utils.partition_sums_2d(edge_features, adjacency_ind_0,
-                                         adjacency.values)
-    elif reduction == "max":
-      features = tf.math.segment_max(data=edge_features,
-                                     segment_ids=adjacency_ind_0)
-      features.set_shape(features.shape.merge_with(
-          (tf.compat.v1.dimension_value(x_flat.shape[0]),
-           tf.compat.v1.dimension_value(edge_features.shape[-1]))))
-    else:
+    if reduction not in ("weighted", "max"):
       raise ValueError("The reduction method must be 'weighted' or 'max'")
+    features = utils.segment_reduce_2d(edge_features, graph, reduction)
+    features.set_shape(features.shape.merge_with(
+        (tf.compat.v1.dimension_value(x_flat.shape[0]),
+         tf.compat.v1.dimension_value(edge_features.shape[-1]))))
+
+    return utils.unflatten_prepared_graph_output(features, graph)
+
 
-    if data_ndims > 2:
-      features = unflatten(features)
-    return features
+def graph_attention_convolution(data,
+                                neighbors,
+                                sizes,
+                                var_w,
+                                var_a,
+                                var_b,
+                                concatenate_heads=True,
+                                negative_slope=0.2,
+                                name=None):
+  #  pyformat: disable
+  r"""Implements the multi-head Graph Attention convolution.
+
+  Graph Attention Networks
+  Petar Velickovic, Guillem Cucurull, Arantxa Casanova, Adriana Romero,
+  Pietro Lio, Yoshua Bengio
+  ICLR 2018
+  https://arxiv.org/abs/1710.10903
+
+  For each head `h`, this op computes
+  $$y_i^h = \sum_{j \in \mathcal{N(i)}} \alpha_{ij}^h W^h x_j$$
+  where the attention weights are normalized over the neighborhood of vertex
+  `i`
+  $$\alpha_{ij}^h = \frac{\exp(e_{ij}^h)}{\sum_{k \in \mathcal{N(i)}}
+  \exp(e_{ik}^h)}, \quad e_{ij}^h = LeakyReLU(a^h \cdot [W^h x_i, W^h x_j])$$.
+
+  The vertex features are transformed by all the heads at once, and the
+  logits are gathered along the edges of `neighbors` from per-vertex scores.
+  The softmax over each neighborhood is computed with segment reductions over
+  the edges, like the reductions of `edge_convolution_template`, so that no
+  dense `[V, V]` score matrix is built.
+
+  The shorthands used below are
+    `V`: The number of vertices.
+    `C`: The number of channels in the input data.
+    `H`: The number of attention heads.
+    `D`: The number of output channels of each head.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    data: A `float` tensor with shape `[A1, ..., An, V, C]`.
+    neighbors: A `SparseTensor` with the same type as `data` and with shape
+      `[A1, ..., An, V, V]` representing vertex neighborhoods. Only the
+      sparsity pattern of `neighbors` is used, its values are ignored. Each
+      vertex should have at least one neighbor, typically itself; vertices
+      without neighbors only get the bias. `neighbors` can also be a
+      `utils.PreparedGraph` returned by `utils.prepare_graph_convolution_input`,
+      or a `utils.PaddedGraph` returned by
+      `utils.prepare_padded_graph_convolution_input` for XLA.
+    sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+      sizes in case of padding (`sizes=None` indicates no padding), see
+      `edge_convolution_template`. `sizes` is ignored if `neighbors` is a
+      `utils.PreparedGraph` or a `utils.PaddedGraph`.
+    var_w: A 3-D tensor with shape `[H, C, D]`.
+    var_a: A 2-D tensor with shape `[H, 2 * D]`. The first `D` channels of
+      `var_a[h]` are applied to the transformed features of the vertex, and the
+      last `D` channels to the transformed features of its neighbor.
+    var_b: A 1-D tensor with shape `[H * D]` if `concatenate_heads` is `True`,
+      and `[D]` otherwise.
+    concatenate_heads: A `bool`. If `True`, the outputs of the heads are
+      concatenated, otherwise they are averaged.
+    negative_slope: A `float`, the slope of the leaky ReLU applied to the
+      attention logits for negative inputs.
+    name: A name for this op. Defaults to
+      `graph_convolution_graph_attention_convolution`.
+
+  Returns:
+    Tensor with shape `[A1, ..., An, V, H * D]` if `concatenate_heads` is
+    `True`, and `[A1, ..., An, V, D]` otherwise.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  #  pyformat: enable
+  with tf.compat.v1.name_scope(
+      name, "graph_convolution_graph_attention_convolution",
+      [data, neighbors, sizes, var_w, var_a, var_b]):
+    data = tf.convert_to_tensor(value=data)
+    if isinstance(neighbors, (utils.PreparedGraph, utils.PaddedGraph)):
+      graph = neighbors
+      utils.check_valid_prepared_graph_input(data, graph, "neighbors")
+    else:
+      neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=neighbors)
+      if sizes is not None:
+        sizes = tf.convert_to_tensor(value=sizes)
+      utils.check_valid_graph_convolution_input(data, neighbors, sizes)
+      graph = None
+    var_w = tf.convert_to_tensor(value=var_w)
+    var_a = tf.convert_to_tensor(value=var_a)
+    var_b = tf.convert_to_tensor(value=var_b)
+
+    shape.check_static(tensor=var_w, tensor_name="var_w", has_rank=3)
+    shape.check_static(tensor=var_a, tensor_name="var_a", has_rank=2)
+    shape.check_static(tensor=var_b, tensor_name="var_b", has_rank=1)
+    shape.compare_dimensions(
+        tensors=(data, var_w), tensor_names=("data", "var_w"), axes=(-1, 1))
+    shape.compare_dimensions(
+        tensors=(var_w, var_a), tensor_names=("var_w", "var_a"), axes=0)
+    out_channels = tf.compat.v1.dimension_value(var_w.shape[2])
+    attention_channels = tf.compat.v1.dimension_value(var_a.shape[1])
+    if (out_channels is not None and attention_channels is not None and
+        attention_channels != 2 * out_channels):
+      raise ValueError(
+          "'var_a' must have twice as many channels as the heads of 'var_w'.")
+
+    if graph is None:
+      graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    x_flat = utils.flatten_prepared_graph_input(data, graph)
+    var_w_shape = tf.shape(input=var_w)
+    num_heads = var_w_shape[0]
+    num_channels = var_w_shape[2]
+    # Transforms the features of all the vertices by all the heads at once.
+    w_concat = tf.reshape(
+        tf.transpose(a=var_w, perm=(1, 0, 2)),
+        (var_w_shape[1], num_heads * num_channels))
+    x_w = tf.reshape(
+        tf.matmul(x_flat, w_concat), (-1, num_heads, num_channels))
+    # The logits are separable in the vertex and the neighbor, so the scores
+    # are computed per vertex and only gathered along the edges.
+    a_vertex, a_neighbor = tf.split(var_a, 2, axis=-1)
+    scores_vertex = tf.reduce_sum(input_tensor=x_w * a_vertex, axis=-1)
+    scores_neighbor = tf.reduce_sum(input_tensor=x_w * a_neighbor, axis=-1)
+    logits = tf.nn.leaky_relu(
+        tf.gather(scores_vertex, graph.row_ids) +
+        tf.gather(scores_neighbor, graph.col_ids),
+        alpha=negative_slope)
+    # The softmax is invariant to the subtracted maximum, which only avoids
+    # overflows and does not need a gradient.
+    max_logits = tf.stop_gradient(
+        utils.segment_reduce_2d(logits, graph, "max"))
+    exp_logits = tf.exp(logits - tf.gather(max_logits, graph.row_ids))
+    normalizers = utils.segment_reduce_2d(exp_logits, graph, "sum")
+    # Normalizes after the aggregation, once per vertex instead of per edge.
+    messages = tf.expand_dims(exp_logits, axis=-1) * tf.gather(
+        x_w, graph.col_ids)
+    y_out = utils.segment_reduce_2d(
+        tf.reshape(messages, (-1, num_heads * num_channels)), graph, "sum")
+    y_out = tf.math.divide_no_nan(
+        tf.reshape(y_out, (-1, num_heads, num_channels)),
+        tf.expand_dims(normalizers, axis=-1))
+    if concatenate_heads:
+      y_out = tf.reshape(y_out, (-1, num_heads * num_channels))
+    else:
+      y_out = tf.reduce_mean(input_tensor=y_out, axis=1)
+    y_out += tf.reshape(var_b, (1, -1))
+    return utils.unflatten_prepared_graph_output(y_out, graph)
 
 
 # API contains all public functions and classes.
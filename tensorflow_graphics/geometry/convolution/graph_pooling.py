@@ -17,10 +17,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+
 import tensorflow as tf
 
 from tensorflow_graphics.geometry.convolution import utils
+from tensorflow_graphics.util import asserts
 from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import shape
 
 
 def pool(data, pool_map, sizes, algorithm='max', name=None):
@@ -44,12 +48,16 @@ def pool(data, pool_map, sizes, algorithm='max', name=None):
     pool_map: A `SparseTensor` with the same type as `data` and with shape
       `[A1, ..., An, V2, V1]`. The features for an output vertex `v2` will be
       computed by pooling over the corresponding input vertices specified by
-      the entries in `pool_map[A1, ..., An, v2, :]`.
+      the entries in `pool_map[A1, ..., An, v2, :]`. `pool_map` can also be a
+      `utils.PreparedGraph` returned by `utils.prepare_graph_pooling_input`,
+      or a `utils.PaddedGraph` returned by
+      `utils.prepare_padded_graph_pooling_input` for XLA.
     sizes: An `int` tensor of shape `[A1, ..., An, 2]` indicating the true
       input sizes in case of padding (`sizes=None` indicates no padding).
       `sizes[A1, ..., An, 0] <= V2` specifies the padding in the (pooled)
       output, and `sizes[A1, ..., An, 1] <= V1` specifies the padding in the
-      input.
+      input. `sizes` is ignored if `pool_map` is a `utils.PreparedGraph` or a
+      `utils.PaddedGraph`.
     algorithm: The pooling function, must be either 'max' or 'weighted'. Default
       is 'max'. For 'max' pooling, the output features are the maximum over the
       input vertices (in this case only the indices of the `SparseTensor`
@@ -70,44 +78,123 @@ def pool(data, pool_map, sizes, algorithm='max', name=None):
   with tf.compat.v1.name_scope(
       name, 'graph_pooling_pool', [data, pool_map, sizes]):
     data = tf.convert_to_tensor(value=data)
-    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
-    if sizes is not None:
-      sizes = tf.convert_to_tensor(value=sizes)
-    utils.check_valid_graph_pooling_input(data, pool_map, sizes)
-
-    if sizes is not None:
-      sizes_output, sizes_input = tf.split(sizes, 2, axis=-1)
-      sizes_output = tf.squeeze(sizes_output, axis=-1)
-      sizes_input = tf.squeeze(sizes_input, axis=-1)
+    if isinstance(pool_map, (utils.PreparedGraph, utils.PaddedGraph)):
+      graph = pool_map
+      utils.check_valid_prepared_graph_input(data, graph, 'pool_map')
     else:
-      sizes_output = None
-      sizes_input = None
+      pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=pool_map)
+      if sizes is not None:
+        sizes = tf.convert_to_tensor(value=sizes)
+      utils.check_valid_graph_pooling_input(data, pool_map, sizes)
+      graph = utils.prepare_graph_pooling_input(pool_map, sizes)
 
-    batched = data.shape.ndims > 2
-    if batched:
-      x_flat, _ = utils.flatten_batch_to_2d(data, sizes_input)
-      pool_map_block_diagonal = utils.convert_to_block_diag_2d(pool_map, sizes)
-    else:
-      x_flat = data
-      pool_map_block_diagonal = pool_map
-
-    if algorithm == 'weighted':
-      pooled = tf.sparse.sparse_dense_matmul(pool_map_block_diagonal, x_flat)
-    elif algorithm == 'max':
-      pool_groups = tf.gather(x_flat, pool_map_block_diagonal.indices[:, 1])
-      pooled = tf.math.segment_max(
-          data=pool_groups, segment_ids=pool_map_block_diagonal.indices[:, 0])
-    else:
+    x_flat = utils.flatten_prepared_graph_input(data, graph)
+
+    if algorithm not in ('weighted', 'max'):
       raise ValueError('The pooling method must be "weighted" or "max"')
+    pool_groups = tf.gather(x_flat, graph.col_ids)
+    pooled = utils.segment_reduce_2d(pool_groups, graph, algorithm)
+
+    return utils.unflatten_prepared_graph_output(pooled, graph)
+
+
+def pool_clusters(data, clusters, num_clusters, algorithm='max', name=None):
+  #  pyformat: disable
+  """Implements graph pooling for a hard clustering of the vertices.
 
-    if batched:
-      if sizes_output is not None:
-        pooled = utils.unflatten_2d_to_batch(pooled, sizes_output)
-      else:
-        output_shape = tf.concat((tf.shape(input=pool_map)[:-1], (-1,)), axis=0)
-        pooled = tf.reshape(pooled, output_shape)
+  This is equivalent to `pool` when each input vertex belongs to exactly one
+  pooling window, as for instance for mesh hierarchies built by vertex
+  clustering, but the windows are given by the cluster of each input vertex
+  instead of a `SparseTensor`. The features are reduced with unsorted segment
+  ops, without building a block diagonal pooling map or gathering the pooling
+  groups.
 
-    return pooled
+  The shorthands used below are
+    `V1`: The number of vertices in the input data.
+    `V2`: The number of vertices in the pooled output data.
+    `C`: The number of channels in the data.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    data: A `float` tensor with shape `[A1, ..., An, V1, C]`.
+    clusters: An `int` tensor with shape `[A1, ..., An, V1]`, where
+      `clusters[A1, ..., An, v1]` is the output vertex in `[0, V2)` that input
+      vertex `v1` is pooled into. Input vertices with a negative cluster, for
+      instance padded vertices, are ignored. The clusters must be smaller
+      than `V2`.
+    num_clusters: An `int` `V2`, the number of output vertices.
+    algorithm: The pooling function, must be either 'max', 'mean' or 'sum'.
+      Default is 'max'. Output vertices without any input vertex are set to
+      zero.
+    name: A name for this op. Defaults to 'graph_pooling_pool_clusters'.
+
+  Returns:
+    Tensor with shape `[A1, ..., An, V2, C]`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+    ValueError: if `algorithm` is invalid.
+  """
+  #  pyformat: enable
+  with tf.compat.v1.name_scope(
+      name, 'graph_pooling_pool_clusters', [data, clusters, num_clusters]):
+    data = tf.convert_to_tensor(value=data)
+    clusters = tf.convert_to_tensor(value=clusters)
+
+    if not data.dtype.is_floating:
+      raise TypeError("'data' must have a float type.")
+    if not clusters.dtype.is_integer:
+      raise TypeError("'clusters' must have an integer type.")
+    shape.check_static(tensor=data, tensor_name='data', has_rank_greater_than=1)
+    shape.check_static(
+        tensor=clusters, tensor_name='clusters', has_rank=data.shape.ndims - 1)
+    shape.compare_batch_dimensions(
+        tensors=(data, clusters),
+        tensor_names=('data', 'clusters'),
+        last_axes=(-2, -1),
+        broadcast_compatible=False)
+    if algorithm not in ('max', 'mean', 'sum'):
+      raise ValueError('The pooling method must be "max", "mean" or "sum"')
+
+    # Flattens the batch dimensions and offsets the clusters of each batch
+    # element, such that all the output vertices have distinct segment ids.
+    data_shape = tf.shape(input=data, out_type=tf.int64)
+    num_channels = data_shape[-1]
+    clusters = tf.cast(tf.reshape(clusters, (-1, data_shape[-2])), tf.int64)
+    num_clusters = tf.cast(num_clusters, tf.int64)
+    clusters = asserts.assert_all_below(clusters, num_clusters, open_bound=True)
+    batch_size = tf.shape(input=clusters, out_type=tf.int64)[0]
+    offsets = tf.expand_dims(tf.range(batch_size) * num_clusters, axis=-1)
+    segment_ids = tf.where(clusters < 0, clusters, clusters + offsets)
+    segment_ids = tf.reshape(segment_ids, (-1,))
+    x_flat = tf.reshape(data, (-1, num_channels))
+    num_segments = batch_size * num_clusters
+
+    if algorithm == 'sum':
+      pooled = tf.math.unsorted_segment_sum(
+          data=x_flat, segment_ids=segment_ids, num_segments=num_segments)
+    elif algorithm == 'mean':
+      pooled = tf.math.unsorted_segment_mean(
+          data=x_flat, segment_ids=segment_ids, num_segments=num_segments)
+    else:
+      pooled = tf.math.unsorted_segment_max(
+          data=x_flat, segment_ids=segment_ids, num_segments=num_segments)
+      group_sizes = tf.math.unsorted_segment_sum(
+          data=tf.ones_like(segment_ids),
+          segment_ids=segment_ids,
+          num_segments=num_segments)
+      is_empty = tf.broadcast_to(
+          tf.expand_dims(tf.equal(group_sizes, 0), axis=-1),
+          tf.shape(input=pooled))
+      pooled = tf.where(is_empty, tf.zeros_like(pooled), pooled)
+
+    output_shape = tf.concat(
+        (data_shape[:-2], tf.stack((num_clusters, num_channels))), axis=0)
+    return tf.reshape(pooled, output_shape)
 
 
 def unpool(data, pool_map, sizes, name=None):
@@ -138,10 +225,15 @@ def unpool(data, pool_map, sizes, name=None):
     pool_map: A `SparseTensor` with the same type as `data` and with shape
       `[A1, ..., A3, V1, V2]`. The features for vertex `v1` are computed by
       pooling over the entries in `pool_map[A1, ..., A3, v1, :]`. This function
-      applies this pooling map in reverse.
+      applies this pooling map in reverse. `pool_map` can also be a
+      `utils.PreparedGraph` returned by `utils.prepare_graph_unpooling_input`,
+      or a `utils.PaddedGraph` returned by
+      `utils.prepare_padded_graph_unpooling_input` for XLA.
     sizes: An `int` tensor of shape `[A1, ..., A3, 2]` indicating the true
       input sizes in case of padding (`sizes=None` indicates no padding):
-      `sizes[A1, ..., A3, 0] <= V1` and `sizes[A1, ..., A3, 1] <= V2`.
+      `sizes[A1, ..., A3, 0] <= V1` and `sizes[A1, ..., A3, 1] <= V2`. `sizes`
+      is ignored if `pool_map` is a `utils.PreparedGraph` or a
+      `utils.PaddedGraph`.
     name: A name for this op. Defaults to 'graph_pooling_unpool'.
 
   Returns:
@@ -155,26 +247,116 @@ def unpool(data, pool_map, sizes, name=None):
   with tf.compat.v1.name_scope(
       name, 'graph_pooling_unpool', [data, pool_map, sizes]):
     data = tf.convert_to_tensor(value=data)
-    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
-    if sizes is not None:
-      sizes = tf.convert_to_tensor(value=sizes)
-    utils.check_valid_graph_unpooling_input(data, pool_map, sizes)
+    if isinstance(pool_map, (utils.PreparedGraph, utils.PaddedGraph)):
+      graph = pool_map
+      utils.check_valid_prepared_graph_input(data, graph, 'pool_map')
+    else:
+      pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=pool_map)
+      if sizes is not None:
+        sizes = tf.convert_to_tensor(value=sizes)
+      utils.check_valid_graph_unpooling_input(data, pool_map, sizes)
+      graph = utils.prepare_graph_unpooling_input(pool_map, sizes)
+
+    # Max pooling with the transpose of `pool_map`: the features of each
+    # unpooled vertex are the maximum over the pooled vertices it maps to.
+    # Unpooled vertices that are not in the pooling map are set to zero.
+    x_flat = utils.flatten_prepared_graph_input(data, graph)
+    if isinstance(graph, utils.PaddedGraph):
+      num_unpooled = graph.num_segments
+    else:
+      num_unpooled = graph.adjacency.dense_shape[1]
+    pool_groups = tf.gather(x_flat, graph.row_ids)
+    unpooled = tf.math.unsorted_segment_max(
+        data=pool_groups, segment_ids=graph.col_ids, num_segments=num_unpooled)
+    group_sizes = tf.math.unsorted_segment_sum(
+        data=tf.ones_like(graph.col_ids),
+        segment_ids=graph.col_ids,
+        num_segments=num_unpooled)
+    is_empty = tf.broadcast_to(
+        tf.expand_dims(tf.equal(group_sizes, 0), axis=-1),
+        tf.shape(input=unpooled))
+    unpooled = tf.where(is_empty, tf.zeros_like(unpooled), unpooled)
+
+    return utils.unflatten_prepared_graph_output(unpooled, graph)
+
+
+class UpsamplePlan(
+    collections.namedtuple('UpsamplePlan',
+                           ('graph', 'kernel_size', 'order', 'segment_ids'))):
+  """A precomputed mapping for `upsample_transposed_convolution`.
+
+  `upsample_transposed_convolution` maps the `kernel_size` outputs of the
+  transposed convolution of each input vertex to upsampled vertices given by
+  `pool_map`, and averages the outputs mapped to the same vertex. This mapping
+  only depends on `pool_map`, `sizes` and `kernel_size`, so it can be computed
+  once with `prepare_upsample_plan` and passed as the `pool_map` argument, in
+  which case upsampling is a gather followed by a sorted segment mean.
+
+  Attributes:
+    graph: The `utils.PreparedGraph` of the unpooling map.
+    kernel_size: The `int` kernel size of the transposed convolution.
+    order: An `int64` tensor with shape `[M]` containing the rows of the
+      flattened transposed convolution output that are mapped to an upsampled
+      vertex, sorted by upsampled vertex.
+    segment_ids: An `int64` tensor with shape `[M]` containing the sorted
+      upsampled vertex of each row in `order`.
+  """
+  __slots__ = ()
 
-    # Reverse pool_map and sizes.
-    pool_map_ndims = pool_map.shape.ndims
-    permutation = tf.concat((tf.range(pool_map_ndims - 2),
-                             (pool_map_ndims - 1, pool_map_ndims - 2)),
-                            axis=0)
-    pool_map_transpose = tf.sparse.transpose(pool_map, permutation)
-    row_sum = tf.sparse.reduce_sum(
-        tf.abs(pool_map_transpose), keepdims=True, axis=-1)
-    normalize_weights = tf.where(tf.equal(row_sum, 0), row_sum, 1.0 / row_sum)
-    pool_map_normalize = normalize_weights * pool_map_transpose
 
-    if sizes is not None:
-      sizes = tf.reverse(sizes, axis=(-1,))
+def prepare_upsample_plan(pool_map, sizes, kernel_size, name=None):
+  """Precomputes the mapping of `upsample_transposed_convolution`.
+
+  Note:
+    In the following, A1 to A3 are optional batch dimensions.
+
+  Args:
+    pool_map: A `SparseTensor` with shape `[A1, ..., A3, V1, V2]`, see
+      `upsample_transposed_convolution`. `pool_map` can also be a
+      `utils.PreparedGraph` returned by `utils.prepare_graph_unpooling_input`.
+    sizes: An `int` tensor of shape `[A1, ..., A3, 2]` indicating the true
+      input sizes in case of padding (`sizes=None` indicates no padding).
+      `sizes` is ignored if `pool_map` is a `utils.PreparedGraph`.
+    kernel_size: The kernel size for transposed convolution.
+    name: A name for this op. Defaults to 'graph_pooling_prepare_upsample_plan'.
+
+  Returns:
+    An `UpsamplePlan`, which can be passed as the `pool_map` argument of
+    `upsample_transposed_convolution`.
 
-    return pool(data, pool_map_normalize, sizes)
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(
+      name, 'graph_pooling_prepare_upsample_plan', [pool_map, sizes]):
+    if isinstance(pool_map, utils.PreparedGraph):
+      graph = pool_map
+    else:
+      graph = utils.prepare_graph_unpooling_input(pool_map, sizes)
+
+    # Selects 'kernel_size' neighbors for each input vertex: the first
+    # 'kernel_size' entries of its row, the last entry being repeated for rows
+    # with fewer entries. The vertices of empty rows are not mapped.
+    row_lengths = graph.row_splits[1:] - graph.row_splits[:-1]
+    offsets = tf.minimum(
+        tf.range(kernel_size, dtype=tf.int64),
+        tf.expand_dims(row_lengths - 1, axis=-1))
+    positions = tf.reshape(
+        tf.expand_dims(graph.row_splits[:-1], axis=-1) + offsets, (-1,))
+    is_mapped = tf.reshape(
+        tf.broadcast_to(
+            tf.expand_dims(row_lengths > 0, axis=-1), tf.shape(input=offsets)),
+        (-1,))
+    rows = tf.boolean_mask(
+        tensor=tf.range(tf.size(input=positions, out_type=tf.int64)),
+        mask=is_mapped)
+    destinations = tf.gather(graph.col_ids,
+                             tf.boolean_mask(tensor=positions, mask=is_mapped))
+    order = tf.argsort(destinations, stable=True)
+    return UpsamplePlan(graph, kernel_size, tf.gather(rows, order),
+                        tf.gather(destinations, order))
 
 
 def upsample_transposed_convolution(data,
@@ -219,9 +401,14 @@ def upsample_transposed_convolution(data,
       indices should not be repeated across maps otherwise the output is
       nondeterministic. Specifically, to avoid nondeterminism we must have
       `intersect([a1, ..., an, v_i, :],[a1, ..., a3, v_j, :]) = {}, i != j`.
+      `pool_map` can also be a `utils.PreparedGraph` returned by
+      `utils.prepare_graph_unpooling_input`, or an `UpsamplePlan` returned by
+      `prepare_upsample_plan` for the same `kernel_size`.
     sizes: An `int` tensor of shape `[A1, ..., A3, 2]` indicating the true
       input sizes in case of padding (`sizes=None` indicates no padding):
-      `sizes[A1, ..., A3, 0] <= V1` and `sizes[A1, ..., A3, 1] <= V2`.
+      `sizes[A1, ..., A3, 0] <= V1` and `sizes[A1, ..., A3, 1] <= V2`. `sizes`
+      is ignored if `pool_map` is a `utils.PreparedGraph` or an
+      `UpsamplePlan`.
     kernel_size: The kernel size for transposed convolution.
     transposed_convolution_op: A callable transposed convolution op with the
       form `y = transposed_convolution_op(x)`, where `x` has shape
@@ -241,90 +428,51 @@ def upsample_transposed_convolution(data,
     TypeError: if the input types are invalid.
     TypeError: if `transposed_convolution_op` is not a callable.
     ValueError: if the input dimensions are invalid.
+    ValueError: if `kernel_size` differs from the one of an `UpsamplePlan`.
   """
   #  pyformat: enable
   with tf.compat.v1.name_scope(
       name, 'graph_pooling_upsample_transposed_convolution',
       [data, pool_map, sizes]):
     data = tf.convert_to_tensor(value=data)
-    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
-    if sizes is not None:
-      sizes = tf.convert_to_tensor(value=sizes)
-
-    utils.check_valid_graph_unpooling_input(data, pool_map, sizes)
+    if isinstance(pool_map, UpsamplePlan):
+      plan = pool_map
+      if plan.kernel_size != kernel_size:
+        raise ValueError(
+            "'kernel_size' must be equal to the kernel size of 'pool_map'.")
+      utils.check_valid_prepared_graph_input(data, plan.graph, 'pool_map')
+    elif isinstance(pool_map, utils.PreparedGraph):
+      plan = None
+      utils.check_valid_prepared_graph_input(data, pool_map, 'pool_map')
+    else:
+      plan = None
+      pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=pool_map)
+      if sizes is not None:
+        sizes = tf.convert_to_tensor(value=sizes)
+      utils.check_valid_graph_unpooling_input(data, pool_map, sizes)
     if not callable(transposed_convolution_op):
       raise TypeError("'transposed_convolution_op' must be callable.")
 
-    if sizes is not None:
-      sizes_input, sizes_output = tf.split(sizes, 2, axis=-1)
-      sizes_input = tf.squeeze(sizes_input, axis=-1)
-      sizes_output = tf.squeeze(sizes_output, axis=-1)
-    else:
-      sizes_input = None
-      sizes_output = None
-
-    num_features = tf.compat.v1.dimension_value(data.shape[-1])
-    batched = data.shape.ndims > 2
-    if batched:
-      x_flat, _ = utils.flatten_batch_to_2d(data, sizes_input)
-      pool_map_block_diagonal = utils.convert_to_block_diag_2d(pool_map, sizes)
-    else:
-      x_flat = data
-      pool_map_block_diagonal = pool_map
+    if plan is None:
+      plan = prepare_upsample_plan(pool_map, sizes, kernel_size)
+    graph = plan.graph
+    x_flat = utils.flatten_prepared_graph_input(data, graph)
 
     x_flat = tf.expand_dims(tf.expand_dims(x_flat, 0), 0)
     x_upsample = transposed_convolution_op(x_flat)
 
-    # Map each upsampled vertex into its correct position based on pool_map.
-    # Select 'kernel_size' neighbors for each input vertex. Truncate or repeat
-    # as necessary.
-    ragged = tf.RaggedTensor.from_value_rowids(
-        pool_map_block_diagonal.indices[:, 1],
-        pool_map_block_diagonal.indices[:, 0])
-    # Take up to the first 'kernel_size' entries.
-    ragged_k = ragged[:, :kernel_size]
-    # Fill rows with less than 'kernel_size' entries by repeating the last
-    # entry.
-    last = ragged_k[:, -1:].flat_values
-    num_repeat = kernel_size - ragged_k.row_lengths()
-    sum_num_repeat = tf.reduce_sum(input_tensor=num_repeat)
-    ones_ragged = tf.RaggedTensor.from_row_lengths(
-        tf.ones((sum_num_repeat,), dtype=last.dtype), num_repeat)
-    repeat = ones_ragged * tf.expand_dims(last, -1)
-    padded = tf.concat([ragged_k, repeat], axis=1)
-    pool_map_dense = tf.reshape(padded.flat_values, (-1, kernel_size))
-
-    # Map rows of 'x_upsample' to positions indicated by the
-    # indices 'pool_map_dense'.
-    up_scatter_indices = tf.expand_dims(tf.reshape(pool_map_dense, (-1,)), -1)
-    up_row = tf.reshape(tf.cast(up_scatter_indices, tf.int64), (-1,))
-    up_column = tf.range(tf.shape(input=up_row, out_type=tf.dtypes.int64)[0])
-    scatter_indices = tf.concat(
-        (tf.expand_dims(up_row, -1),
-         tf.expand_dims(up_column, -1)), axis=1)
-
-    scatter_values = tf.ones_like(up_row, dtype=x_upsample.dtype)
-    scatter_shape = tf.reduce_max(input_tensor=scatter_indices, axis=0) + 1
-
-    scatter = tf.SparseTensor(scatter_indices,
-                              scatter_values,
-                              scatter_shape)
-    scatter = tf.sparse.reorder(scatter)
-    row_sum = tf.sparse.reduce_sum(tf.abs(scatter), keepdims=True, axis=-1)
-    row_sum = tf.where(tf.equal(row_sum, 0.), row_sum, 1.0 / row_sum)
-    scatter = row_sum * scatter
-    x_upsample = tf.sparse.sparse_dense_matmul(scatter, x_upsample[0, 0, :, :])
-
-    if batched:
-      if sizes_output is not None:
-        x_upsample = utils.unflatten_2d_to_batch(x_upsample, sizes_output)
-      else:
-        output_shape = tf.concat((tf.shape(input=pool_map)[:-2],
-                                  tf.shape(input=pool_map)[-1:],
-                                  (num_features,)), axis=0)
-        x_upsample = tf.reshape(x_upsample, output_shape)
-
-    return x_upsample
+    # Averages the rows of 'x_upsample' mapped to each upsampled vertex. The
+    # upsampled vertices that are not mapped are set to zero.
+    x_upsample = tf.gather(x_upsample[0, 0, :, :], plan.order)
+    x_upsample = tf.math.segment_mean(
+        data=x_upsample, segment_ids=plan.segment_ids)
+    num_padding = graph.adjacency.dense_shape[1] - tf.shape(
+        input=x_upsample, out_type=tf.int64)[0]
+    x_upsample = tf.pad(
+        tensor=x_upsample, paddings=tf.stack(((0, num_padding), (0, 0))))
+
+    return utils.unflatten_prepared_graph_output(x_upsample, graph)
 
 # API contains all public functions and classes.
 __all__ = export_api.get_functions_and_classes()
@@ -0,0 +1,241 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module implements neighborhood sampling ops for graph convolutions."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.convolution import utils
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import shape
+
+
+def _gather_edges(graph, vertex_ids):
+  """Gathers the positions of the entries of `graph` in the given rows.
+
+  Args:
+    graph: A 2-D `utils.PreparedGraph`.
+    vertex_ids: An `int64` tensor with shape `[N]`.
+
+  Returns:
+    A `RaggedTensor` with shape `[N, None]` containing the positions of the
+    entries of the rows `vertex_ids` in `graph.col_ids`.
+  """
+  starts = tf.gather(graph.row_splits, vertex_ids)
+  limits = tf.gather(graph.row_splits, vertex_ids + 1)
+  return tf.ragged.range(starts, limits)
+
+
+def _sample_neighbors(graph, keys, num_vertices, max_neighbors, seed):
+  """Samples the neighbors of a set of vertices of a batch of subgraphs.
+
+  Args:
+    graph: A 2-D `utils.PreparedGraph`.
+    keys: An `int64` tensor with shape `[N]` identifying vertex `v` of subgraph
+      `b` with `b * num_vertices + v`.
+    num_vertices: The number of vertices in `graph`.
+    max_neighbors: The maximum number of neighbors sampled for each vertex, or
+      `None` to keep all the neighbors.
+    seed: The random seed used to sample the neighbors.
+
+  Returns:
+    An `int64` tensor containing the keys of the sampled neighbors.
+  """
+  positions = _gather_edges(graph, keys % num_vertices)
+  if max_neighbors is not None:
+    # Shuffles the entries of each row by sorting them by row and by a random
+    # key in [0, 1), then keeps the first `max_neighbors` entries per row.
+    row_ids = positions.value_rowids()
+    random_keys = tf.random.uniform(
+        tf.shape(input=row_ids), dtype=tf.float64, seed=seed)
+    order = tf.argsort(tf.cast(row_ids, tf.float64) + random_keys)
+    positions = tf.RaggedTensor.from_row_splits(
+        tf.gather(positions.flat_values, order), positions.row_splits)
+    positions = positions[:, :max_neighbors]
+  batch_ids = tf.gather(keys // num_vertices, positions.value_rowids())
+  return batch_ids * num_vertices + tf.gather(graph.col_ids,
+                                              positions.flat_values)
+
+
+def sample_k_hop_neighborhoods(data,
+                               neighbors,
+                               seeds,
+                               num_hops,
+                               max_neighbors=None,
+                               seed=None,
+                               name=None):
+  #  pyformat: disable
+  """Extracts the k-hop neighborhoods of seed vertices as a batch of subgraphs.
+
+  The output of `L` graph convolution layers at a vertex only depends on the
+  vertices that are at most `L` hops away. This op extracts such neighborhoods
+  from a large graph, for instance a mesh with millions of vertices, such that
+  a network can be trained or evaluated on batches of seed vertices with
+  bounded memory.
+
+  Each subgraph contains the seeds of one row of `seeds` and the vertices
+  reached from them in up to `num_hops` hops, ordered by hop: the seeds come
+  first, in the order given by `seeds`. Its edges are all the edges of
+  `neighbors` between these vertices, with their original weights. Without
+  fan-out limits, the output of up to `num_hops` layers of
+  `graph_convolution.feature_steered_convolution` or
+  `graph_convolution.edge_convolution_template` at the seed vertices is the
+  same on the subgraph as on the full graph.
+
+  The shorthands used below are
+    `V`: The number of vertices in the graph.
+    `C`: The number of channels in the data.
+    `B`: The number of subgraphs.
+    `S`: The number of seed vertices per subgraph.
+    `V'`: The largest number of vertices in a subgraph.
+
+  Args:
+    data: A `float` tensor with shape `[V, C]`.
+    neighbors: A `SparseTensor` with the same type as `data` and with shape
+      `[V, V]` representing vertex neighborhoods, see
+      `graph_convolution.feature_steered_convolution`. `neighbors` can also be
+      a `utils.PreparedGraph` returned by
+      `utils.prepare_graph_convolution_input` for a 2-D `SparseTensor`.
+    seeds: An `int` tensor with shape `[B, S]`, where each row contains
+      distinct vertex indices in `[0, V)`.
+    num_hops: A non-negative `int`, the number of hops.
+    max_neighbors: The maximum number of neighbors randomly sampled for each
+      vertex added at the previous hop, either an `int` for all hops, a list of
+      `num_hops` values, or `None`. A `None` value keeps all the neighbors.
+    seed: The random seed used to sample the neighbors.
+    name: A name for this op. Defaults to
+      `graph_sampling_sample_k_hop_neighborhoods`.
+
+  Returns:
+    data: A `float` tensor with shape `[B, V', C]` containing the features of
+      the vertices of each subgraph, padded with zeros.
+    neighbors: A `SparseTensor` with shape `[B, V', V']` representing the
+      vertex neighborhoods of each subgraph.
+    sizes: An `int32` tensor with shape `[B]` containing the number of vertices
+      of each subgraph.
+    vertex_ids: An `int64` tensor with shape `[B, V']` containing the index in
+      the full graph of each vertex of each subgraph, padded with -1.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions or `num_hops` or `max_neighbors` are
+      invalid.
+  """
+  #  pyformat: enable
+  with tf.compat.v1.name_scope(name,
+                               "graph_sampling_sample_k_hop_neighborhoods",
+                               [data, neighbors, seeds]):
+    data = tf.convert_to_tensor(value=data)
+    if isinstance(neighbors, utils.PreparedGraph):
+      graph = neighbors
+      utils.check_valid_prepared_graph_input(data, graph, "neighbors")
+    else:
+      neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+          value=neighbors)
+      utils.check_valid_graph_convolution_input(data, neighbors, None)
+      graph = None
+    seeds = tf.convert_to_tensor(value=seeds)
+
+    if not seeds.dtype.is_integer:
+      raise TypeError("'seeds' must have an integer type.")
+    shape.check_static(tensor=data, tensor_name="data", has_rank=2)
+    shape.check_static(tensor=seeds, tensor_name="seeds", has_rank=2)
+    if num_hops < 0:
+      raise ValueError("'num_hops' must be non-negative.")
+    if max_neighbors is None or isinstance(max_neighbors, int):
+      max_neighbors = (max_neighbors,) * num_hops
+    elif len(max_neighbors) != num_hops:
+      raise ValueError("'max_neighbors' must have 'num_hops' elements.")
+
+    if graph is None:
+      graph = utils.prepare_graph_convolution_input(neighbors)
+    num_vertices = graph.adjacency.dense_shape[0]
+
+    # Vertex `v` of subgraph `b` is identified by the key `b * V + v`, such
+    # that all the subgraphs are expanded at once.
+    seeds = tf.cast(seeds, tf.int64)
+    seeds_shape = tf.shape(input=seeds, out_type=tf.int64)
+    batch_size = seeds_shape[0]
+    batch_ids = tf.broadcast_to(
+        tf.expand_dims(tf.range(batch_size), axis=-1), seeds_shape)
+    visited, _ = tf.unique(tf.reshape(batch_ids * num_vertices + seeds, (-1,)))
+    frontier = visited
+    for hop, hop_max_neighbors in enumerate(max_neighbors):
+      hop_seed = None if seed is None else seed + hop
+      reached = _sample_neighbors(graph, frontier, num_vertices,
+                                  hop_max_neighbors, hop_seed)
+      num_visited = tf.size(input=visited)
+      # `tf.unique` keeps the order of the first occurrences, so the vertices
+      # found at this hop are appended after the visited ones.
+      visited, _ = tf.unique(tf.concat((visited, reached), axis=0))
+      frontier = visited[num_visited:]
+
+    # Groups the vertices by subgraph, keeping their order within a subgraph.
+    batch_ids = visited // num_vertices
+    visited = tf.gather(visited, tf.argsort(batch_ids, stable=True))
+    batch_ids = visited // num_vertices
+    vertex_ids = visited % num_vertices
+    sizes = tf.math.unsorted_segment_sum(
+        data=tf.ones_like(batch_ids),
+        segment_ids=batch_ids,
+        num_segments=batch_size)
+    local_ids = tf.range(tf.size(input=visited, out_type=tf.int64)) - tf.gather(
+        tf.cumsum(sizes, exclusive=True), batch_ids)
+    max_size = tf.reduce_max(input_tensor=sizes)
+
+    # Keeps the edges of the full graph between vertices of the same subgraph,
+    # found by binary search in the sorted keys.
+    positions = _gather_edges(graph, vertex_ids)
+    edge_rows = positions.value_rowids()
+    edge_batch_ids = tf.gather(batch_ids, edge_rows)
+    edge_keys = edge_batch_ids * num_vertices + tf.gather(
+        graph.col_ids, positions.flat_values)
+    key_order = tf.argsort(visited)
+    sorted_keys = tf.gather(visited, key_order)
+    found = tf.minimum(
+        tf.searchsorted(sorted_keys, edge_keys, out_type=tf.int64),
+        tf.size(input=sorted_keys, out_type=tf.int64) - 1)
+    is_edge = tf.equal(tf.gather(sorted_keys, found), edge_keys)
+    edge_indices = tf.stack(
+        (edge_batch_ids, tf.gather(local_ids, edge_rows),
+         tf.gather(local_ids, tf.gather(key_order, found))),
+        axis=-1)
+    edge_indices = tf.boolean_mask(tensor=edge_indices, mask=is_edge)
+    edge_values = tf.boolean_mask(
+        tensor=tf.gather(graph.adjacency.values, positions.flat_values),
+        mask=is_edge)
+    sampled_neighbors = tf.sparse.reorder(
+        tf.SparseTensor(edge_indices, edge_values,
+                        tf.stack((batch_size, max_size, max_size))))
+
+    output_indices = tf.stack((batch_ids, local_ids), axis=-1)
+    num_channels = tf.shape(input=data, out_type=tf.int64)[-1]
+    sampled_data = tf.scatter_nd(
+        indices=output_indices,
+        updates=tf.gather(data, vertex_ids),
+        shape=tf.stack((batch_size, max_size, num_channels)))
+    sampled_vertex_ids = tf.scatter_nd(
+        indices=output_indices,
+        updates=vertex_ids + 1,
+        shape=tf.stack((batch_size, max_size))) - 1
+
+    return (sampled_data, sampled_neighbors, tf.cast(sizes, tf.int32),
+            sampled_vertex_ids)
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
@@ -0,0 +1,243 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for graph construction ops."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+import tensorflow_graphics.geometry.convolution.graph_construction as gcon
+import tensorflow_graphics.geometry.convolution.graph_convolution as gc
+from tensorflow_graphics.util import test_case
+
+
+def _squared_distances(points):
+  """Computes the squared distances between all pairs of points."""
+  differences = points[..., :, np.newaxis, :] - points[..., np.newaxis, :, :]
+  return np.sum(differences * differences, axis=-1)
+
+
+def _knn_graph_numpy(points, sizes, num_neighbors, include_self):
+  """Builds the dense row-normalized kNN graphs of a batch of point clouds."""
+  batch_shape = points.shape[:-2]
+  num_vertices = points.shape[-2]
+  points = np.reshape(points, (-1, num_vertices, points.shape[-1]))
+  sizes = np.reshape(sizes, (-1,))
+  neighbors = np.zeros((points.shape[0], num_vertices, num_vertices))
+  for batch, size in enumerate(sizes):
+    distances = _squared_distances(points[batch, :size])
+    if not include_self:
+      np.fill_diagonal(distances, np.inf)
+    k = min(num_neighbors, size - (0 if include_self else 1))
+    cols = np.argsort(distances, axis=-1)[:, :k]
+    neighbors[batch, np.arange(size)[:, np.newaxis], cols] = 1.0 / max(k, 1)
+  return np.reshape(neighbors, batch_shape + (num_vertices, num_vertices))
+
+
+def _radius_graph_numpy(points, sizes, radius, include_self):
+  """Builds the dense row-normalized radius graphs of a batch of points."""
+  num_vertices = points.shape[-2]
+  adjacency = (_squared_distances(points) <= radius * radius).astype(np.float64)
+  valid = np.arange(num_vertices) < np.expand_dims(sizes, axis=-1)
+  adjacency *= valid[..., :, np.newaxis] * valid[..., np.newaxis, :]
+  if not include_self:
+    adjacency *= 1.0 - np.eye(num_vertices)
+  degree = np.sum(adjacency, axis=-1, keepdims=True)
+  return adjacency / np.maximum(degree, 1.0)
+
+
+def _random_points(batch_shape, num_vertices, num_dimensions=3):
+  """Creates random points and sizes."""
+  points = np.random.uniform(size=batch_shape + (num_vertices, num_dimensions))
+  sizes = np.random.randint(1, num_vertices + 1, size=batch_shape)
+  return points.astype(np.float32), sizes.astype(np.int32)
+
+
+class GraphConstructionKnnGraphTests(test_case.TestCase):
+
+  @parameterized.parameters(
+      ("'points' must have a float type.", np.int32, np.int32),
+      ("'sizes' must have an integer type.", np.float32, np.float32),
+  )
+  def test_knn_graph_exception_raised_types(self, err_msg, points_type,
+                                            sizes_type):
+    """Check the type errors for invalid input types."""
+    points = np.ones(shape=(2, 5, 3), dtype=points_type)
+    sizes = np.ones(shape=(2,), dtype=sizes_type)
+
+    with self.assertRaisesRegexp(TypeError, err_msg):
+      gcon.knn_graph(points, sizes, num_neighbors=2)
+
+  @parameterized.parameters(
+      ("must have a rank greater than 1", (3,), None, 2),
+      ("must have a rank of 1", (2, 5, 3), (2, 1), 2),
+      ("Not all batch dimensions are identical.", (2, 5, 3), (3,), 2),
+      ("'num_neighbors' must be positive.", (2, 5, 3), (2,), 0),
+  )
+  def test_knn_graph_exception_raised_shapes(self, err_msg, points_shape,
+                                             sizes_shape, num_neighbors):
+    """Check that invalid input shapes trigger the right exceptions."""
+    points = np.ones(shape=points_shape, dtype=np.float32)
+    sizes = None if sizes_shape is None else np.ones(
+        shape=sizes_shape, dtype=np.int32)
+
+    with self.assertRaisesRegexp(ValueError, err_msg):
+      gcon.knn_graph(points, sizes, num_neighbors)
+
+  @parameterized.parameters(
+      ((), 20, 4, True, 1024),
+      ((3,), 30, 5, False, 7),
+      ((2, 3), 17, 3, True, 4),
+      ((2,), 10, 50, True, 3),
+  )
+  def test_knn_graph_preset(self, batch_shape, num_vertices, num_neighbors,
+                            include_self, block_size):
+    """Check that the graphs match a brute force computation."""
+    points, sizes = _random_points(batch_shape, num_vertices)
+    if not batch_shape:
+      sizes = np.array(num_vertices)
+
+    neighbors = gcon.knn_graph(
+        points, sizes if batch_shape else None, num_neighbors, include_self,
+        block_size)
+
+    self.assertAllEqual(neighbors.dense_shape,
+                        batch_shape + (num_vertices, num_vertices))
+    self.assertAllEqual(tf.sparse.reorder(neighbors).indices,
+                        neighbors.indices)
+    self.assertAllClose(
+        tf.sparse.to_dense(neighbors),
+        _knn_graph_numpy(points, sizes, num_neighbors, include_self))
+
+  def test_knn_graph_convolution(self):
+    """Check that the graph can be used by the graph convolution ops."""
+    points, sizes = _random_points((2,), 12)
+    neighbors = gcon.knn_graph(points, sizes, num_neighbors=3)
+
+    convolved = gc.edge_convolution_template(
+        points, neighbors, sizes, lambda x, y: x - y, "weighted", dict())
+    dense_neighbors = _knn_graph_numpy(points, sizes, 3, True)
+    expected = points - np.matmul(dense_neighbors, points)
+    expected *= np.expand_dims(
+        np.arange(12) < np.expand_dims(sizes, axis=-1), axis=-1)
+
+    self.assertAllClose(convolved, expected)
+
+
+class GraphConstructionRadiusGraphTests(test_case.TestCase):
+
+  @parameterized.parameters(
+      ("'radius' must be positive.", 0.0, 1024),
+      ("'block_size' must be positive.", 1.0, 0),
+  )
+  def test_radius_graph_exception_raised(self, err_msg, radius, block_size):
+    """Check the errors for invalid parameters."""
+    points = np.ones(shape=(2, 5, 3), dtype=np.float32)
+
+    with self.assertRaisesRegexp(ValueError, err_msg):
+      gcon.radius_graph(points, None, radius, block_size=block_size)
+
+  @parameterized.parameters(
+      ((), 20, 0.3, True, 1024, 3),
+      ((3,), 30, 0.25, False, 7, 3),
+      ((2, 3), 17, 0.5, True, 4, 2),
+      ((2,), 10, 2.0, False, 3, 3),
+  )
+  def test_radius_graph_preset(self, batch_shape, num_vertices, radius,
+                               include_self, block_size, num_dimensions):
+    """Check that both search methods match a brute force computation."""
+    points, sizes = _random_points(batch_shape, num_vertices, num_dimensions)
+    if not batch_shape:
+      sizes = np.array(num_vertices)
+    expected = _radius_graph_numpy(points, sizes, radius, include_self)
+
+    for use_grid in (False, True):
+      with self.subTest(name="use_grid_%s" % use_grid):
+        neighbors = gcon.radius_graph(
+            points, sizes if batch_shape else None, radius, include_self,
+            use_grid, block_size)
+
+        self.assertAllEqual(tf.sparse.reorder(neighbors).indices,
+                            neighbors.indices)
+        self.assertAllClose(tf.sparse.to_dense(neighbors), expected)
+
+  def test_radius_graph_grid_large_extent(self):
+    """Check the grid search when a fine grid would overflow the cell keys."""
+    points, sizes = _random_points((4,), 16)
+    points = points.astype(np.float64)
+    points[:, 0] = 1e12
+    expected = _radius_graph_numpy(points, sizes, 0.3, True)
+
+    neighbors = gcon.radius_graph(points, sizes, 0.3, use_grid=True)
+
+    self.assertAllClose(tf.sparse.to_dense(neighbors), expected)
+
+  def test_radius_graph_convolution(self):
+    """Check that the graph can be used by the feature steered convolution."""
+    points, sizes = _random_points((2,), 12)
+    neighbors = gcon.radius_graph(points, sizes, radius=0.5, use_grid=True)
+    var_u = np.random.uniform(size=(3, 2)).astype(np.float32)
+    var_v = np.random.uniform(size=(3, 2)).astype(np.float32)
+    var_c = np.zeros((2,), dtype=np.float32)
+    var_w = [np.random.uniform(size=(3, 4)).astype(np.float32)] * 2
+    var_b = np.zeros((4,), dtype=np.float32)
+
+    convolved = gc.feature_steered_convolution(points, neighbors, sizes, var_u,
+                                               var_v, var_c, var_w, var_b)
+    expected = gc.feature_steered_convolution(
+        points,
+        tf.sparse.from_dense(_radius_graph_numpy(points, sizes, 0.5,
+                                                 True).astype(np.float32)),
+        sizes, var_u, var_v, var_c, var_w, var_b)
+
+    self.assertAllClose(convolved, expected)
+
+
+class GraphConstructionBenchmark(tf.test.Benchmark):
+  """Benchmarks the blocked and grid based graph construction."""
+
+  def _benchmark(self, method, batch_size, num_vertices, **kwargs):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      # A variable prevents the graph from being constant folded.
+      points = tf.compat.v1.Variable(
+          np.random.uniform(size=(batch_size, num_vertices,
+                                  3)).astype(np.float32))
+      neighbors = getattr(gcon, method)(points, None, **kwargs)
+      sess.run(tf.compat.v1.global_variables_initializer())
+      name = "%s_B%d_V%d" % (method, batch_size, num_vertices)
+      if kwargs.get("use_grid"):
+        name += "_grid"
+      self.run_op_benchmark(
+          sess, neighbors.values, min_iters=3, name=name)
+
+  def benchmark_knn_graph(self):
+    for batch_size, num_vertices in ((8, 2048), (1, 32768)):
+      self._benchmark("knn_graph", batch_size, num_vertices, num_neighbors=16)
+
+  def benchmark_radius_graph(self):
+    for batch_size, num_vertices in ((8, 2048), (1, 32768)):
+      # A radius with about 16 neighbors per vertex.
+      radius = (16.0 * 3.0 / (4.0 * np.pi * num_vertices))**(1.0 / 3.0)
+      for use_grid in (False, True):
+        self._benchmark(
+            "radius_graph", batch_size, num_vertices, radius=radius,
+            use_grid=use_grid)
+
+
+if __name__ == "__main__":
+  test_case.main()
@@ -24,6 +24,7 @@ import numpy as np
 import tensorflow as tf
 
 import tensorflow_graphics.geometry.convolution.graph_convolution as gc
+from tensorflow_graphics.geometry.convolution import utils
 from tensorflow_graphics.util import test_case
 
 
@@ -493,6 +494,175 @@ class GraphConvolutionTestFeatureSteeredConvolutionTests(test_case.TestCase):
 
     self.assert_jacobian_is_correct(data, data_init, y)
 
+  @parameterized.parameters(
+      (0, 6, 3, 4, 1, False),
+      (0, 10, 5, 2, 8, False),
+      (3, 6, 1, 4, 5, False),
+      (2, 12, 4, 3, 16, True),
+  )
+  def test_feature_steered_convolution_fused_matches_loop(
+      self, batch_size, num_vertices, in_channels, out_channels,
+      num_weight_matrices, padding):
+    """Test that the fused mode gives the same outputs and gradients."""
+    random_data = _random_data(
+        batch_size,
+        num_vertices,
+        in_channels,
+        padding,
+        only_self_edges=False,
+        data_type=np.float64,
+        neighbors_type=np.float64)
+    data = tf.convert_to_tensor(value=random_data[0])
+    neighbors = random_data[1]
+    sizes = None if not padding else random_data[2]
+    variables = _random_variables(
+        in_channels, out_channels, num_weight_matrices, dtype=np.float64)
+
+    def _convolve(fused):
+      with tf.GradientTape() as tape:
+        tape.watch(data)
+        tape.watch(variables)
+        y = gc.feature_steered_convolution(
+            data, neighbors, sizes, *variables, fused=fused)
+        loss = tf.reduce_sum(input_tensor=tf.sin(y))
+      return y, tape.gradient(loss, (data,) + variables)
+
+    y_loop, gradients_loop = _convolve(fused=False)
+    y_fused, gradients_fused = _convolve(fused=True)
+
+    self.assertAllClose(y_loop, y_fused)
+    for gradient_loop, gradient_fused in zip(gradients_loop, gradients_fused):
+      self.assertAllClose(gradient_loop, gradient_fused)
+
+  @parameterized.parameters(
+      (0, 6, 3, 4, 5, False),
+      (2, 8, 4, 2, 3, False),
+      (4, 10, 3, 3, 2, True),
+  )
+  def test_feature_steered_convolution_prepared_graph(
+      self, batch_size, num_vertices, in_channels, out_channels,
+      num_weight_matrices, padding):
+    """Test that a prepared graph gives the same result as the raw inputs."""
+    random_data = _random_data(
+        batch_size,
+        num_vertices,
+        in_channels,
+        padding,
+        only_self_edges=False)
+    data, neighbors = random_data[:2]
+    sizes = None if not padding else random_data[2]
+    variables = _random_variables(in_channels, out_channels,
+                                  num_weight_matrices)
+    graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    padded_graph = utils.prepare_padded_graph_convolution_input(
+        neighbors, sizes, max_num_edges=num_vertices * num_vertices)
+
+    y_expected = gc.feature_steered_convolution(data, neighbors, sizes,
+                                                *variables)
+
+    with self.subTest(name="prepared_graph"):
+      y = gc.feature_steered_convolution(data, graph, None, *variables)
+      self.assertAllClose(y, y_expected)
+
+    with self.subTest(name="padded_graph"):
+      y = gc.feature_steered_convolution(data, padded_graph, None, *variables)
+      self.assertAllClose(y, y_expected)
+
+  @parameterized.parameters((0, 6, False), (3, 5, True))
+  def test_feature_steered_convolution_padded_graph_xla(
+      self, batch_size, num_vertices, padding):
+    """Test that the ops on a padded graph can be compiled with XLA."""
+    if not tf.executing_eagerly():
+      self.skipTest("XLA compilation is tested with a tf.function.")
+    random_data = _random_data(
+        batch_size, num_vertices, 3, padding, only_self_edges=False)
+    data, neighbors = random_data[:2]
+    sizes = None if not padding else random_data[2]
+    variables = _random_variables(3, 4, 2)
+    graph = utils.prepare_padded_graph_convolution_input(
+        neighbors, sizes, max_num_edges=num_vertices * num_vertices)
+
+    @tf.function(jit_compile=True)
+    def _convolution(data):
+      return gc.feature_steered_convolution(data, graph, None, *variables)
+
+    y = _convolution(data)
+    y_expected = gc.feature_steered_convolution(data, neighbors, sizes,
+                                                *variables)
+
+    self.assertAllClose(y, y_expected)
+
+  @parameterized.parameters((0, 6), (3, 5))
+  def test_feature_steered_convolution_unordered_neighbors(
+      self, batch_size, num_vertices):
+    """Test that the entries of `neighbors` can be in any order."""
+    data, neighbors = _random_data(
+        batch_size, num_vertices, 3, padding=False, only_self_edges=False)
+    variables = _random_variables(3, 4, 2)
+    reversed_neighbors = tf.SparseTensor(
+        tf.reverse(neighbors.indices, axis=(0,)),
+        tf.reverse(neighbors.values, axis=(0,)), neighbors.dense_shape)
+
+    y = gc.feature_steered_convolution(data, reversed_neighbors, None,
+                                       *variables)
+    y_expected = gc.feature_steered_convolution(data, neighbors, None,
+                                                *variables)
+
+    self.assertAllClose(y, y_expected)
+
+  @parameterized.parameters(
+      (0, 6, 3, 4, 5, 30.0, np.float16, 5e-2),
+      (2, 8, 4, 2, 8, 30.0, np.float16, 5e-2),
+      (2, 8, 4, 2, 8, 1e3, np.float32, 1e-4),
+      (2, 8, 4, 2, 8, 1e3, np.float64, 1e-6),
+  )
+  def test_feature_steered_convolution_large_logits(self, batch_size,
+                                                    num_vertices, in_channels,
+                                                    out_channels,
+                                                    num_weight_matrices,
+                                                    scale, dtype, rtol):
+    """Test that large edge logits do not overflow the softmax."""
+    data, neighbors = _random_data(
+        batch_size,
+        num_vertices,
+        in_channels,
+        padding=False,
+        only_self_edges=False,
+        data_type=np.float64,
+        neighbors_type=np.float64)
+    # Without subtracting the maximum logit, `exp` overflows for logits in
+    # the order of 1e1 in float16, and 1e3 in float32 and float64.
+    data *= scale
+    u, v, c, w, b = _random_variables(
+        in_channels, out_channels, num_weight_matrices, dtype=np.float64)
+    y_expected = gc.feature_steered_convolution(
+        data=data,
+        neighbors=neighbors,
+        sizes=None,
+        var_u=u,
+        var_v=v,
+        var_c=c,
+        var_w=w,
+        var_b=b)
+    neighbors_cast = tf.SparseTensor(neighbors.indices,
+                                     tf.cast(neighbors.values, dtype),
+                                     neighbors.dense_shape)
+    u, v, c, w, b = (tf.cast(i, dtype) for i in (u, v, c, w, b))
+
+    y = gc.feature_steered_convolution(
+        data=data.astype(dtype),
+        neighbors=neighbors_cast,
+        sizes=None,
+        var_u=u,
+        var_v=v,
+        var_c=c,
+        var_w=w,
+        var_b=b)
+
+    self.assertAllEqual(tf.math.is_finite(y_expected),
+                        tf.ones_like(y_expected, dtype=tf.bool))
+    self.assertAllClose(y, tf.cast(y_expected, dtype), rtol=rtol)
+
 
 class EdgeConvolutionTemplateTests(test_case.TestCase):
 
@@ -698,6 +868,41 @@ class EdgeConvolutionTemplateTests(test_case.TestCase):
 
     self.assert_jacobian_is_correct(data, data_init, y)
 
+  @parameterized.parameters(
+      (0, 6, 3, False, "weighted"),
+      (2, 8, 4, False, "max"),
+      (4, 10, 3, True, "weighted"),
+      (4, 10, 3, True, "max"),
+  )
+  def test_edge_convolution_template_prepared_graph(self, batch_size,
+                                                    num_vertices, in_channels,
+                                                    padding, reduction):
+    """Test that a prepared graph gives the same result as the raw inputs."""
+    random_data = _random_data(
+        batch_size,
+        num_vertices,
+        in_channels,
+        padding,
+        only_self_edges=False)
+    data, neighbors = random_data[:2]
+    sizes = None if not padding else random_data[2]
+    graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    padded_graph = utils.prepare_padded_graph_convolution_input(
+        neighbors, sizes, max_num_edges=num_vertices * num_vertices)
+
+    y_expected = gc.edge_convolution_template(
+        data, neighbors, sizes, self._pass_through, reduction, dict())
+
+    with self.subTest(name="prepared_graph"):
+      y = gc.edge_convolution_template(data, graph, None, self._pass_through,
+                                       reduction, dict())
+      self.assertAllClose(y, y_expected)
+
+    with self.subTest(name="padded_graph"):
+      y = gc.edge_convolution_template(data, padded_graph, None,
+                                       self._pass_through, reduction, dict())
+      self.assertAllClose(y, y_expected)
+
   def test_edge_convolution_template_preset_max(self):
     data = np.array(((1, 2), (3, 4), (5, 6), (7, 8)), np.float32)
     neighbors = np.array(
@@ -825,5 +1030,230 @@ class EdgeConvolutionTemplateTests(test_case.TestCase):
     self.assertAllClose(data_curvature, np.ones(shape=(num_vertices, 1)))
 
 
+def _graph_attention_numpy(data, neighbors, var_w, var_a, var_b,
+                           concatenate_heads):
+  """Computes a graph attention convolution with dense numpy arrays."""
+  num_heads, _, num_channels = var_w.shape
+  x_w = np.einsum("vc,hcd->vhd", data, var_w)
+  scores_vertex = np.einsum("vhd,hd->vh", x_w, var_a[:, :num_channels])
+  scores_neighbor = np.einsum("vhd,hd->vh", x_w, var_a[:, num_channels:])
+  logits = scores_vertex[:, np.newaxis, :] + scores_neighbor[np.newaxis, :, :]
+  logits = np.where(logits > 0.0, logits, 0.2 * logits)
+  logits = np.where(neighbors[:, :, np.newaxis] != 0.0, logits, -np.inf)
+  weights = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+  weights /= np.sum(weights, axis=1, keepdims=True)
+  y = np.einsum("ijh,jhd->ihd", weights, x_w)
+  if concatenate_heads:
+    y = np.reshape(y, (-1, num_heads * num_channels))
+  else:
+    y = np.mean(y, axis=1)
+  return y + var_b
+
+
+class GraphAttentionConvolutionTests(test_case.TestCase):
+
+  def _random_variables(self, in_channels, out_channels, num_heads,
+                        concatenate_heads, dtype=np.float32):
+    """Creates random variables for graph_attention_convolution."""
+    var_w = np.random.uniform(
+        -1.0, 1.0, size=(num_heads, in_channels, out_channels)).astype(dtype)
+    var_a = np.random.uniform(
+        -1.0, 1.0, size=(num_heads, 2 * out_channels)).astype(dtype)
+    bias_channels = num_heads * out_channels if concatenate_heads else (
+        out_channels)
+    var_b = np.random.uniform(size=(bias_channels,)).astype(dtype)
+    return var_w, var_a, var_b
+
+  @parameterized.parameters(
+      ("must have a rank of 3", (2, 3), (2, 4), (4,)),
+      ("must have a rank of 2", (2, 3, 2), (4,), (4,)),
+      ("must have the same number of dimensions", (2, 4, 2), (2, 4), (4,)),
+      ("must have the same number of dimensions", (2, 3, 2), (3, 4), (4,)),
+      ("'var_a' must have twice as many channels", (2, 3, 2), (2, 2), (4,)),
+  )
+  def test_graph_attention_convolution_exception_raised_shapes(
+      self, error_msg, var_w_shape, var_a_shape, var_b_shape):
+    """Check that invalid variable shapes trigger the right exceptions."""
+    data, neighbors = _dummy_data(1, 5, 3)
+
+    with self.assertRaisesRegexp(ValueError, error_msg):
+      gc.graph_attention_convolution(
+          data, neighbors, None, np.ones(var_w_shape, dtype=np.float32),
+          np.ones(var_a_shape, dtype=np.float32),
+          np.ones(var_b_shape, dtype=np.float32))
+
+  @parameterized.parameters(
+      (0, 6, 3, 4, 2, True, False),
+      (2, 8, 4, 3, 3, False, False),
+      (3, 10, 2, 5, 1, True, True),
+      (2, 7, 3, 2, 4, False, True),
+  )
+  def test_graph_attention_convolution_random(self, batch_size, num_vertices,
+                                              in_channels, out_channels,
+                                              num_heads, concatenate_heads,
+                                              padding):
+    """Check the output against a dense implementation of the attention."""
+    random_data = _random_data(
+        batch_size, num_vertices, in_channels, padding, only_self_edges=False)
+    data, neighbors = random_data[:2]
+    sizes = None if not padding else random_data[2]
+    variables = self._random_variables(in_channels, out_channels, num_heads,
+                                       concatenate_heads)
+    neighbors_dense = self.evaluate(tf.sparse.to_dense(neighbors))
+
+    y = gc.graph_attention_convolution(
+        data, neighbors, sizes, *variables,
+        concatenate_heads=concatenate_heads)
+
+    if batch_size == 0:
+      y_true = _graph_attention_numpy(data, neighbors_dense, *variables,
+                                      concatenate_heads=concatenate_heads)
+    else:
+      y_true = np.zeros(y.shape, dtype=np.float32)
+      for batch in range(batch_size):
+        size = num_vertices if sizes is None else sizes[batch]
+        y_true[batch, :size] = _graph_attention_numpy(
+            data[batch, :size], neighbors_dense[batch, :size, :size],
+            *variables, concatenate_heads=concatenate_heads)
+    self.assertAllClose(y, y_true)
+
+  def test_graph_attention_convolution_prepared_graph(self):
+    """Check that prepared and padded graphs give the same result."""
+    data, neighbors, sizes = _random_data(
+        3, 8, 4, padding=True, only_self_edges=False)
+    variables = self._random_variables(4, 3, 2, concatenate_heads=True)
+    graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    padded_graph = utils.prepare_padded_graph_convolution_input(
+        neighbors, sizes, max_num_edges=64)
+
+    y_expected = gc.graph_attention_convolution(data, neighbors, sizes,
+                                                *variables)
+
+    with self.subTest(name="prepared_graph"):
+      y = gc.graph_attention_convolution(data, graph, None, *variables)
+      self.assertAllClose(y, y_expected)
+
+    with self.subTest(name="padded_graph"):
+      y = gc.graph_attention_convolution(data, padded_graph, None, *variables)
+      self.assertAllClose(y, y_expected)
+
+  @parameterized.parameters((True,), (False,))
+  def test_graph_attention_convolution_jacobian_random(self,
+                                                       concatenate_heads):
+    """Test the jacobian for random input data."""
+    data_init, neighbors, sizes = _random_data(
+        2, 6, 3, padding=True, only_self_edges=False, data_type=np.float64,
+        neighbors_type=np.float64)
+    variables = self._random_variables(
+        3, 2, 2, concatenate_heads, dtype=np.float64)
+    data = tf.convert_to_tensor(value=data_init)
+
+    y = gc.graph_attention_convolution(
+        data, neighbors, sizes, *variables,
+        concatenate_heads=concatenate_heads)
+
+    self.assert_jacobian_is_correct(data, data_init, y)
+
+
+def _random_benchmark_graph(num_vertices, num_neighbors):
+  """Create a random 2-D neighborhood `SparseTensor` with self edges."""
+  rows = np.repeat(np.arange(num_vertices), num_neighbors + 1)
+  columns = np.random.randint(
+      num_vertices, size=(num_vertices, num_neighbors + 1))
+  columns[:, 0] = np.arange(num_vertices)
+  keys = np.unique(rows * num_vertices + columns.reshape(-1))
+  rows, columns = np.divmod(keys, num_vertices)
+  degree = np.bincount(rows, minlength=num_vertices)
+  values = (1.0 / degree[rows]).astype(np.float32)
+  return tf.SparseTensor(
+      np.stack((rows, columns), axis=-1), values,
+      (num_vertices, num_vertices))
+
+
+class FeatureSteeredConvolutionBenchmark(tf.test.Benchmark):
+  """Benchmarks the fused and the looped multi-kernel paths."""
+
+  def _benchmark(self, num_vertices, num_neighbors, in_channels,
+                 num_weight_matrices, fused):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      neighbors = _random_benchmark_graph(num_vertices, num_neighbors)
+      data = tf.Variable(
+          np.random.uniform(size=(num_vertices,
+                                  in_channels)).astype(np.float32))
+      # Variables prevent the benchmarked ops from being constant folded.
+      variables = [
+          tf.Variable(variable) for variable in _random_variables(
+              in_channels, in_channels, num_weight_matrices)
+      ]
+      y = gc.feature_steered_convolution(
+          data, neighbors, None, *variables, fused=fused)
+      gradients = tf.gradients(ys=y, xs=[data] + variables)
+      sess.run(tf.compat.v1.global_variables_initializer())
+      num_edges = int(neighbors.values.shape[0])
+      self.run_op_benchmark(
+          sess,
+          gradients,
+          min_iters=10,
+          name="feature_steered_convolution_%s_W%d_C%d_E%d" %
+          ("fused" if fused else "loop", num_weight_matrices, in_channels,
+           num_edges),
+          extras={"num_edges": num_edges})
+
+  def benchmark_feature_steered_convolution(self):
+    for num_neighbors, in_channels, num_weight_matrices, fused in (
+        itertools.product((6, 24), (16, 64), (1, 4, 8, 16), (False, True))):
+      self._benchmark(10000, num_neighbors, in_channels, num_weight_matrices,
+                      fused)
+
+
+class PaddedGraphConvolutionBenchmark(tf.test.Benchmark):
+  """Benchmarks a training step on padded graphs with and without XLA."""
+
+  def _benchmark(self, batch_size, num_vertices, num_neighbors, num_channels,
+                 jit_compile):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      neighbors = tf.sparse.concat(
+          axis=0,
+          sp_inputs=[
+              _random_benchmark_graph(num_vertices, num_neighbors)
+              for _ in range(batch_size)
+          ])
+      neighbors = tf.sparse.reshape(
+          neighbors, (batch_size, num_vertices, num_vertices))
+      graph = utils.prepare_padded_graph_convolution_input(
+          neighbors, None, max_num_edges=num_vertices * (num_neighbors + 1))
+      graph = utils.PaddedGraph(*sess.run(graph[:-1]),
+                                output_shape=graph.output_shape)
+      data = tf.Variable(
+          np.random.uniform(size=(batch_size, num_vertices,
+                                  num_channels)).astype(np.float32))
+      variables = [
+          tf.Variable(variable) for variable in _random_variables(
+              num_channels, num_channels, 4)
+      ]
+
+      @tf.function(jit_compile=jit_compile)
+      def _train_step():
+        with tf.GradientTape() as tape:
+          y = gc.feature_steered_convolution(data, graph, None, *variables)
+          y = gc.feature_steered_convolution(y, graph, None, *variables)
+          loss = tf.reduce_sum(input_tensor=y)
+        return tape.gradient(loss, [data] + variables)
+
+      gradients = _train_step()
+      sess.run(tf.compat.v1.global_variables_initializer())
+      self.run_op_benchmark(
+          sess,
+          gradients,
+          min_iters=10,
+          name="padded_feature_steered_convolution_%s_B%d_V%d" %
+          ("xla" if jit_compile else "default", batch_size, num_vertices))
+
+  def benchmark_padded_feature_steered_convolution(self):
+    for batch_size, num_vertices in ((8, 1000), (2, 10000)):
+      for jit_compile in (False, True):
+        self._benchmark(batch_size, num_vertices, 6, 16, jit_compile)
+
+
 if __name__ == "__main__":
   test_case.main()
@@ -23,6 +23,7 @@ import numpy as np
 import tensorflow as tf
 
 import tensorflow_graphics.geometry.convolution.graph_pooling as gp
+from tensorflow_graphics.geometry.convolution import utils
 from tensorflow_graphics.geometry.convolution.tests import utils_test
 from tensorflow_graphics.util import test_case
 
@@ -155,6 +156,74 @@ class GraphPoolingTestPoolTests(test_case.TestCase):
     self.assertAllClose(pooled_max, max_true)
     self.assertAllClose(pooled_weighted, max_weighted)
 
+  @parameterized.parameters('max', 'weighted')
+  def test_pool_padded_graph_xla(self, algorithm):
+    """Tests that pooling on a padded graph can be compiled with XLA."""
+    if not tf.executing_eagerly():
+      self.skipTest('XLA compilation is tested with a tf.function.')
+    data = np.random.uniform(size=(2, 3, 2)).astype(np.float32)
+    sizes = ((2, 3), (3, 3))
+    pool_map = _dense_to_sparse(np.array(
+        (((0.5, 0.5, 0.),
+          (0., 0., 1.),
+          (0., 0., 0.)),
+         ((1., 0., 0.),
+          (0., 0.5, 0.5),
+          (0., 0., 1.))), dtype=np.float32))
+    graph = utils.prepare_padded_graph_pooling_input(
+        pool_map, sizes, max_num_edges=4)
+
+    @tf.function(jit_compile=True)
+    def _pool(data):
+      return gp.pool(data, graph, None, algorithm=algorithm)
+
+    pooled = _pool(data)
+    pooled_true = gp.pool(data, pool_map, sizes, algorithm=algorithm)
+
+    self.assertAllClose(pooled, pooled_true)
+
+  @parameterized.parameters('max', 'weighted')
+  def test_pool_unordered_pool_map(self, algorithm):
+    """Tests pooling with the entries of `pool_map` in reverse order."""
+    pool_map = tf.SparseTensor(((1, 3), (1, 2), (0, 1), (0, 0)),
+                               (0.5, 0.5, 0.5, 0.5), (2, 4))
+    data = np.reshape(np.arange(8).astype(np.float32), (4, 2))
+    max_true = data[(1, 3), :]
+    pooled_true = {
+        'max': max_true,
+        'weighted': (data[(0, 2), :] + max_true) * 0.5,
+    }[algorithm]
+
+    pooled = gp.pool(data, pool_map, sizes=None, algorithm=algorithm)
+
+    self.assertAllClose(pooled, pooled_true)
+
+  @parameterized.parameters('max', 'weighted')
+  def test_pool_prepared_graph(self, algorithm):
+    """Tests pooling with a prepared graph and padding."""
+    data = np.reshape(np.arange(12).astype(np.float32), (2, 3, 2))
+    sizes = ((2, 3), (3, 3))
+    pool_map = _dense_to_sparse(np.array(
+        (((0.5, 0.5, 0.),
+          (0., 0., 1.),
+          (0., 0., 0.)),
+         ((1., 0., 0.),
+          (0., 1., 0.),
+          (0., 0., 1.))), dtype=np.float32))
+    graph = utils.prepare_graph_pooling_input(pool_map, sizes)
+    padded_graph = utils.prepare_padded_graph_pooling_input(
+        pool_map, sizes, max_num_edges=3)
+
+    pooled_true = gp.pool(data, pool_map, sizes, algorithm=algorithm)
+
+    with self.subTest(name='prepared_graph'):
+      pooled = gp.pool(data, graph, None, algorithm=algorithm)
+      self.assertAllClose(pooled, pooled_true)
+
+    with self.subTest(name='padded_graph'):
+      pooled = gp.pool(data, padded_graph, None, algorithm=algorithm)
+      self.assertAllClose(pooled, pooled_true)
+
   @parameterized.parameters((20, 10, 3), (2, 1, 1), (2, 5, 4), (2, 1, 3))
   def test_pool_random(
       self, num_input_vertices, num_output_vertices, num_features):
@@ -198,6 +267,102 @@ class GraphPoolingTestPoolTests(test_case.TestCase):
       self.assert_jacobian_is_correct(data, data_init, pooled_weighted)
 
 
+class GraphPoolingPoolClustersTests(test_case.TestCase):
+
+  @parameterized.parameters(
+      ("'data' must have a float type.", np.int32, np.int32),
+      ("'clusters' must have an integer type.", np.float32, np.float32),
+  )
+  def test_pool_clusters_exception_raised_types(
+      self, err_msg, data_type, clusters_type):
+    """Tests the correct exceptions are raised for invalid types."""
+    data = np.ones((2, 3, 3), dtype=data_type)
+    clusters = np.zeros((2, 3), dtype=clusters_type)
+
+    with self.assertRaisesRegexp(TypeError, err_msg):
+      gp.pool_clusters(data, clusters, 2)
+
+  def test_pool_clusters_exception_raised_shapes(self):
+    """Tests the correct exceptions are raised for invalid shapes."""
+    data = np.ones((2, 3, 3), dtype=np.float32)
+
+    with self.subTest(name='clusters_rank'):
+      with self.assertRaisesRegexp(ValueError, 'must have a rank of 2'):
+        gp.pool_clusters(data, np.zeros((2, 3, 1), dtype=np.int32), 2)
+
+    with self.subTest(name='batch_dimensions'):
+      with self.assertRaisesRegexp(ValueError, 'Not all batch dimensions'):
+        gp.pool_clusters(data, np.zeros((3, 3), dtype=np.int32), 2)
+
+  def test_pool_clusters_exception_raised_clusters(self):
+    """Tests the correct exception is raised for out of range clusters."""
+    data = np.ones((3, 2), dtype=np.float32)
+
+    with self.assertRaises(tf.errors.InvalidArgumentError):
+      self.evaluate(gp.pool_clusters(data, (0, 1, 2), 2))
+
+  def test_pool_clusters_exception_raised_algorithm(self):
+    """Tests the correct exception is raised for an invalid algorithm."""
+    data = np.ones((3, 2), dtype=np.float32)
+
+    with self.assertRaisesRegexp(
+        ValueError, 'The pooling method must be "max", "mean" or "sum"'):
+      gp.pool_clusters(data, (0, 0, 1), 2, algorithm='weighted')
+
+  def test_pool_clusters_preset_padded(self):
+    """Tests pooling with preset data, padding and empty clusters."""
+    data = np.reshape(np.arange(12).astype(np.float32), (2, 3, 2))
+    clusters = ((0, 0, -1), (2, 0, 2))
+    true_sum = (((2., 4.), (0., 0.), (0., 0.)),
+                ((8., 9.), (0., 0.), (16., 18.)))
+    true_mean = (((1., 2.), (0., 0.), (0., 0.)),
+                 ((8., 9.), (0., 0.), (8., 9.)))
+    true_max = (((2., 3.), (0., 0.), (0., 0.)),
+                ((8., 9.), (0., 0.), (10., 11.)))
+
+    for algorithm, true_pooled in (('sum', true_sum), ('mean', true_mean),
+                                   ('max', true_max)):
+      with self.subTest(name=algorithm):
+        pooled = gp.pool_clusters(data, clusters, 3, algorithm=algorithm)
+        self.assertAllClose(pooled, true_pooled)
+
+  @parameterized.parameters(
+      ((), 20, 10, 3),
+      ((3,), 8, 4, 2),
+      ((2, 3), 6, 6, 1),
+  )
+  def test_pool_clusters_matches_pool(
+      self, batch_shape, num_input_vertices, num_output_vertices, num_features):
+    """Tests that pooling clusters matches pooling the equivalent pool map."""
+    data = np.random.uniform(
+        size=batch_shape + (num_input_vertices, num_features))
+    clusters = np.random.randint(
+        num_output_vertices, size=batch_shape + (num_input_vertices,))
+    pool_map = np.equal(
+        np.expand_dims(clusters, axis=-2),
+        np.arange(num_output_vertices)[:, np.newaxis]).astype(data.dtype)
+    group_sizes = np.sum(pool_map, axis=-1, keepdims=True)
+    mean_map = pool_map / np.maximum(group_sizes, 1.0)
+
+    with self.subTest(name='sum'):
+      pooled = gp.pool_clusters(
+          data, clusters, num_output_vertices, algorithm='sum')
+      self.assertAllClose(
+          pooled, gp.pool(data, _dense_to_sparse(pool_map), None, 'weighted'))
+
+    with self.subTest(name='mean'):
+      pooled = gp.pool_clusters(
+          data, clusters, num_output_vertices, algorithm='mean')
+      self.assertAllClose(
+          pooled, gp.pool(data, _dense_to_sparse(mean_map), None, 'weighted'))
+
+    with self.subTest(name='max'):
+      pooled = gp.pool_clusters(
+          data, clusters, num_output_vertices, algorithm='max')
+      self.assertAllClose(
+          pooled, gp.pool(data, _dense_to_sparse(pool_map), None, 'max'))
+
+
 class GraphPoolingTestUnpoolTests(test_case.TestCase):
 
   @parameterized.parameters(
@@ -275,6 +440,27 @@ class GraphPoolingTestUnpoolTests(test_case.TestCase):
 
     true = (((0., 1.), (0., 1.), (2., 3.)),
             ((6., 7.), (8., 9.), (10., 11.)))
+    with self.subTest(name='raw_pool_map'):
+      self.assertAllClose(unpooled, true)
+
+    with self.subTest(name='prepared_graph'):
+      graph = utils.prepare_graph_unpooling_input(pool_map, sizes)
+      self.assertAllClose(gp.unpool(data, graph, None), true)
+
+    with self.subTest(name='padded_graph'):
+      graph = utils.prepare_padded_graph_unpooling_input(
+          pool_map, sizes, max_num_edges=3)
+      self.assertAllClose(gp.unpool(data, graph, None), true)
+
+  def test_unpool_empty_groups(self):
+    """Tests that vertices without a pooled vertex are set to zero."""
+    data = -np.ones(shape=(2, 3), dtype=np.float32)
+    pool_map = _dense_to_sparse(np.array(((1., 0., 0., 0.),
+                                          (0., 0., 1., 0.)), dtype=np.float32))
+
+    unpooled = gp.unpool(data, pool_map, sizes=None)
+
+    true = ((-1., -1., -1.), (0., 0., 0.), (-1., -1., -1.), (0., 0., 0.))
     self.assertAllClose(unpooled, true)
 
   @parameterized.parameters((20, 4), (2, 1), (12, 4), (6, 3))
@@ -485,9 +671,30 @@ class GraphPoolingUpsampleTransposeConvolutionTests(test_case.TestCase):
     upsampled = gp.upsample_transposed_convolution(
         data, pool_map, sizes=sizes, kernel_size=2,
         transposed_convolution_op=transposed_convolution_op)
+    graph = utils.prepare_graph_unpooling_input(pool_map, sizes)
+    upsampled_prepared = gp.upsample_transposed_convolution(
+        data, graph, sizes=None, kernel_size=2,
+        transposed_convolution_op=transposed_convolution_op)
+    plan = gp.prepare_upsample_plan(pool_map, sizes, kernel_size=2)
+    upsampled_plan = gp.upsample_transposed_convolution(
+        data, plan, sizes=None, kernel_size=2,
+        transposed_convolution_op=transposed_convolution_op)
 
     self.assertAllEqual(upsampled.shape, (2, 3, 2))
     self.assertAllClose(upsampled, true)
+    self.assertAllClose(upsampled_prepared, true)
+    self.assertAllClose(upsampled_plan, true)
+
+  def test_upsample_transposed_convolution_exception_raised_plan(self):
+    """Tests the exception for a plan prepared for another kernel size."""
+    data = np.ones((2, 3), dtype=np.float32)
+    pool_map = _dense_to_sparse(np.eye(2, 4, dtype=np.float32))
+    plan = gp.prepare_upsample_plan(pool_map, None, kernel_size=2)
+
+    with self.assertRaisesRegexp(ValueError, "'kernel_size' must be equal"):
+      gp.upsample_transposed_convolution(
+          data, plan, sizes=None, kernel_size=3,
+          transposed_convolution_op=lambda x: x)
 
   def test_upsample_transposed_convolution_jacobian_random(self):
     """Tests the jacobian is correct."""
@@ -540,5 +747,71 @@ class GraphPoolingUpsampleTransposeConvolutionTests(test_case.TestCase):
     self.assert_jacobian_is_correct(data, data_init, upsampled)
 
 
+def _evaluate_plan(plan):
+  """Evaluates an `UpsamplePlan` and returns the values of its fields."""
+  tensors = [field for field in plan.graph if field is not None]
+  with tf.compat.v1.Session() as sess:
+    values = iter(sess.run(tensors + [plan.order, plan.segment_ids]))
+  graph = [None if field is None else next(values) for field in plan.graph]
+  return graph, plan.kernel_size, next(values), next(values)
+
+
+def _constant_plan(graph, kernel_size, order, segment_ids):
+  """Creates an `UpsamplePlan` from the values of its fields."""
+  graph = utils.PreparedGraph(*[
+      tf.SparseTensor.from_value(value) if isinstance(
+          value, tf.compat.v1.SparseTensorValue) else
+      None if value is None else tf.constant(value) for value in graph
+  ])
+  return gp.UpsamplePlan(graph, kernel_size, tf.constant(order),
+                         tf.constant(segment_ids))
+
+
+class UpsampleTransposedConvolutionBenchmark(tf.test.Benchmark):
+  """Benchmarks upsampling from a pool map and from a precomputed plan."""
+
+  def _benchmark(self, num_vertices, kernel_size, num_features, use_plan):
+    # Each pooled vertex maps to `kernel_size` distinct upsampled vertices.
+    rows = np.repeat(np.arange(num_vertices), kernel_size)
+    indices = np.stack((rows, np.arange(num_vertices * kernel_size)), axis=-1)
+    values = np.full(rows.shape, 1.0 / kernel_size, dtype=np.float32)
+    dense_shape = (num_vertices, num_vertices * kernel_size)
+    if use_plan:
+      # Evaluates the plan once, as it would be in the input pipeline.
+      with tf.Graph().as_default():
+        plan_value = _evaluate_plan(
+            gp.prepare_upsample_plan(
+                tf.SparseTensor(indices, values, dense_shape), None,
+                kernel_size))
+
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      if use_plan:
+        pool_map = _constant_plan(*plan_value)
+      else:
+        pool_map = tf.SparseTensor(indices, values, dense_shape)
+      data = tf.Variable(
+          np.random.uniform(size=(num_vertices,
+                                  num_features)).astype(np.float32))
+      transposed_convolution_op = tf.keras.layers.Conv2DTranspose(
+          filters=num_features,
+          kernel_size=(1, kernel_size),
+          strides=(1, kernel_size),
+          padding='valid')
+      upsampled = gp.upsample_transposed_convolution(
+          data, pool_map, None, kernel_size, transposed_convolution_op)
+      gradients = tf.gradients(ys=upsampled, xs=data)
+      sess.run(tf.compat.v1.global_variables_initializer())
+      self.run_op_benchmark(
+          sess,
+          gradients,
+          min_iters=10,
+          name='upsample_transposed_convolution_%s_K%d' %
+          ('plan' if use_plan else 'pool_map', kernel_size))
+
+  def benchmark_upsample_transposed_convolution(self):
+    for kernel_size, use_plan in itertools.product(range(2, 9), (False, True)):
+      self._benchmark(100000, kernel_size, 16, use_plan)
+
+
 if __name__ == '__main__':
   test_case.main()
@@ -0,0 +1,175 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for graph sampling ops."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+import tensorflow_graphics.geometry.convolution.graph_convolution as gc
+import tensorflow_graphics.geometry.convolution.graph_sampling as gs
+from tensorflow_graphics.geometry.convolution import utils
+from tensorflow_graphics.geometry.convolution.tests import utils_test
+from tensorflow_graphics.util import test_case
+
+
+def _dense_to_sparse(data):
+  """Convert a numpy array to a tf.SparseTensor."""
+  return utils_test._dense_to_sparse(data)
+
+
+def _path_graph(num_vertices):
+  """Creates a path graph with self edges."""
+  neighbors = np.eye(num_vertices, dtype=np.float32)
+  neighbors += np.eye(num_vertices, k=1, dtype=np.float32)
+  neighbors += np.eye(num_vertices, k=-1, dtype=np.float32)
+  return neighbors
+
+
+def _random_graph(num_vertices, num_neighbors):
+  """Creates a random graph with self edges and normalized rows."""
+  neighbors = np.eye(num_vertices)
+  columns = np.random.randint(num_vertices, size=(num_vertices, num_neighbors))
+  neighbors[np.arange(num_vertices)[:, None], columns] = 1.0
+  neighbors /= np.sum(neighbors, axis=-1, keepdims=True)
+  return neighbors
+
+
+class GraphSamplingSampleKHopNeighborhoodsTests(test_case.TestCase):
+
+  @parameterized.parameters(
+      ("'seeds' must have an integer type.", np.float32, np.float32,
+       np.float32),
+      ("'data' must have a float type.", np.int32, np.float32, np.int32),
+      ("'neighbors' and 'data' must have the same type.", np.float32,
+       np.float64, np.int32),
+  )
+  def test_sample_k_hop_neighborhoods_exception_raised_types(
+      self, err_msg, data_type, neighbors_type, seeds_type):
+    """Check the type errors for invalid input types."""
+    data = np.ones(shape=(4, 2), dtype=data_type)
+    neighbors = _dense_to_sparse(_path_graph(4).astype(neighbors_type))
+    seeds = np.zeros(shape=(1, 1), dtype=seeds_type)
+
+    with self.assertRaisesRegexp(TypeError, err_msg):
+      gs.sample_k_hop_neighborhoods(data, neighbors, seeds, num_hops=1)
+
+  def test_sample_k_hop_neighborhoods_exception_raised_shapes(self):
+    """Check that invalid input shapes trigger the right exceptions."""
+    data = np.ones(shape=(4, 2), dtype=np.float32)
+    neighbors = _dense_to_sparse(_path_graph(4))
+
+    with self.subTest(name="batched_data"):
+      batched_neighbors = _dense_to_sparse(np.tile(_path_graph(4), (2, 1, 1)))
+      with self.assertRaisesRegexp(ValueError, "must have a rank of 2"):
+        gs.sample_k_hop_neighborhoods(
+            np.ones(shape=(2, 4, 2), dtype=np.float32), batched_neighbors,
+            ((0,),), num_hops=1)
+
+    with self.subTest(name="seeds_rank"):
+      with self.assertRaisesRegexp(ValueError, "must have a rank of 2"):
+        gs.sample_k_hop_neighborhoods(data, neighbors, (0, 1), num_hops=1)
+
+  @parameterized.parameters(
+      ("'num_hops' must be non-negative.", -1, None),
+      ("'max_neighbors' must have 'num_hops' elements.", 2, (1,)),
+  )
+  def test_sample_k_hop_neighborhoods_exception_raised_hops(
+      self, err_msg, num_hops, max_neighbors):
+    """Check the errors for invalid hop parameters."""
+    data = np.ones(shape=(4, 2), dtype=np.float32)
+    neighbors = _dense_to_sparse(_path_graph(4))
+
+    with self.assertRaisesRegexp(ValueError, err_msg):
+      gs.sample_k_hop_neighborhoods(data, neighbors, ((0,),), num_hops,
+                                    max_neighbors)
+
+  def test_sample_k_hop_neighborhoods_preset(self):
+    """Check the subgraphs of a path graph."""
+    neighbors = _path_graph(6)
+    data = np.reshape(np.arange(12, dtype=np.float32), (6, 2))
+
+    sampled_data, sampled_neighbors, sizes, vertex_ids = (
+        gs.sample_k_hop_neighborhoods(
+            data, _dense_to_sparse(neighbors), ((0,), (4,)), num_hops=1))
+
+    self.assertAllEqual(sizes, (2, 3))
+    self.assertAllEqual(vertex_ids, ((0, 1, -1), (4, 3, 5)))
+    self.assertAllEqual(sampled_data,
+                        ((data[0], data[1], (0., 0.)),
+                         (data[4], data[3], data[5])))
+    self.assertAllEqual(
+        tf.sparse.to_dense(sampled_neighbors),
+        (((1., 1., 0.), (1., 1., 0.), (0., 0., 0.)),
+         ((1., 1., 1.), (1., 1., 0.), (1., 0., 1.))))
+
+  def test_sample_k_hop_neighborhoods_max_neighbors(self):
+    """Check that the fan-out limits the number of sampled vertices."""
+    # A star graph where the center is connected to all the other vertices.
+    neighbors = np.eye(10, dtype=np.float32)
+    neighbors[0, :] = 1.0
+    neighbors[:, 0] = 1.0
+    data = np.ones(shape=(10, 1), dtype=np.float32)
+
+    _, sampled_neighbors, sizes, vertex_ids = gs.sample_k_hop_neighborhoods(
+        data, _dense_to_sparse(neighbors), ((0,),), num_hops=1,
+        max_neighbors=4)
+
+    # The center and at most 4 of its neighbors, itself included.
+    self.assertAllEqual(vertex_ids[0, 0], 0)
+    self.assertLessEqual(sizes[0], 5)
+    self.assertGreaterEqual(sizes[0], 2)
+    self.assertAllEqual(
+        tf.sparse.to_dense(sampled_neighbors)[0, :sizes[0], :sizes[0]],
+        neighbors[vertex_ids[0, :sizes[0]]][:, vertex_ids[0, :sizes[0]]])
+
+  @parameterized.parameters(
+      (1, 30, 3, 1),
+      (2, 50, 4, 3),
+      (2, 50, 2, 2),
+  )
+  def test_sample_k_hop_neighborhoods_convolution_matches_full_graph(
+      self, num_hops, num_vertices, num_neighbors, num_seeds):
+    """Check that convolutions at the seeds match those on the full graph."""
+    neighbors = _dense_to_sparse(_random_graph(num_vertices, num_neighbors))
+    data = np.random.uniform(size=(num_vertices, 3))
+    seeds = np.stack([
+        np.random.choice(num_vertices, size=num_seeds, replace=False)
+        for _ in range(4)
+    ])
+    graph = utils.prepare_graph_convolution_input(neighbors)
+
+    def _convolve(data, neighbors, sizes):
+      for _ in range(num_hops):
+        data = gc.edge_convolution_template(
+            data, neighbors, sizes, lambda x, y: tf.sin(x - y), "weighted",
+            dict())
+      return data
+
+    sampled_data, sampled_neighbors, sizes, vertex_ids = (
+        gs.sample_k_hop_neighborhoods(data, graph, seeds, num_hops))
+    y_full = _convolve(data, neighbors, None)
+    y_sampled = _convolve(sampled_data, sampled_neighbors, sizes)
+
+    self.assertAllEqual(vertex_ids[:, :num_seeds], seeds)
+    self.assertAllClose(y_sampled[:, :num_seeds, :],
+                        tf.gather(y_full, seeds))
+
+
+if __name__ == "__main__":
+  test_case.main()
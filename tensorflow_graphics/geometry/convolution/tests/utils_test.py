@@ -549,6 +549,285 @@ class UtilsConvertToBlockDiag2dTests(test_case.TestCase):
     self.assert_jacobian_is_correct(sparse_val, sparse_val_init, y.values)
 
 
+class UtilsPreparedGraphTests(test_case.TestCase):
+
+  def test_prepare_graph_convolution_input_exception_raised_types(self):
+    """Check the exceptions with invalid input types."""
+    with self.subTest(name="dense_neighbors"):
+      with self.assertRaisesRegexp(TypeError, "must be a 'SparseTensor'"):
+        utils.prepare_graph_convolution_input(np.eye(3, dtype=np.float32))
+
+    with self.subTest(name="float_sizes"):
+      neighbors = _dense_to_sparse(np.ones(shape=(2, 3, 3), dtype=np.float32))
+      with self.assertRaisesRegexp(TypeError, "integer type"):
+        utils.prepare_graph_convolution_input(neighbors, (2.0, 3.0))
+
+  def test_prepare_graph_convolution_input_unbatched(self):
+    """Check that a 2-D graph is used as is."""
+    neighbors = _dense_to_sparse(np.eye(4, dtype=np.float32))
+    data = np.random.uniform(size=(4, 2)).astype(np.float32)
+
+    graph = utils.prepare_graph_convolution_input(neighbors)
+
+    self.assertIsNone(graph.output_shape)
+    self.assertAllEqual(graph.row_ids, (0, 1, 2, 3))
+    self.assertAllEqual(graph.col_ids, (0, 1, 2, 3))
+    self.assertAllEqual(utils.flatten_prepared_graph_input(data, graph), data)
+
+  @parameterized.parameters((False,), (True,))
+  def test_prepare_graph_convolution_input_random(self, padding):
+    """Check that flattening matches `flatten_batch_to_2d`."""
+    batch_shape = (2, 3)
+    max_size = 5
+    num_features = 4
+    sizes = np.random.randint(
+        low=1, high=max_size + 1, size=batch_shape) if padding else None
+    neighbors_dense = np.random.uniform(
+        size=batch_shape + (max_size, max_size)).astype(np.float32)
+    if padding:
+      for index in np.ndindex(batch_shape):
+        neighbors_dense[index][sizes[index]:, :] = 0.0
+        neighbors_dense[index][:, sizes[index]:] = 0.0
+    neighbors = _dense_to_sparse(neighbors_dense)
+    data = np.random.uniform(
+        size=batch_shape + (max_size, num_features)).astype(np.float32)
+    sizes_square = None if not padding else np.stack((sizes, sizes), axis=-1)
+
+    graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    data_flat = utils.flatten_prepared_graph_input(data, graph)
+    data_flat_true, unflatten = utils.flatten_batch_to_2d(data, sizes)
+    adjacency_true = utils.convert_to_block_diag_2d(neighbors, sizes_square)
+
+    with self.subTest(name="flatten"):
+      self.assertAllEqual(data_flat, data_flat_true)
+
+    with self.subTest(name="adjacency"):
+      self.assertAllEqual(
+          tf.sparse.to_dense(graph.adjacency),
+          tf.sparse.to_dense(adjacency_true))
+
+    with self.subTest(name="unflatten"):
+      self.assertAllEqual(
+          utils.unflatten_prepared_graph_output(data_flat, graph),
+          unflatten(data_flat_true))
+
+  def test_prepare_graph_pooling_input_preset(self):
+    """Check the output shape of pooling with padding."""
+    pool_map = _dense_to_sparse(np.array(
+        (((0.5, 0.5, 0.), (0., 0., 1.), (0., 0., 0.)),
+         ((1., 0., 0.), (0., 0., 0.), (0., 0., 0.))), dtype=np.float32))
+    sizes = ((2, 3), (1, 1))
+
+    graph = utils.prepare_graph_pooling_input(pool_map, sizes)
+
+    self.assertAllEqual(graph.output_shape, (2, 2))
+    self.assertAllEqual(graph.input_indices,
+                        ((0, 0), (0, 1), (0, 2), (1, 0)))
+    self.assertAllEqual(graph.output_indices, ((0, 0), (0, 1), (1, 0)))
+
+  def test_prepare_graph_unpooling_input_preset(self):
+    """Check the output shape of unpooling without padding."""
+    pool_map = _dense_to_sparse(
+        np.ones(shape=(2, 3, 5), dtype=np.float32))
+
+    graph = utils.prepare_graph_unpooling_input(pool_map)
+
+    self.assertAllEqual(graph.output_shape, (2, 5))
+    self.assertAllEqual(graph.adjacency.dense_shape, (6, 10))
+
+  def test_check_valid_prepared_graph_input_exception_raised(self):
+    """Check the exceptions with invalid data."""
+    neighbors = _dense_to_sparse(np.ones(shape=(2, 3, 3), dtype=np.float32))
+    graph = utils.prepare_graph_convolution_input(neighbors)
+
+    with self.subTest(name="type"):
+      with self.assertRaisesRegexp(TypeError, "must have the same type"):
+        utils.check_valid_prepared_graph_input(
+            tf.zeros((2, 3, 1), dtype=tf.float64), graph, "neighbors")
+
+    with self.subTest(name="rank"):
+      with self.assertRaisesRegexp(ValueError, "must have a rank greater"):
+        utils.check_valid_prepared_graph_input(
+            tf.zeros((3, 1)), graph, "neighbors")
+
+
+class UtilsPaddedGraphTests(test_case.TestCase):
+
+  def _random_padded_neighbors(self, batch_shape, max_size):
+    """Creates random batched neighbors and their sizes."""
+    sizes = np.random.randint(low=1, high=max_size + 1, size=batch_shape)
+    neighbors = np.random.uniform(size=batch_shape + (max_size, max_size))
+    neighbors[neighbors < 0.5] = 0.0
+    for index in np.ndindex(batch_shape):
+      neighbors[index][sizes[index]:, :] = 0.0
+      neighbors[index][:, sizes[index]:] = 0.0
+    return neighbors.astype(np.float32), sizes
+
+  def test_prepare_padded_graph_convolution_input_exception_raised(self):
+    """Check that graphs with more than `max_num_edges` edges are rejected."""
+    neighbors = _dense_to_sparse(np.ones(shape=(2, 3, 3), dtype=np.float32))
+
+    with self.assertRaises(tf.errors.InvalidArgumentError):
+      graph = utils.prepare_padded_graph_convolution_input(
+          neighbors, None, max_num_edges=8)
+      self.evaluate(graph.row_ids)
+
+  @parameterized.parameters((False,), (True,))
+  def test_prepare_padded_graph_convolution_input_random(self, padding):
+    """Check that the padded graph matches the `PreparedGraph`."""
+    batch_shape = (2, 3)
+    max_size = 5
+    neighbors_dense, sizes = self._random_padded_neighbors(
+        batch_shape, max_size)
+    if not padding:
+      sizes = None
+    neighbors = _dense_to_sparse(neighbors_dense)
+    data = np.random.uniform(
+        size=batch_shape + (max_size, 4)).astype(np.float32)
+
+    graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+    padded = utils.prepare_padded_graph_convolution_input(
+        neighbors, sizes, max_num_edges=max_size * max_size)
+
+    self.assertEqual(padded.output_shape, batch_shape + (max_size,))
+    for reduction in ("weighted", "max", "sum", "mean"):
+      with self.subTest(name=reduction):
+        edges = tf.gather(
+            utils.flatten_prepared_graph_input(data, graph), graph.col_ids)
+        padded_edges = tf.gather(
+            utils.flatten_prepared_graph_input(data, padded), padded.col_ids)
+        reduced = utils.unflatten_prepared_graph_output(
+            utils.segment_reduce_2d(edges, graph, reduction), graph)
+        padded_reduced = utils.unflatten_prepared_graph_output(
+            utils.segment_reduce_2d(padded_edges, padded, reduction), padded)
+        self.assertAllClose(padded_reduced, reduced)
+
+  def test_prepare_padded_graph_pooling_input_preset(self):
+    """Check the edges and the output mask of a padded pooling map."""
+    pool_map = _dense_to_sparse(np.array(
+        (((0.5, 0.5, 0.), (0., 0., 1.), (0., 0., 0.)),
+         ((1., 0., 0.), (0., 0., 0.), (0., 0., 0.))), dtype=np.float32))
+    sizes = ((2, 3), (1, 1))
+
+    graph = utils.prepare_padded_graph_pooling_input(
+        pool_map, sizes, max_num_edges=3)
+
+    self.assertEqual(graph.output_shape, (2, 3))
+    self.assertEqual(graph.num_segments, 7)
+    self.assertAllEqual(graph.row_ids, (0, 0, 1, 3, 6, 6))
+    self.assertAllEqual(graph.col_ids, (0, 1, 2, 3, 6, 6))
+    self.assertAllEqual(graph.values, (0.5, 0.5, 1., 1., 0., 0.))
+    self.assertAllEqual(graph.output_mask, (1., 1., 0., 1., 0., 0.))
+
+  def test_prepare_padded_graph_unpooling_input_preset(self):
+    """Check that the output of unpooling is indexed by the columns."""
+    pool_map = _dense_to_sparse(np.ones(shape=(2, 3, 5), dtype=np.float32))
+
+    graph = utils.prepare_padded_graph_unpooling_input(
+        pool_map, ((3, 4), (2, 5)), max_num_edges=15)
+
+    self.assertEqual(graph.output_shape, (2, 5))
+    self.assertAllEqual(graph.output_mask, (1.,) * 4 + (0.,) + (1.,) * 5)
+
+  def test_check_valid_padded_graph_input_exception_raised(self):
+    """Check the exceptions with invalid data."""
+    neighbors = _dense_to_sparse(np.ones(shape=(2, 3, 3), dtype=np.float32))
+    graph = utils.prepare_padded_graph_convolution_input(
+        neighbors, None, max_num_edges=9)
+
+    with self.subTest(name="type"):
+      with self.assertRaisesRegexp(TypeError, "must have the same type"):
+        utils.check_valid_prepared_graph_input(
+            tf.zeros((2, 3, 1), dtype=tf.float64), graph, "neighbors")
+
+    with self.subTest(name="rank"):
+      with self.assertRaisesRegexp(ValueError, "must have a rank of 3"):
+        utils.check_valid_prepared_graph_input(
+            tf.zeros((6, 1)), graph, "neighbors")
+
+
+class UtilsSegmentReduce2dTests(test_case.TestCase):
+
+  def _random_graph(self, num_rows, num_cols, density):
+    """Creates a random `PreparedGraph` and its dense adjacency."""
+    adjacency = np.random.uniform(size=(num_rows, num_cols))
+    adjacency[np.random.uniform(size=(num_rows, num_cols)) > density] = 0.0
+    # Leave the last row empty.
+    adjacency[-1, :] = 0.0
+    graph = utils.prepare_graph_convolution_input(_dense_to_sparse(adjacency))
+    return graph, adjacency
+
+  @parameterized.parameters("sum", "weighted", "max", "mean")
+  def test_segment_reduce_2d_random(self, reduction):
+    """Check the reductions against numpy."""
+    graph, adjacency = self._random_graph(8, 6, 0.5)
+    rows, cols = np.nonzero(adjacency)
+    data = np.random.uniform(size=(rows.size, 3))
+
+    reduced = utils.segment_reduce_2d(data, graph, reduction)
+
+    true = np.zeros(shape=(8, 3))
+    for row in range(8):
+      row_data = data[rows == row]
+      if not row_data.size:
+        continue
+      if reduction == "sum":
+        true[row] = np.sum(row_data, axis=0)
+      elif reduction == "weighted":
+        weights = adjacency[row, cols[rows == row]]
+        true[row] = np.sum(row_data * weights[:, None], axis=0)
+      elif reduction == "max":
+        true[row] = np.max(row_data, axis=0)
+      else:
+        true[row] = np.mean(row_data, axis=0)
+    self.assertAllClose(reduced, true)
+
+  def test_segment_reduce_2d_unsorted_input(self):
+    """Check that the prepared graph is sorted by row."""
+    neighbors = tf.SparseTensor(((2, 0), (0, 1), (1, 2), (0, 0)),
+                                (1.0, 2.0, 3.0, 4.0), (3, 3))
+    data = np.array(((1.0,), (2.0,), (3.0,)), dtype=np.float32)
+
+    graph = utils.prepare_graph_convolution_input(neighbors)
+    reduced = utils.segment_reduce_2d(
+        tf.gather(data, graph.col_ids), graph, "weighted")
+
+    self.assertAllEqual(graph.row_splits, (0, 2, 3, 4))
+    self.assertAllEqual(graph.col_ids, (0, 1, 2, 0))
+    self.assertAllClose(reduced, ((8.0,), (9.0,), (1.0,)))
+
+  @parameterized.parameters((np.float16,), (tf.bfloat16.as_numpy_dtype,))
+  def test_segment_reduce_2d_half_precision_accumulation(self, dtype):
+    """Check that half precision sums are accumulated in float32."""
+    num_entries = 2560
+    graph = utils.prepare_graph_convolution_input(
+        tf.SparseTensor(
+            np.stack((np.zeros(num_entries), np.arange(num_entries)), axis=-1),
+            np.ones(num_entries, dtype=dtype), (1, num_entries)))
+    data = np.ones((num_entries, 1), dtype=dtype)
+
+    # A half precision accumulator stops increasing at 2048 or 256.
+    self.assertAllEqual(
+        utils.segment_reduce_2d(data, graph, "weighted"), ((2560.,),))
+
+  def test_segment_reduce_2d_exception_raised_reduction(self):
+    """Check the exception with an invalid reduction method."""
+    graph, _ = self._random_graph(3, 3, 1.0)
+
+    with self.assertRaisesRegexp(ValueError, "reduction method"):
+      utils.segment_reduce_2d(np.ones((6, 1)), graph, "min")
+
+  def test_segment_reduce_2d_jacobian_random(self):
+    """Test the jacobian with random inputs."""
+    graph, adjacency = self._random_graph(6, 5, 0.6)
+    data_init = np.random.uniform(size=(np.count_nonzero(adjacency), 2))
+    data = tf.convert_to_tensor(value=data_init)
+
+    reduced = utils.segment_reduce_2d(data, graph, "weighted")
+
+    self.assert_jacobian_is_correct(data, data_init, reduced)
+
+
 class UtilsPartitionSums2dTests(test_case.TestCase):
 
   def _numpy_ground_truth(self, data, group_ids, row_weights):
@@ -17,6 +17,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+
 import tensorflow as tf
 
 from tensorflow_graphics.util import export_api
@@ -475,11 +477,700 @@ def partition_sums_2d(data, group_ids, row_weights=None, name=None):
         tensor_names=("data", "group_ids", "row_weights"),
         axes=0)
 
-    num_rows = tf.size(input=group_ids, out_type=tf.int64)
-    sparse_indices = tf.stack((group_ids, tf.range(num_rows)), axis=1)
-    out_shape = (tf.reduce_max(input_tensor=group_ids) + 1, num_rows)
-    sparse = tf.SparseTensor(sparse_indices, row_weights, dense_shape=out_shape)
-    return tf.sparse.sparse_dense_matmul(sparse, data)
+    num_groups = tf.reduce_max(input_tensor=group_ids) + 1
+    return tf.math.unsorted_segment_sum(
+        data=data * tf.expand_dims(row_weights, axis=-1),
+        segment_ids=group_ids,
+        num_segments=num_groups)
+
+
+class PreparedGraph(
+    collections.namedtuple("PreparedGraph",
+                           ("adjacency", "row_ids", "col_ids", "row_splits",
+                            "input_indices", "output_indices",
+                            "output_shape"))):
+  """A batch of sparse graph inputs that has been flattened once for reuse.
+
+  The graph convolution, pooling and unpooling ops flatten their batched
+  `SparseTensor` input to a 2-D block diagonal `SparseTensor`, and compute the
+  indices of the unpadded vertices, on every call. When the same graph is used
+  by several ops, for instance by all the layers of a network operating on the
+  same mesh, this can be done once with `prepare_graph_convolution_input`,
+  `prepare_graph_pooling_input` or `prepare_graph_unpooling_input`, and the
+  resulting `PreparedGraph` passed to the ops in place of the `SparseTensor`.
+
+  The entries of `adjacency` are in row-major order, such that `row_splits`,
+  `col_ids` and `adjacency.values` form a compressed sparse row (CSR)
+  representation of the graph, and reductions over the neighbors of each row
+  can use sorted segment ops (see `segment_reduce_2d`). The prepare functions,
+  which the graph ops also call on their `SparseTensor` inputs, sort the entries
+  of the `SparseTensor` unless called with `assume_sorted=True`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Attributes:
+    adjacency: A 2-D block diagonal `SparseTensor` with shape `[N1, N2]`, where
+      `N1` and `N2` are the total number of unpadded rows and columns of the
+      original `SparseTensor`.
+    row_ids: An `int64` tensor with shape `[E]` containing the row indices of
+      `adjacency`.
+    col_ids: An `int64` tensor with shape `[E]` containing the column indices
+      of `adjacency`.
+    row_splits: An `int64` tensor with shape `[N1 + 1]`, such that the entries
+      of row `i` of `adjacency` are at positions `row_splits[i]` to
+      `row_splits[i + 1] - 1` of `col_ids` and `adjacency.values`.
+    input_indices: An `int32` tensor with shape `[N, n + 1]` that gathers the
+      unpadded vertices from the op input with shape `[A1, ..., An, V, C]`, or
+      `None` if the op input is not padded.
+    output_indices: An `int32` tensor with shape `[M, n + 1]` that scatters the
+      vertices of the flat op output to their position in the batched output,
+      or `None` if the op output is not padded.
+    output_shape: An `int32` tensor with value `[A1, ..., An, V']`, the shape of
+      the batched op output without its channel dimension, or `None` if the
+      graph has no batch dimensions.
+  """
+  __slots__ = ()
+
+  @property
+  def values(self):
+    """The values of `adjacency`, in the order of `row_ids` and `col_ids`."""
+    return self.adjacency.values
+
+
+class PaddedGraph(
+    collections.namedtuple("PaddedGraph",
+                           ("row_ids", "col_ids", "values", "output_mask",
+                            "output_shape"))):
+  """A batch of sparse graph inputs stored as fixed size padded edge lists.
+
+  A `PaddedGraph` is an alternative to a `PreparedGraph` where all the shapes
+  are static: the batch of graphs is stored as a list of `max_num_edges` edges
+  per graph, and the padded vertices are kept. The graph convolution, pooling
+  and unpooling ops then only use gathers and unsorted segment reductions with
+  a static number of segments, which can be compiled with XLA, for instance in
+  a `tf.function` with `jit_compile=True`. It is created with
+  `prepare_padded_graph_convolution_input`, `prepare_padded_graph_pooling_input`
+  or `prepare_padded_graph_unpooling_input`, typically in the input pipeline.
+
+  The vertices of the op input and output are flattened to `N_in` and `N_out`
+  rows. A zero row is appended to the op input, and a dummy output row is added
+  to the reductions, such that padding edges point to row `N_in` of the input
+  and to row `N_out` of the output, and have a weight of zero.
+
+  Attributes:
+    row_ids: An `int32` tensor with shape `[M]` containing the row index of
+      each edge, where `M` is the batch size times `max_num_edges`.
+    col_ids: An `int32` tensor with shape `[M]` containing the column index of
+      each edge.
+    values: A `float` tensor with shape `[M]` containing the weight of each
+      edge, zero for padding edges.
+    output_mask: A `float` tensor with shape `[N_out]`, one for the valid output
+      vertices and zero for the padded ones.
+    output_shape: A tuple of `int`s `(A1, ..., An, V')`, the static shape of
+      the batched op output without its channel dimension.
+  """
+  __slots__ = ()
+
+  @property
+  def num_segments(self):
+    """The static number of output rows, including the dummy row."""
+    num_segments = 1
+    for dimension in self.output_shape:
+      num_segments *= dimension
+    return num_segments + 1
+
+
+def _sequence_mask_indices(sizes, max_size):
+  """Returns the indices of the first `sizes` elements along the last axis."""
+  return tf.cast(tf.where(tf.sequence_mask(sizes, max_size)), tf.int32)
+
+
+def _make_prepared_graph(adjacency, input_indices, output_indices,
+                         output_shape, assume_sorted):
+  """Builds the `PreparedGraph` of a 2-D `SparseTensor`."""
+  if not assume_sorted:
+    adjacency = tf.sparse.reorder(adjacency)
+  row_ids = adjacency.indices[:, 0]
+  row_lengths = tf.math.unsorted_segment_sum(
+      data=tf.ones_like(row_ids),
+      segment_ids=row_ids,
+      num_segments=adjacency.dense_shape[0])
+  row_splits = tf.concat(
+      (tf.zeros((1,), dtype=tf.int64), tf.cumsum(row_lengths)), axis=0)
+  return PreparedGraph(adjacency, row_ids, adjacency.indices[:, 1], row_splits,
+                       input_indices, output_indices, output_shape)
+
+
+def _check_valid_prepared_graph_sizes(data, data_name, sizes, sizes_rank):
+  """Checks the types and shapes of the inputs of the prepare functions."""
+  if not isinstance(data, tf.SparseTensor):
+    raise TypeError("'{}' must be a 'SparseTensor'.".format(data_name))
+  if sizes is not None and not sizes.dtype.is_integer:
+    raise TypeError("'sizes' must have an integer type.")
+  shape.check_static(
+      tensor=data, tensor_name=data_name, has_rank_greater_than=1)
+  if sizes is not None and data.shape.ndims > 2:
+    shape.check_static(
+        tensor=sizes,
+        tensor_name="sizes",
+        has_rank=data.shape.ndims - 2 + sizes_rank)
+    shape.compare_batch_dimensions(
+        tensors=(data, sizes),
+        tensor_names=(data_name, "sizes"),
+        last_axes=(-3, -1 - sizes_rank),
+        broadcast_compatible=False)
+
+
+def prepare_graph_convolution_input(neighbors,
+                                    sizes=None,
+                                    assume_sorted=False,
+                                    name=None):
+  """Prepares the `neighbors` input of graph convolutions for reuse.
+
+  The output can be passed as the `neighbors` argument of
+  `graph_convolution.feature_steered_convolution` and
+  `graph_convolution.edge_convolution_template`, in which case their `sizes`
+  argument is ignored.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    neighbors: A `SparseTensor` with shape `[A1, ..., An, V, V]`.
+    sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+      sizes in case of padding (`sizes=None` indicates no padding). If
+      `neighbors` is 2-D, `sizes` will be ignored.
+    assume_sorted: A `bool` indicating whether the entries of `neighbors` are
+      already in canonical row-major order, for instance if it was built by
+      `graph_construction`. If `False`, the entries are sorted.
+    name: A name for this op. Defaults to
+      `utils_prepare_graph_convolution_input`.
+
+  Returns:
+    A `PreparedGraph`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(name, "utils_prepare_graph_convolution_input",
+                               [neighbors, sizes]):
+    neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+        value=neighbors)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_prepared_graph_sizes(neighbors, "neighbors", sizes, 0)
+
+    if neighbors.shape.ndims == 2:
+      return _make_prepared_graph(neighbors, None, None, None, assume_sorted)
+
+    neighbors_shape = tf.shape(input=neighbors)
+    if sizes is not None:
+      sizes_square = tf.stack((sizes, sizes), axis=-1)
+      indices = _sequence_mask_indices(sizes, neighbors_shape[-1])
+    else:
+      sizes_square = None
+      indices = None
+    adjacency = convert_to_block_diag_2d(neighbors, sizes_square)
+    return _make_prepared_graph(adjacency, indices, indices,
+                                neighbors_shape[:-1], assume_sorted)
+
+
+def prepare_graph_pooling_input(pool_map,
+                                sizes=None,
+                                assume_sorted=False,
+                                name=None):
+  """Prepares the `pool_map` input of `graph_pooling.pool` for reuse.
+
+  The output can be passed as the `pool_map` argument of `graph_pooling.pool`,
+  in which case its `sizes` argument is ignored.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    pool_map: A `SparseTensor` with shape `[A1, ..., An, V2, V1]`.
+    sizes: An `int` tensor of shape `[A1, ..., An, 2]` indicating the true
+      input sizes in case of padding (`sizes=None` indicates no padding).
+      `sizes[A1, ..., An, 0] <= V2` and `sizes[A1, ..., An, 1] <= V1`.
+    assume_sorted: A `bool` indicating whether the entries of `pool_map` are
+      already in canonical row-major order, for instance if it was built by
+      `graph_construction`. If `False`, the entries are sorted.
+    name: A name for this op. Defaults to `utils_prepare_graph_pooling_input`.
+
+  Returns:
+    A `PreparedGraph`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(name, "utils_prepare_graph_pooling_input",
+                               [pool_map, sizes]):
+    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_prepared_graph_sizes(pool_map, "pool_map", sizes, 1)
+
+    if pool_map.shape.ndims == 2:
+      return _make_prepared_graph(pool_map, None, None, None, assume_sorted)
+
+    pool_map_shape = tf.shape(input=pool_map)
+    if sizes is not None:
+      sizes_output, sizes_input = tf.unstack(
+          tf.cast(sizes, tf.int32), axis=-1)
+      input_indices = _sequence_mask_indices(sizes_input, pool_map_shape[-1])
+      max_sizes_output = tf.reduce_max(input_tensor=sizes_output)
+      output_indices = _sequence_mask_indices(sizes_output, max_sizes_output)
+      output_shape = tf.concat(
+          (tf.shape(input=sizes_output), (max_sizes_output,)), axis=0)
+    else:
+      input_indices = None
+      output_indices = None
+      output_shape = pool_map_shape[:-1]
+    adjacency = convert_to_block_diag_2d(pool_map, sizes)
+    return _make_prepared_graph(adjacency, input_indices, output_indices,
+                                output_shape, assume_sorted)
+
+
+def prepare_graph_unpooling_input(pool_map,
+                                  sizes=None,
+                                  assume_sorted=False,
+                                  name=None):
+  """Prepares the `pool_map` input of graph unpooling ops for reuse.
+
+  The output can be passed as the `pool_map` argument of
+  `graph_pooling.unpool` and `graph_pooling.upsample_transposed_convolution`,
+  in which case their `sizes` argument is ignored. `pool_map` and `sizes` are
+  the same as used for pooling, but the resulting `PreparedGraph` maps the
+  pooled vertices (the rows of `adjacency`) to the unpooled ones (its columns).
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    pool_map: A `SparseTensor` with shape `[A1, ..., An, V1, V2]`.
+    sizes: An `int` tensor of shape `[A1, ..., An, 2]` indicating the true
+      input sizes in case of padding (`sizes=None` indicates no padding).
+      `sizes[A1, ..., An, 0] <= V1` and `sizes[A1, ..., An, 1] <= V2`.
+    assume_sorted: A `bool` indicating whether the entries of `pool_map` are
+      already in canonical row-major order, for instance if it was built by
+      `graph_construction`. If `False`, the entries are sorted.
+    name: A name for this op. Defaults to
+      `utils_prepare_graph_unpooling_input`.
+
+  Returns:
+    A `PreparedGraph`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(name, "utils_prepare_graph_unpooling_input",
+                               [pool_map, sizes]):
+    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_prepared_graph_sizes(pool_map, "pool_map", sizes, 1)
+
+    if pool_map.shape.ndims == 2:
+      return _make_prepared_graph(pool_map, None, None, None, assume_sorted)
+
+    pool_map_shape = tf.shape(input=pool_map)
+    if sizes is not None:
+      sizes_input, sizes_output = tf.unstack(
+          tf.cast(sizes, tf.int32), axis=-1)
+      input_indices = _sequence_mask_indices(sizes_input, pool_map_shape[-2])
+      max_sizes_output = tf.reduce_max(input_tensor=sizes_output)
+      output_indices = _sequence_mask_indices(sizes_output, max_sizes_output)
+      output_shape = tf.concat(
+          (tf.shape(input=sizes_output), (max_sizes_output,)), axis=0)
+    else:
+      input_indices = None
+      output_indices = None
+      output_shape = tf.concat((pool_map_shape[:-2], pool_map_shape[-1:]),
+                               axis=0)
+    adjacency = convert_to_block_diag_2d(pool_map, sizes)
+    return _make_prepared_graph(adjacency, input_indices, output_indices,
+                                output_shape, assume_sorted)
+
+
+def _make_padded_graph(adjacency, sizes, max_num_edges, output_axis):
+  """Builds the `PaddedGraph` of a `SparseTensor` with a static shape.
+
+  Args:
+    adjacency: A `SparseTensor` with static shape `[A1, ..., An, R, C]`.
+    sizes: An `int` tensor of shape `[A1, ..., An, 2]` containing the number of
+      valid rows and columns of each graph, or `None`.
+    max_num_edges: The `int` number of edges stored per graph.
+    output_axis: Either -2 or -1, the axis of `adjacency` indexing the output
+      vertices.
+
+  Returns:
+    A `PaddedGraph`.
+
+  Raises:
+    ValueError: if the shape of `adjacency` is not static.
+  """
+  adjacency_shape = adjacency.shape.as_list()
+  if None in adjacency_shape:
+    raise ValueError("The shape of the graph must be static.")
+  batch_shape = adjacency_shape[:-2]
+  num_rows, num_cols = adjacency_shape[-2:]
+  batch_size = 1
+  for dimension in batch_shape:
+    batch_size *= dimension
+  num_edges = batch_size * max_num_edges
+
+  adjacency = tf.sparse.reorder(adjacency)
+  indices = adjacency.indices
+  batch_ids = tf.zeros_like(indices[:, 0])
+  for axis, dimension in enumerate(batch_shape):
+    batch_ids = batch_ids * dimension + indices[:, axis]
+  # Position of each entry in the edge list of its graph.
+  graph_sizes = tf.math.unsorted_segment_sum(
+      data=tf.ones_like(batch_ids), segment_ids=batch_ids,
+      num_segments=batch_size)
+  positions = tf.range(tf.size(input=batch_ids, out_type=tf.int64)) - tf.gather(
+      tf.cumsum(graph_sizes, exclusive=True), batch_ids)
+  assertion = tf.compat.v1.assert_less_equal(
+      graph_sizes, tf.cast(max_num_edges, tf.int64),
+      message="A graph has more than 'max_num_edges' edges.")
+  with tf.control_dependencies([assertion]):
+    edge_ids = tf.expand_dims(batch_ids * max_num_edges + positions, axis=-1)
+
+  def _scatter(updates, padding_value):
+    """Scatters the entries to the edge lists, padded with `padding_value`."""
+    return tf.scatter_nd(
+        indices=edge_ids, updates=updates - padding_value,
+        shape=(num_edges,)) + padding_value
+
+  num_input_rows = batch_size * num_rows
+  num_input_cols = batch_size * num_cols
+  row_ids = _scatter(
+      tf.cast(batch_ids * num_rows + indices[:, -2], tf.int32), num_input_rows)
+  col_ids = _scatter(
+      tf.cast(batch_ids * num_cols + indices[:, -1], tf.int32), num_input_cols)
+  values = _scatter(adjacency.values, tf.zeros((), dtype=adjacency.dtype))
+
+  num_output_vertices = adjacency_shape[output_axis]
+  if sizes is None:
+    output_mask = tf.ones((batch_size * num_output_vertices,),
+                          dtype=adjacency.dtype)
+  else:
+    output_mask = tf.reshape(
+        tf.sequence_mask(
+            sizes[..., output_axis], num_output_vertices,
+            dtype=adjacency.dtype), (-1,))
+  return PaddedGraph(row_ids, col_ids, values, output_mask,
+                     tuple(batch_shape) + (num_output_vertices,))
+
+
+def prepare_padded_graph_convolution_input(neighbors,
+                                           sizes,
+                                           max_num_edges,
+                                           name=None):
+  """Prepares the `neighbors` input of graph convolutions for XLA.
+
+  The output can be passed as the `neighbors` argument of
+  `graph_convolution.feature_steered_convolution` and
+  `graph_convolution.edge_convolution_template`, in which case their `sizes`
+  argument is ignored, see `PaddedGraph`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    neighbors: A `SparseTensor` with static shape `[A1, ..., An, V, V]`.
+    sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+      sizes in case of padding (`sizes=None` indicates no padding). If
+      `neighbors` is 2-D, `sizes` will be ignored.
+    max_num_edges: The `int` maximum number of edges of a graph of the batch.
+    name: A name for this op. Defaults to
+      `utils_prepare_padded_graph_convolution_input`.
+
+  Returns:
+    A `PaddedGraph`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(
+      name, "utils_prepare_padded_graph_convolution_input", [neighbors, sizes]):
+    neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+        value=neighbors)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_prepared_graph_sizes(neighbors, "neighbors", sizes, 0)
+
+    if sizes is not None and neighbors.shape.ndims > 2:
+      sizes = tf.stack((sizes, sizes), axis=-1)
+    else:
+      sizes = None
+    return _make_padded_graph(neighbors, sizes, max_num_edges, -2)
+
+
+def prepare_padded_graph_pooling_input(pool_map,
+                                       sizes,
+                                       max_num_edges,
+                                       name=None):
+  """Prepares the `pool_map` input of `graph_pooling.pool` for XLA.
+
+  The output can be passed as the `pool_map` argument of `graph_pooling.pool`,
+  in which case its `sizes` argument is ignored, see `PaddedGraph`. Unlike
+  with a `PreparedGraph`, the pooled output has `V2` vertices.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    pool_map: A `SparseTensor` with static shape `[A1, ..., An, V2, V1]`.
+    sizes: An `int` tensor of shape `[A1, ..., An, 2]` indicating the true
+      input sizes in case of padding (`sizes=None` indicates no padding).
+      `sizes[A1, ..., An, 0] <= V2` and `sizes[A1, ..., An, 1] <= V1`.
+    max_num_edges: The `int` maximum number of entries of a pooling map of the
+      batch.
+    name: A name for this op. Defaults to
+      `utils_prepare_padded_graph_pooling_input`.
+
+  Returns:
+    A `PaddedGraph`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(
+      name, "utils_prepare_padded_graph_pooling_input", [pool_map, sizes]):
+    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_prepared_graph_sizes(pool_map, "pool_map", sizes, 1)
+
+    return _make_padded_graph(pool_map, sizes, max_num_edges, -2)
+
+
+def prepare_padded_graph_unpooling_input(pool_map,
+                                         sizes,
+                                         max_num_edges,
+                                         name=None):
+  """Prepares the `pool_map` input of `graph_pooling.unpool` for XLA.
+
+  The output can be passed as the `pool_map` argument of `graph_pooling.unpool`,
+  in which case its `sizes` argument is ignored, see `PaddedGraph`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    pool_map: A `SparseTensor` with static shape `[A1, ..., An, V1, V2]`.
+    sizes: An `int` tensor of shape `[A1, ..., An, 2]` indicating the true
+      input sizes in case of padding (`sizes=None` indicates no padding).
+      `sizes[A1, ..., An, 0] <= V1` and `sizes[A1, ..., An, 1] <= V2`.
+    max_num_edges: The `int` maximum number of entries of a pooling map of the
+      batch.
+    name: A name for this op. Defaults to
+      `utils_prepare_padded_graph_unpooling_input`.
+
+  Returns:
+    A `PaddedGraph`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  with tf.compat.v1.name_scope(
+      name, "utils_prepare_padded_graph_unpooling_input", [pool_map, sizes]):
+    pool_map = tf.compat.v1.convert_to_tensor_or_sparse_tensor(value=pool_map)
+    if sizes is not None:
+      sizes = tf.convert_to_tensor(value=sizes)
+
+    _check_valid_prepared_graph_sizes(pool_map, "pool_map", sizes, 1)
+
+    return _make_padded_graph(pool_map, sizes, max_num_edges, -1)
+
+
+def check_valid_prepared_graph_input(data, graph, graph_name):
+  """Checks that `data` is a valid op input for a `PreparedGraph`.
+
+  Args:
+    data: A `float` tensor with shape `[A1, ..., An, V, C]`.
+    graph: A `PreparedGraph` or a `PaddedGraph` with the same type as `data`.
+    graph_name: The name of the `graph` argument of the op.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  if not data.dtype.is_floating:
+    raise TypeError("'data' must have a float type.")
+  if graph.values.dtype != data.dtype:
+    raise TypeError("'{}' and 'data' must have the same type.".format(
+        graph_name))
+  if isinstance(graph, PaddedGraph):
+    shape.check_static(
+        tensor=data, tensor_name="data", has_rank=len(graph.output_shape) + 1)
+  elif graph.output_shape is None:
+    shape.check_static(tensor=data, tensor_name="data", has_rank=2)
+  else:
+    shape.check_static(
+        tensor=data, tensor_name="data", has_rank_greater_than=2)
+
+
+def flatten_prepared_graph_input(data, graph, name=None):
+  """Flattens an op input with the flattening stored in a `PreparedGraph`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    data: A tensor with shape `[A1, ..., An, V, C]`.
+    graph: A `PreparedGraph` or a `PaddedGraph`.
+    name: A name for this op. Defaults to
+      `utils_flatten_prepared_graph_input`.
+
+  Returns:
+    A 2-D tensor containing the unpadded rows of `data`, or all the rows of
+    `data` followed by a zero row for a `PaddedGraph`.
+  """
+  with tf.compat.v1.name_scope(name, "utils_flatten_prepared_graph_input",
+                               [data]):
+    data = tf.convert_to_tensor(value=data)
+
+    if isinstance(graph, PaddedGraph):
+      data = tf.reshape(data, (-1, tf.shape(input=data)[-1]))
+      return tf.pad(tensor=data, paddings=((0, 1), (0, 0)))
+    if graph.output_shape is None:
+      return data
+    if graph.input_indices is None:
+      return tf.reshape(data, (-1, tf.shape(input=data)[-1]))
+    return tf.gather_nd(params=data, indices=graph.input_indices)
+
+
+def unflatten_prepared_graph_output(data, graph, name=None):
+  """Reshapes a flat op output to the batched output of a `PreparedGraph`.
+
+  Args:
+    data: A 2-D tensor with shape `[M, C]`.
+    graph: A `PreparedGraph` or a `PaddedGraph`.
+    name: A name for this op. Defaults to
+      `utils_unflatten_prepared_graph_output`.
+
+  Returns:
+    A tensor with shape `[A1, ..., An, V', C]`, where `[A1, ..., An, V']` is
+    the value of `graph.output_shape`, or `data` if the graph has no batch
+    dimensions. For a `PaddedGraph`, the last row of `data` is dropped and the
+    padded vertices are set to zero.
+  """
+  with tf.compat.v1.name_scope(name, "utils_unflatten_prepared_graph_output",
+                               [data]):
+    data = tf.convert_to_tensor(value=data)
+
+    if isinstance(graph, PaddedGraph):
+      # Drops the dummy output row and zeroes the padded output vertices.
+      data = data[:-1] * tf.expand_dims(graph.output_mask, axis=-1)
+      output_shape = tf.concat(
+          (graph.output_shape, tf.shape(input=data)[-1:]), axis=0)
+      return tf.reshape(data, output_shape)
+    if graph.output_shape is None:
+      return data
+    output_shape = tf.concat(
+        (tf.cast(graph.output_shape, tf.int32), tf.shape(input=data)[-1:]),
+        axis=0)
+    if graph.output_indices is None:
+      return tf.reshape(data, output_shape)
+    return tf.scatter_nd(
+        indices=graph.output_indices, updates=data, shape=output_shape)
+
+
+def _padded_segment_reduce_2d(data, graph, reduction):
+  """Reduces the rows of a 2-D tensor over the rows of a `PaddedGraph`."""
+  num_segments = graph.num_segments
+  if reduction == "sum":
+    return tf.math.unsorted_segment_sum(
+        data=data, segment_ids=graph.row_ids, num_segments=num_segments)
+  elif reduction == "weighted":
+    weights = tf.expand_dims(tf.cast(graph.values, data.dtype), axis=-1)
+    return tf.math.unsorted_segment_sum(
+        data=data * weights, segment_ids=graph.row_ids,
+        num_segments=num_segments)
+  elif reduction == "max":
+    reduced = tf.math.unsorted_segment_max(
+        data=data, segment_ids=graph.row_ids, num_segments=num_segments)
+    # Empty segments are set to the lowest value of the type.
+    return tf.compat.v1.where(
+        tf.equal(reduced, data.dtype.min), tf.zeros_like(reduced), reduced)
+  elif reduction == "mean":
+    return tf.math.unsorted_segment_mean(
+        data=data, segment_ids=graph.row_ids, num_segments=num_segments)
+  else:
+    raise ValueError(
+        "The reduction method must be 'sum', 'weighted', 'max' or 'mean'")
+
+
+def segment_reduce_2d(data, graph, reduction="sum", name=None):
+  """Reduces the rows of a 2-D tensor over the rows of a `PreparedGraph`.
+
+  The rows of `data` correspond to the entries of `graph.adjacency`, which are
+  sorted by row, so the reduction uses sorted segment ops and does not build
+  any `SparseTensor`. For a `PaddedGraph`, the reduction uses unsorted segment
+  ops with a static number of segments, including the dummy output row.
+
+  Args:
+    data: 2-D tensor with shape `[E, C]`, where `data[e, :]` is associated with
+      the entry `(graph.row_ids[e], graph.col_ids[e])` of `graph.adjacency`.
+    graph: A `PreparedGraph` with `N` rows and `E` entries, or a `PaddedGraph`
+      with `N - 1` output rows and `E` edges.
+    reduction: Either 'sum', 'weighted', 'max' or 'mean'. 'weighted' sums the
+      rows of `data` weighted by `graph.values`. The sums of `float16` and
+      `bfloat16` data are accumulated in `float32`.
+    name: A name for this op. Defaults to `utils_segment_reduce_2d`.
+
+  Returns:
+    A 2-D tensor with shape `[N, C]`. Rows of `graph.adjacency` without any
+    entries are reduced to zero.
+
+  Raises:
+    ValueError: if the inputs have invalid dimensions or the reduction method
+      is invalid.
+  """
+  with tf.compat.v1.name_scope(name, "utils_segment_reduce_2d", [data]):
+    data = tf.convert_to_tensor(value=data)
+
+    shape.check_static(tensor=data, tensor_name="data", has_rank=2)
+
+    if (reduction in ("sum", "weighted", "mean") and
+        data.dtype in (tf.float16, tf.bfloat16)):
+      # Sums of half precision values are accumulated in float32.
+      reduced = segment_reduce_2d(tf.cast(data, tf.float32), graph, reduction)
+      return tf.cast(reduced, data.dtype)
+    if isinstance(graph, PaddedGraph):
+      return _padded_segment_reduce_2d(data, graph, reduction)
+    if reduction == "sum":
+      reduced = tf.math.segment_sum(data=data, segment_ids=graph.row_ids)
+    elif reduction == "weighted":
+      weights = tf.expand_dims(tf.cast(graph.values, data.dtype), axis=-1)
+      reduced = tf.math.segment_sum(
+          data=data * weights, segment_ids=graph.row_ids)
+    elif reduction == "max":
+      reduced = tf.math.segment_max(data=data, segment_ids=graph.row_ids)
+    elif reduction == "mean":
+      reduced = tf.math.segment_mean(data=data, segment_ids=graph.row_ids)
+    else:
+      raise ValueError(
+          "The reduction method must be 'sum', 'weighted', 'max' or 'mean'")
+
+    # Sorted segment ops stop at the last non-empty row.
+    num_rows = tf.size(input=graph.row_splits) - 1
+    padding = num_rows - tf.shape(input=reduced)[0]
+    return tf.pad(tensor=reduced, paddings=((0, padding), (0, 0)))
 
 
 # API contains all public functions and classes.
@@ -17,6 +17,7 @@ from __future__ import division
 from __future__ import print_function
 
 from tensorflow_graphics.geometry.representation.mesh import normals
+from tensorflow_graphics.geometry.representation.mesh import simplification
 from tensorflow_graphics.geometry.representation.mesh import utils
 from tensorflow_graphics.util import export_api as _export_api
 
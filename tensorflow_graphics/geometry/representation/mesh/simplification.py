@@ -0,0 +1,268 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module implements mesh simplification by vertex clustering.
+
+The coarsening hierarchies built here provide the `neighbors` and `pool_map`
+inputs of the graph convolution and pooling ops in `geometry.convolution`.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import functools
+import multiprocessing
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.representation.mesh import utils
+from tensorflow_graphics.util import export_api
+
+
+def _check_valid_vertices(vertices):
+  """Checks that `vertices` is a numpy.ndarray of shape [V, 3]."""
+  if not isinstance(vertices, np.ndarray):
+    raise ValueError("'vertices' must be a numpy.ndarray.")
+  if vertices.ndim != 2 or vertices.shape[1] != 3:
+    raise ValueError(
+        "'vertices' must have a shape [V, 3], but it has shape {}.".format(
+            vertices.shape))
+
+
+def _unique_face_indices(faces, num_vertices):
+  """Returns the sorted indices of the first occurrence of each face.
+
+  Args:
+    faces: An `int64` numpy.ndarray of shape [T, 3] of vertex indices in
+      [0, num_vertices).
+    num_vertices: The number of vertices V of the mesh.
+
+  Returns:
+    An `int64` numpy.ndarray of shape [T2] of indices into `faces`.
+  """
+  if num_vertices > np.iinfo(np.int64).max ** (1.0 / 3.0):
+    # The keys would overflow, so the rows are compared instead.
+    _, first = np.unique(faces, axis=0, return_index=True)
+  else:
+    keys = faces[:, 0] * num_vertices + faces[:, 1]
+    keys = keys * num_vertices + faces[:, 2]
+    _, first = np.unique(keys, return_index=True)
+  return np.sort(first).astype(np.int64)
+
+
+def _sparse_tensor_value(rows, cols, values, dense_shape):
+  """Returns a `tf.compat.v1.SparseTensorValue` with entries in row order."""
+  order = np.lexsort((cols, rows))
+  return tf.compat.v1.SparseTensorValue(
+      indices=np.stack((rows[order], cols[order]), axis=-1).astype(np.int64),
+      values=values[order],
+      dense_shape=np.array(dense_shape, dtype=np.int64))
+
+
+def get_mesh_neighbors(faces, num_vertices, dtype=np.float32):
+  """Builds the degree weighted 1-ring neighborhoods of a triangular mesh.
+
+  Args:
+    faces: A numpy.ndarray of shape [T, 3] of vertex indices.
+    num_vertices: The number of vertices V of the mesh.
+    dtype: A numpy float data type of the weights.
+
+  Returns:
+    A `tf.compat.v1.SparseTensorValue` with shape [V, V], which has an entry
+    1 / degree(v_i) for every directed edge (v_i, v_j) of the mesh and for every
+    self-edge (v_i, v_i), see `utils.get_degree_based_edge_weights`. It can be
+    used as the `neighbors` input of `geometry.convolution` ops.
+  """
+  edges = utils.extract_unique_edges_from_triangular_mesh(
+      faces, directed_edges=True).reshape((-1, 2)).astype(np.int64)
+  self_edges = np.tile(
+      np.arange(num_vertices, dtype=np.int64)[:, np.newaxis], (1, 2))
+  edges = np.concatenate((edges, self_edges), axis=0)
+  weights = utils.get_degree_based_edge_weights(edges, dtype)
+  return _sparse_tensor_value(edges[:, 0], edges[:, 1], weights,
+                              (num_vertices, num_vertices))
+
+
+def cluster_vertices(vertices, faces, voxel_size):
+  """Simplifies a mesh by merging the vertices in each cell of a voxel grid.
+
+  Each output vertex is the centroid of the input vertices in one non-empty
+  voxel. The faces are mapped to the output vertices; faces that collapse to an
+  edge or a vertex are removed, as well as duplicated faces.
+
+  Args:
+    vertices: A numpy.ndarray of shape [V1, 3] of vertex positions.
+    faces: A numpy.ndarray of shape [T1, 3] of vertex indices.
+    voxel_size: The positive edge length of the voxels.
+
+  Returns:
+    vertices: A numpy.ndarray of shape [V2, 3] with the type of `vertices`.
+    faces: A numpy.ndarray of shape [T2, 3] with the type of `faces`.
+    clusters: An `int64` numpy.ndarray of shape [V1], the output vertex of each
+      input vertex, which can be used with `graph_pooling.pool_clusters`.
+
+  Raises:
+    ValueError: If `vertices` or `faces` are invalid, or if `voxel_size` is not
+      positive.
+  """
+  _check_valid_vertices(vertices)
+  utils.check_valid_faces(faces)
+  if voxel_size <= 0:
+    raise ValueError("'voxel_size' must be positive.")
+
+  coordinates = np.floor(
+      (vertices - np.min(vertices, axis=0)) / voxel_size).astype(np.int64)
+  grid_shape = np.max(coordinates, axis=0) + 1
+  keys = np.ravel_multi_index(coordinates.T, grid_shape)
+  _, clusters = np.unique(keys, return_inverse=True)
+  clusters = clusters.reshape((-1,)).astype(np.int64)
+  num_clusters = np.max(clusters) + 1 if clusters.size else 0
+  cluster_sizes = np.bincount(clusters, minlength=num_clusters)
+  pooled_vertices = np.stack([
+      np.bincount(clusters, weights=vertices[:, axis], minlength=num_clusters)
+      for axis in range(3)
+  ], axis=-1) / cluster_sizes[:, np.newaxis]
+
+  pooled_faces = clusters[faces]
+  is_valid = np.logical_and(
+      np.logical_and(pooled_faces[:, 0] != pooled_faces[:, 1],
+                     pooled_faces[:, 1] != pooled_faces[:, 2]),
+      pooled_faces[:, 2] != pooled_faces[:, 0])
+  pooled_faces = pooled_faces[is_valid]
+  # Rotates each face such that its smallest index comes first, which keeps
+  # its orientation, then removes the duplicates in order of appearance.
+  shifts = np.argmin(pooled_faces, axis=-1)[:, np.newaxis]
+  pooled_faces = np.take_along_axis(
+      pooled_faces, (shifts + np.arange(3)) % 3, axis=-1)
+  pooled_faces = pooled_faces[_unique_face_indices(pooled_faces, num_clusters)]
+  return (pooled_vertices.astype(vertices.dtype),
+          pooled_faces.astype(faces.dtype), clusters)
+
+
+def build_hierarchy(vertices,
+                    faces,
+                    num_levels,
+                    voxel_size,
+                    scale=2.0,
+                    dtype=np.float32):
+  """Builds a coarsening hierarchy of a mesh by vertex clustering.
+
+  Level 0 is the input mesh, and level l > 0 is obtained by clustering the
+  vertices of level l - 1 with voxels of size `voxel_size * scale**(l - 1)`,
+  see `cluster_vertices`.
+
+  Args:
+    vertices: A numpy.ndarray of shape [V, 3] of vertex positions.
+    faces: A numpy.ndarray of shape [T, 3] of vertex indices.
+    num_levels: The number of coarsened levels.
+    voxel_size: The positive voxel size of the first coarsening.
+    scale: The factor by which the voxel size grows at each level.
+    dtype: A numpy float data type of the `neighbors` and `pool_map` values.
+
+  Returns:
+    A list of `num_levels + 1` dictionaries, one per level, with fields
+      'vertices': A numpy.ndarray of shape [V_l, 3] of vertex positions.
+      'faces': A numpy.ndarray of shape [T_l, 3] of vertex indices.
+      'neighbors': A `tf.compat.v1.SparseTensorValue` with shape [V_l, V_l],
+        see `get_mesh_neighbors`.
+    and for levels l > 0
+      'clusters': An `int64` numpy.ndarray of shape [V_{l-1}], the vertex of
+        level l that each vertex of level l - 1 is merged into.
+      'pool_map': A `tf.compat.v1.SparseTensorValue` with shape
+        [V_l, V_{l-1}], where row v_l contains 1 / |cluster(v_l)| for each
+        vertex of level l - 1 in the cluster of v_l. It can be used with
+        `graph_pooling.pool`, `graph_pooling.unpool` and
+        `graph_pooling.upsample_transposed_convolution`.
+
+  Raises:
+    ValueError: If the inputs are invalid.
+  """
+  if num_levels < 0:
+    raise ValueError("'num_levels' must be non-negative.")
+  _check_valid_vertices(vertices)
+  utils.check_valid_faces(faces)
+
+  levels = [{
+      "vertices": vertices,
+      "faces": faces,
+      "neighbors": get_mesh_neighbors(faces, vertices.shape[0], dtype),
+  }]
+  for level in range(num_levels):
+    vertices, faces, clusters = cluster_vertices(
+        vertices, faces, voxel_size * scale**level)
+    num_clusters = vertices.shape[0]
+    cluster_sizes = np.bincount(clusters, minlength=num_clusters)
+    pool_map = _sparse_tensor_value(
+        clusters, np.arange(clusters.shape[0], dtype=np.int64),
+        (1.0 / cluster_sizes[clusters]).astype(dtype),
+        (num_clusters, clusters.shape[0]))
+    levels.append({
+        "vertices": vertices,
+        "faces": faces,
+        "neighbors": get_mesh_neighbors(faces, num_clusters, dtype),
+        "clusters": clusters,
+        "pool_map": pool_map,
+    })
+  return levels
+
+
+def _build_hierarchy_from_tuple(mesh, **kwargs):
+  """Calls `build_hierarchy` on a (vertices, faces) tuple."""
+  return build_hierarchy(mesh[0], mesh[1], **kwargs)
+
+
+def build_hierarchies(meshes,
+                      num_levels,
+                      voxel_size,
+                      scale=2.0,
+                      dtype=np.float32,
+                      num_processes=None):
+  """Builds the coarsening hierarchies of a list of meshes in parallel.
+
+  Args:
+    meshes: A list of (vertices, faces) numpy.ndarray tuples, see
+      `build_hierarchy`.
+    num_levels: The number of coarsened levels.
+    voxel_size: The positive voxel size of the first coarsening.
+    scale: The factor by which the voxel size grows at each level.
+    dtype: A numpy float data type of the `neighbors` and `pool_map` values.
+    num_processes: The number of worker processes. Defaults to the number of
+      CPUs. If 1, the hierarchies are built in the calling process. The
+      workers are spawned, so the main module of a calling script must guard
+      its entry point with `if __name__ == "__main__":`.
+
+  Returns:
+    A list with the output of `build_hierarchy` for each mesh.
+  """
+  build_fn = functools.partial(
+      _build_hierarchy_from_tuple,
+      num_levels=num_levels,
+      voxel_size=voxel_size,
+      scale=scale,
+      dtype=dtype)
+  if num_processes == 1:
+    return [build_fn(mesh) for mesh in meshes]
+  # The workers are spawned rather than forked, since forking a process in
+  # which TensorFlow has started its thread pools can deadlock.
+  pool = multiprocessing.get_context("spawn").Pool(processes=num_processes)
+  try:
+    return pool.map(build_fn, meshes)
+  finally:
+    pool.close()
+    pool.join()
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
@@ -0,0 +1,150 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for simplification."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.convolution import graph_convolution
+from tensorflow_graphics.geometry.convolution import graph_pooling
+from tensorflow_graphics.geometry.representation.mesh import simplification
+from tensorflow_graphics.util import test_case
+
+
+def _grid_mesh(num_rows, num_cols):
+  """Creates a planar triangulated grid with unit spacing."""
+  rows, cols = np.meshgrid(np.arange(num_rows), np.arange(num_cols),
+                           indexing="ij")
+  vertices = np.stack((rows, cols, np.zeros_like(rows)), axis=-1)
+  vertices = vertices.reshape((-1, 3)).astype(np.float32)
+  ids = np.arange(num_rows * num_cols).reshape((num_rows, num_cols))
+  top_left = ids[:-1, :-1].ravel()
+  top_right = ids[:-1, 1:].ravel()
+  bottom_left = ids[1:, :-1].ravel()
+  bottom_right = ids[1:, 1:].ravel()
+  faces = np.concatenate(
+      (np.stack((top_left, bottom_left, top_right), axis=-1),
+       np.stack((top_right, bottom_left, bottom_right), axis=-1)), axis=0)
+  return vertices, faces.astype(np.int32)
+
+
+class SimplificationTest(test_case.TestCase):
+
+  @parameterized.parameters(
+      ("'vertices' must be a numpy.ndarray.", ((0., 0., 0.),), 1.0),
+      ("'vertices' must have a shape", np.zeros((3, 2)), 1.0),
+      ("'voxel_size' must be positive.", np.zeros((3, 3)), 0.0),
+  )
+  def test_cluster_vertices_exception_raised(self, error_msg, vertices,
+                                             voxel_size):
+    """Tests that the correct exceptions are raised."""
+    with self.assertRaisesRegexp(ValueError, error_msg):
+      simplification.cluster_vertices(vertices, np.array(((0, 1, 2),)),
+                                      voxel_size)
+
+  def test_cluster_vertices_preset(self):
+    """Tests clustering a grid into 2x2 blocks of vertices."""
+    vertices, faces = _grid_mesh(4, 4)
+
+    pooled_vertices, pooled_faces, clusters = simplification.cluster_vertices(
+        vertices, faces, voxel_size=2.0)
+
+    self.assertAllEqual(clusters.reshape((4, 4)),
+                        ((0, 0, 1, 1), (0, 0, 1, 1), (2, 2, 3, 3),
+                         (2, 2, 3, 3)))
+    self.assertAllClose(pooled_vertices,
+                        ((0.5, 0.5, 0.), (0.5, 2.5, 0.), (2.5, 0.5, 0.),
+                         (2.5, 2.5, 0.)))
+    self.assertAllEqual(pooled_faces, ((0, 2, 1), (1, 2, 3)))
+    self.assertEqual(pooled_faces.dtype, faces.dtype)
+
+  def test_cluster_vertices_single_cluster(self):
+    """Tests that collapsed faces are removed."""
+    vertices, faces = _grid_mesh(3, 3)
+
+    pooled_vertices, pooled_faces, clusters = simplification.cluster_vertices(
+        vertices, faces, voxel_size=10.0)
+
+    self.assertAllClose(pooled_vertices, ((1., 1., 0.),))
+    self.assertEqual(pooled_faces.shape, (0, 3))
+    self.assertAllEqual(clusters, np.zeros(9))
+
+  @parameterized.parameters((0,), (1,), (3,))
+  def test_build_hierarchy_levels(self, num_levels):
+    """Tests the shapes and consistency of the levels of the hierarchy."""
+    vertices, faces = _grid_mesh(9, 7)
+
+    levels = simplification.build_hierarchy(
+        vertices, faces, num_levels, voxel_size=2.0)
+
+    self.assertLen(levels, num_levels + 1)
+    for previous, level in zip(levels[:-1], levels[1:]):
+      num_vertices = level["vertices"].shape[0]
+      num_previous = previous["vertices"].shape[0]
+      self.assertLess(num_vertices, num_previous)
+      self.assertAllEqual(level["pool_map"].dense_shape,
+                          (num_vertices, num_previous))
+      self.assertAllEqual(level["neighbors"].dense_shape,
+                          (num_vertices, num_vertices))
+      with self.subTest(name="pool_map"):
+        pooled = graph_pooling.pool(
+            previous["vertices"], level["pool_map"], None, "weighted")
+        self.assertAllClose(pooled, level["vertices"])
+      with self.subTest(name="clusters"):
+        pooled = graph_pooling.pool_clusters(
+            previous["vertices"], level["clusters"], num_vertices, "mean")
+        self.assertAllClose(pooled, level["vertices"])
+    for level in levels:
+      neighbors = tf.sparse.to_dense(
+          tf.compat.v1.convert_to_tensor_or_sparse_tensor(level["neighbors"]))
+      self.assertAllClose(
+          tf.reduce_sum(input_tensor=neighbors, axis=-1),
+          np.ones(level["vertices"].shape[0]))
+      var_u = np.ones((3, 1), dtype=np.float32)
+      var_w = (np.ones((3, 2), dtype=np.float32),)
+      convolved = graph_convolution.feature_steered_convolution(
+          level["vertices"], level["neighbors"], None, var_u, var_u,
+          np.zeros((1,), dtype=np.float32), var_w,
+          np.zeros((2,), dtype=np.float32))
+      self.assertAllEqual(convolved.shape, (level["vertices"].shape[0], 2))
+
+  def test_build_hierarchies_parallel(self):
+    """Tests that the hierarchies built in parallel match the serial ones."""
+    meshes = [_grid_mesh(5, 6), _grid_mesh(8, 3), _grid_mesh(4, 4)]
+
+    serial = simplification.build_hierarchies(
+        meshes, 2, voxel_size=2.0, num_processes=1)
+    parallel = simplification.build_hierarchies(
+        meshes, 2, voxel_size=2.0, num_processes=2)
+
+    self.assertLen(parallel, len(meshes))
+    for serial_levels, parallel_levels in zip(serial, parallel):
+      for serial_level, parallel_level in zip(serial_levels[1:],
+                                              parallel_levels[1:]):
+        self.assertAllEqual(serial_level["faces"], parallel_level["faces"])
+        self.assertAllEqual(serial_level["clusters"],
+                            parallel_level["clusters"])
+        self.assertAllEqual(serial_level["pool_map"].indices,
+                            parallel_level["pool_map"].indices)
+        self.assertAllClose(serial_level["vertices"],
+                            parallel_level["vertices"])
+
+
+if __name__ == "__main__":
+  test_case.main()
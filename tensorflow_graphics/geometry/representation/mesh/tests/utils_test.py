@@ -17,8 +17,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import time
+
 from absl.testing import parameterized
 import numpy as np
+import tensorflow as tf
 
 from tensorflow_graphics.geometry.representation.mesh import utils
 from tensorflow_graphics.util import test_case
@@ -101,6 +104,75 @@ class UtilsTest(test_case.TestCase):
     with self.assertRaisesRegexp(ValueError, error_msg):
       utils.get_degree_based_edge_weights(invalid_input)
 
+  @parameterized.parameters((False,), (True,))
+  def test_extract_unique_edges_from_triangular_mesh_random(
+      self, directed_edges):
+    """Tests that the edges are unique and sorted lexicographically."""
+    faces = np.random.randint(0, 50, size=(100, 3)).astype(np.int32)
+
+    edges = utils.extract_unique_edges_from_triangular_mesh(
+        faces, directed_edges=directed_edges)
+
+    all_edges = np.concatenate(
+        (faces[:, 0:2], faces[:, 1:3], faces[:, (2, 0)]), axis=0)
+    if directed_edges:
+      all_edges = np.concatenate((all_edges, all_edges[:, ::-1]), axis=0)
+    self.assertEqual(edges.dtype, faces.dtype)
+    self.assertAllEqual(edges, sorted(set(map(tuple, all_edges.tolist()))))
+
+  @parameterized.parameters(
+      (np.array(((0, 1, 2),)), True,
+       [[0, 0], [0, 1], [0, 2], [1, 0], [1, 1], [1, 2], [2, 0], [2, 1],
+        [2, 2]],
+       [1.0 / 3] * 9),
+      (np.array(((0, 1, 2), (0, 1, 3))), False,
+       [[0, 1], [0, 2], [0, 3], [1, 0], [1, 2], [1, 3], [2, 0], [2, 1],
+        [3, 0], [3, 1]],
+       [1.0 / 3, 1.0 / 3, 1.0 / 3, 1.0 / 3, 1.0 / 3, 1.0 / 3,
+        0.5, 0.5, 0.5, 0.5]),
+  )
+  def test_extract_weighted_edges_from_triangular_mesh_preset(
+      self, faces, self_edges, expected_edges, expected_weights):
+    """Tests that the output contains the expected edges and weights."""
+    edges, weights = utils.extract_weighted_edges_from_triangular_mesh(
+        faces, self_edges=self_edges)
+
+    self.assertAllEqual(edges, expected_edges)
+    self.assertAllClose(weights, expected_weights)
+
+  @parameterized.parameters((False,), (True,))
+  def test_extract_weighted_edges_from_triangular_mesh_random(self,
+                                                              self_edges):
+    """Tests that the output matches the separate extraction functions."""
+    faces = np.random.randint(0, 50, size=(100, 3)).astype(np.int32)
+
+    edges, weights = utils.extract_weighted_edges_from_triangular_mesh(
+        faces, self_edges=self_edges, dtype=np.float64)
+
+    expected_edges = utils.extract_unique_edges_from_triangular_mesh(
+        faces, directed_edges=True)
+    if self_edges:
+      vertices = np.unique(faces)
+      expected_edges = sorted(
+          set(map(tuple, expected_edges.tolist())) |
+          set(zip(vertices, vertices)))
+      expected_edges = np.array(expected_edges, dtype=faces.dtype)
+    expected_weights = utils.get_degree_based_edge_weights(
+        expected_edges, dtype=np.float64)
+    self.assertAllEqual(edges, expected_edges)
+    self.assertAllClose(weights, expected_weights)
+
+  @parameterized.parameters(
+      (1, "'faces' must be a numpy.ndarray."),
+      (np.array((1,)), "must have a rank equal to 2"),
+      (np.array(((1, 1),)), "must have exactly 3 dimensions in the last axis"),
+  )
+  def test_extract_weighted_edges_from_triangular_mesh_raised(
+      self, invalid_input, error_msg):
+    """Tests that the shape exceptions are properly raised."""
+    with self.assertRaisesRegexp(ValueError, error_msg):
+      utils.extract_weighted_edges_from_triangular_mesh(invalid_input)
+
   @parameterized.parameters(
       (np.bool, "must be a numpy float type"),
       (np.int, "must be a numpy float type"),
@@ -114,5 +186,39 @@ class UtilsTest(test_case.TestCase):
     with self.assertRaisesRegexp(ValueError, error_msg):
       utils.get_degree_based_edge_weights(np.array(((1, 1),)), invalid_type)
 
+
+class UtilsBenchmark(tf.test.Benchmark):
+  """Benchmarks the edge extraction on large random meshes."""
+
+  def _report(self, function, name, num_faces, num_iters=3):
+    start = time.time()
+    for _ in range(num_iters):
+      function()
+    self.report_benchmark(
+        iters=num_iters,
+        wall_time=(time.time() - start) / num_iters,
+        name=name,
+        extras={"num_faces": num_faces})
+
+  def benchmark_extract_edges_from_triangular_mesh(self):
+    num_faces = 1000000
+    faces = np.random.randint(
+        num_faces // 2, size=(num_faces, 3)).astype(np.int32)
+
+    def _unique_rows():
+      edges = np.concatenate(
+          (faces[:, 0:2], faces[:, 1:3], faces[:, (2, 0)]), axis=0)
+      edges = np.concatenate((edges, edges[:, ::-1]), axis=0)
+      return np.unique(edges, axis=0)
+
+    self._report(_unique_rows, "unique_rows_directed_edges", num_faces)
+    self._report(
+        lambda: utils.extract_unique_edges_from_triangular_mesh(faces, True),
+        "extract_unique_edges_directed_edges", num_faces)
+    self._report(
+        lambda: utils.extract_weighted_edges_from_triangular_mesh(faces),
+        "extract_weighted_edges_with_self_edges", num_faces)
+
+
 if __name__ == "__main__":
   test_case.main()
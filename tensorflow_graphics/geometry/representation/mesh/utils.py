@@ -22,6 +22,36 @@ import numpy as np
 from tensorflow_graphics.util import export_api
 
 
+def check_valid_faces(faces):
+  """Checks that `faces` is a numpy.ndarray of shape [T, 3].
+
+  Args:
+    faces: The faces of a triangular mesh.
+
+  Raises:
+    ValueError: If `faces` is not a numpy.ndarray of shape [T, 3].
+  """
+  if not isinstance(faces, np.ndarray):
+    raise ValueError("'faces' must be a numpy.ndarray.")
+  faces_shape = faces.shape
+  faces_rank = len(faces_shape)
+  if faces_rank != 2:
+    raise ValueError(
+        "'faces' must have a rank equal to 2, but it has rank {} and shape {}."
+        .format(faces_rank, faces_shape))
+  if faces_shape[1] != 3:
+    raise ValueError(
+        "'faces' must have exactly 3 dimensions in the last axis, but it has {}"
+        " dimensions and is of shape {}."
+        .format(faces_shape[1], faces_shape))
+
+
+def _unique_edge_keys(sources, targets, num_vertices):
+  """Returns the sorted unique int64 keys `source * num_vertices + target`."""
+  keys = sources.astype(np.int64) * num_vertices + targets.astype(np.int64)
+  return np.unique(keys)
+
+
 def extract_unique_edges_from_triangular_mesh(faces, directed_edges=False):
   """Extracts all the unique edges using the faces of a mesh.
 
@@ -53,25 +83,66 @@ def extract_unique_edges_from_triangular_mesh(faces, directed_edges=False):
     ValueError: If `faces` is not a numpy.ndarray or if its shape is not
       supported.
   """
-  if not isinstance(faces, np.ndarray):
-    raise ValueError("'faces' must be a numpy.ndarray.")
-  faces_shape = faces.shape
-  faces_rank = len(faces_shape)
-  if faces_rank != 2:
-    raise ValueError(
-        "'faces' must have a rank equal to 2, but it has rank {} and shape {}."
-        .format(faces_rank, faces_shape))
-  if faces_shape[1] != 3:
-    raise ValueError(
-        "'faces' must have exactly 3 dimensions in the last axis, but it has {}"
-        " dimensions and is of shape {}."
-        .format(faces_shape[1], faces_shape))
-  edges = np.concatenate([faces[:, 0:2], faces[:, 1:3], faces[:, [2, 0]]],
-                         axis=0)
+  check_valid_faces(faces)
+  sources = faces.ravel()
+  targets = faces[:, (1, 2, 0)].ravel()
   if directed_edges:
-    edges = np.concatenate([edges, np.flip(edges, axis=-1)])
-  unique_edges = np.unique(edges, axis=0)
-  return unique_edges
+    sources, targets = (np.concatenate((sources, targets)),
+                        np.concatenate((targets, sources)))
+  # Encoding each edge as a single int64 key is much faster than sorting the
+  # rows with `np.unique(axis=0)`, and gives the same lexicographic order.
+  num_vertices = np.max(faces) + 1 if faces.size else 1
+  keys = _unique_edge_keys(sources, targets, num_vertices)
+  unique_edges = np.stack(np.divmod(keys, num_vertices), axis=-1)
+  return unique_edges.astype(faces.dtype)
+
+
+def extract_weighted_edges_from_triangular_mesh(faces,
+                                                self_edges=True,
+                                                dtype=np.float32):
+  r"""Extracts the directed edges of a mesh and their degree based weights.
+
+  This is equivalent to extracting the directed edges with
+  `extract_unique_edges_from_triangular_mesh`, adding the self edges `(i, i)`
+  of all the vertices in `faces` if `self_edges` is True, and computing the
+  weights with `get_degree_based_edge_weights`, but it only sorts the edges
+  once.
+
+  Args:
+    faces: A numpy.ndarray of shape [T, 3], where T is the number of triangular
+      faces in the mesh. Each entry in this array describes the index of a
+      vertex in the mesh.
+    self_edges: A boolean flag, whether to add an edge (i, i) for every vertex
+      i in `faces`.
+    dtype: A numpy float data type. The output weights are of data type dtype.
+
+  Returns:
+    edges: A numpy.ndarray of shape [E, 2] with the same type as `faces`,
+      containing the unique directed edges of the mesh, sorted
+      lexicographically.
+    weights: A dtype numpy.ndarray of shape [E,], where the weight of the
+      edge $(v_i, v_j)$ is $1.0 / degree(v_i)$.
+
+  Raises:
+    ValueError: If `faces` is not a numpy.ndarray or if its shape is not
+      supported, or dtype is not a float type.
+  """
+  if not isinstance(dtype(1), np.floating):
+    raise ValueError("'dtype' must be a numpy float type.")
+  check_valid_faces(faces)
+  sources = faces.ravel()
+  targets = faces[:, (1, 2, 0)].ravel()
+  sources, targets = (np.concatenate((sources, targets)),
+                      np.concatenate((targets, sources)))
+  if self_edges:
+    sources = np.concatenate((sources, faces.ravel()))
+    targets = np.concatenate((targets, faces.ravel()))
+  num_vertices = np.max(faces) + 1 if faces.size else 1
+  keys = _unique_edge_keys(sources, targets, num_vertices)
+  edges = np.stack(np.divmod(keys, num_vertices), axis=-1)
+  degree = np.bincount(edges[:, 0])
+  weights = 1.0 / degree[edges[:, 0]].astype(dtype)
+  return edges.astype(faces.dtype), weights
 
 
 def get_degree_based_edge_weights(edges, dtype=np.float32):
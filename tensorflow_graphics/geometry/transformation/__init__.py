@@ -18,10 +18,15 @@ from __future__ import print_function
 
 from tensorflow_graphics.geometry.transformation import axis_angle
 from tensorflow_graphics.geometry.transformation import euler
+from tensorflow_graphics.geometry.transformation import kinematics
 from tensorflow_graphics.geometry.transformation import quaternion
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
 from tensorflow_graphics.geometry.transformation import rotation_matrix_2d
 from tensorflow_graphics.geometry.transformation import rotation_matrix_3d
 from tensorflow_graphics.geometry.transformation import rotation_matrix_common
+from tensorflow_graphics.geometry.transformation import similarity_transformation_3d
+from tensorflow_graphics.geometry.transformation import skinning
+from tensorflow_graphics.geometry.transformation import trusted_conversion
 from tensorflow_graphics.util import export_api as _export_api
 
 # API contains submodules of tensorflow_graphics.transformation.
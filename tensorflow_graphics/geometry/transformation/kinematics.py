@@ -0,0 +1,154 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module implements kinematics functionalities for articulated skeletons.
+
+A skeleton is a tree of `J` joints, described by the index of the parent of
+each joint, with `-1` for the roots. Each joint has a local rigid
+transformation (see `rigid_transformation_3d`) relative to its parent, which
+can be built from any rotation parameterization with
+`rigid_transformation_3d.from_quaternion`, `from_axis_angle`, `from_euler` or
+`from_rotation_matrix`. Forward kinematics computes the global transformation
+of each joint by composing the local transformations along its chain.
+
+The joints are grouped by their depth in the tree, and all the joints of a
+depth level are composed with their parents at once. The number of ops in the
+graph and in its gradient hence grows with the depth of the skeleton rather
+than with its number of joints.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import shape
+
+
+def _depth_levels(parents):
+  """Groups the joints of a skeleton by their depth in the tree.
+
+  Args:
+    parents: A list of `J` integers, where each entry is the index of the
+      parent of a joint, or `-1` for a root.
+
+  Returns:
+    A list of tuples `(joints, parent_positions)` of `int32` numpy arrays, one
+    per depth level, where `joints` contains the indices of the joints of the
+    level and `parent_positions` the positions of their parents in the
+    `joints` array of the previous level. The `parent_positions` of the roots
+    are `None`.
+
+  Raises:
+    ValueError: If `parents` does not describe a forest.
+  """
+  num_joints = len(parents)
+  if np.any(parents < -1) or np.any(parents >= num_joints):
+    raise ValueError("'parents' must contain indices in [-1, %d)." %
+                     num_joints)
+  depth = np.full((num_joints,), -1, dtype=np.int64)
+  depth[parents == -1] = 0
+  # The depth of each joint is found after at most num_joints iterations.
+  for _ in range(num_joints):
+    undefined = depth == -1
+    if not np.any(undefined):
+      break
+    parent_depth = depth[parents[undefined]]
+    depth[np.flatnonzero(undefined)[parent_depth >= 0]] = (
+        parent_depth[parent_depth >= 0] + 1)
+  if np.any(depth == -1):
+    raise ValueError("'parents' must not contain cycles.")
+
+  levels = []
+  position = np.zeros((num_joints,), dtype=np.int32)
+  for level in range(np.max(depth, initial=-1) + 1):
+    joints = np.flatnonzero(depth == level).astype(np.int32)
+    position[joints] = np.arange(joints.size, dtype=np.int32)
+    parent_positions = position[parents[joints]] if level > 0 else None
+    levels.append((joints, parent_positions))
+  return levels
+
+
+def forward_kinematics(local_transformation, parents, name=None):
+  """Computes the global transformations of the joints of a skeleton.
+
+  The global transformation of a joint is the composition of the global
+  transformation of its parent with its local transformation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    local_transformation: A tensor of shape `[A1, ..., An, J, 7]`, where the
+      last dimension represents the rigid transformation of each joint
+      relative to its parent.
+    parents: A list or numpy array of `J` integers, where each entry is the
+      index of the parent of a joint, or `-1` for a root. The joints do not
+      need to be topologically sorted.
+    name: A name for this op that defaults to
+      "kinematics_forward_kinematics".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, J, 7]`, where the last dimension
+    represents the global rigid transformation of each joint.
+
+  Raises:
+    ValueError: If the shape of `local_transformation` is not supported, or if
+    `parents` does not describe a forest.
+  """
+  with tf.compat.v1.name_scope(name, "kinematics_forward_kinematics",
+                               [local_transformation]):
+    local_transformation = tf.convert_to_tensor(value=local_transformation)
+    parents = np.asarray(parents, dtype=np.int64)
+
+    if parents.ndim != 1:
+      raise ValueError("'parents' must be a list of integers.")
+    shape.check_static(
+        tensor=local_transformation,
+        tensor_name="local_transformation",
+        has_rank_greater_than=1,
+        has_dim_equals=(-1, 7))
+    num_joints = tf.compat.v1.dimension_value(local_transformation.shape[-2])
+    if num_joints is not None and num_joints != parents.size:
+      raise ValueError(
+          "'local_transformation' and 'parents' must have the same number of "
+          "joints.")
+
+    levels = _depth_levels(parents)
+    if not levels:
+      # A skeleton without joints has no transformations to compose.
+      return tf.identity(local_transformation)
+    global_levels = []
+    for joints, parent_positions in levels:
+      transformation = tf.gather(local_transformation, joints, axis=-2)
+      if parent_positions is not None:
+        parent_transformation = tf.gather(
+            global_levels[-1], parent_positions, axis=-2)
+        transformation = rigid_transformation_3d.compose(
+            parent_transformation, transformation)
+      global_levels.append(transformation)
+
+    # Reorders the joints from depth order to their original order.
+    joint_order = np.concatenate([joints for joints, _ in levels])
+    return tf.gather(
+        tf.concat(global_levels, axis=-2),
+        np.argsort(joint_order).astype(np.int32),
+        axis=-2)
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
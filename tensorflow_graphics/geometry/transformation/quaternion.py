@@ -560,13 +560,18 @@ def rotate(point, quaternion, name=None):
         tensors=(point, quaternion), last_axes=-2, broadcast_compatible=True)
     quaternion = asserts.assert_normalized(quaternion)
 
-    padding = [[0, 0] for _ in range(point.shape.ndims)]
-    padding[-1][-1] = 1
-    point = tf.pad(tensor=point, paddings=padding, mode="CONSTANT")
-    point = multiply(quaternion, point)
-    point = multiply(point, conjugate(quaternion))
-    xyz, _ = tf.split(point, (3, 1), axis=-1)
-    return xyz
+    if (quaternion.shape[:-1].num_elements() == 1 and
+        point.shape.ndims is not None and
+        point.shape.ndims >= quaternion.shape.ndims):
+      # A single rotation shared by all points is applied as a matrix.
+      matrix = rotation_matrix_3d.from_quaternion(quaternion)
+      return rotation_matrix_3d.rotate(point, matrix)
+
+    # Closed form of q * (p, 0) * q^-1, which is p + 2w(v x p) + 2v x (v x p)
+    # for q = (v, w).
+    xyz, w = tf.split(quaternion, (3, 1), axis=-1)
+    twice_cross = 2.0 * vector.cross(xyz, point)
+    return point + w * twice_cross + vector.cross(xyz, twice_cross)
 
 
 def relative_angle(quaternion1, quaternion2, name=None):
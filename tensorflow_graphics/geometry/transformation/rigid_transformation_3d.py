@@ -0,0 +1,577 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""This module implements 3d rigid transformation functionalities.
+
+A 3d rigid transformation, or element of the special Euclidean group SE(3),
+maps a point $$\mathbf{p}$$ to $$\mathbf{R}\mathbf{p}+\mathbf{t}$$, where
+$$\mathbf{R}$$ is a rotation and $$\mathbf{t}$$ a translation. In this module,
+rigid transformations are stored as packed tensors of shape `[A1, ..., An, 7]`,
+where the first four entries are a normalized quaternion $$[x, y, z, w]$$
+representing $$\mathbf{R}$$ (see `quaternion`), and the last three entries are
+$$\mathbf{t}$$. Compared to $$4\times4$$ homogeneous matrices, this avoids
+storing and multiplying the constant last row and the redundant rotation
+entries. The $$3\times4$$ matrix form $$[\mathbf{R} | \mathbf{t}]$$ is
+available through `from_matrix` and `to_matrix`.
+
+The exponential map `exp` converts a twist $$[\boldsymbol{\omega}, \mathbf{v}]$$
+of the Lie algebra se(3), where $$\boldsymbol{\omega}$$ is a rotation vector
+(the axis scaled by the angle), to a rigid transformation, and `log` is its
+inverse.
+
+More details about rigid transformations and their Lie algebra can be found on
+[this page.](https://en.wikipedia.org/wiki/Euclidean_group)
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import quaternion as quaternion_lib
+from tensorflow_graphics.geometry.transformation import rotation_matrix_3d
+from tensorflow_graphics.math import vector
+from tensorflow_graphics.util import asserts
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import safe_ops
+from tensorflow_graphics.util import shape
+
+# Below this squared angle, the functions of the angle are evaluated with their
+# Taylor series, which avoids both divisions by zero and the cancellations that
+# make the gradients of the exact expressions inaccurate.
+_SMALL_SQUARED_ANGLE = 1e-2
+
+
+def _evaluate_with_series(squared_angle, function, series_coefficients):
+  """Evaluates a function of an angle with a series for small angles.
+
+  Args:
+    squared_angle: A tensor of squared angles.
+    function: A callable returning the function for a tensor of angles, which
+      is only evaluated on angles above the small angle threshold.
+    series_coefficients: The coefficients of the Taylor series of the function
+      in increasing powers of the squared angle.
+
+  Returns:
+    A tensor with the shape of `squared_angle`.
+  """
+  is_small = squared_angle < _SMALL_SQUARED_ANGLE
+  safe_squared_angle = tf.compat.v1.where(
+      is_small, tf.ones_like(squared_angle), squared_angle)
+  exact = function(tf.sqrt(safe_squared_angle))
+  series = tf.zeros_like(squared_angle)
+  for coefficient in reversed(series_coefficients):
+    series = series * squared_angle + coefficient
+  return tf.compat.v1.where(is_small, series, exact)
+
+
+def _sinc(squared_angle):
+  """Computes sin(x) / x from the squared angle x^2."""
+  return _evaluate_with_series(
+      squared_angle, lambda angle: tf.sin(angle) / angle,
+      (1.0, -1.0 / 6.0, 1.0 / 120.0, -1.0 / 5040.0))
+
+
+def _quaternion_from_rotation_vector(rotation_vector):
+  """Converts a rotation vector [..., 3] to a quaternion [..., 4]."""
+  squared_angle = tf.reduce_sum(
+      input_tensor=tf.square(rotation_vector), axis=-1, keepdims=True)
+  # sin(angle / 2) / angle and cos(angle / 2).
+  half_sinc = 0.5 * _sinc(squared_angle / 4.0)
+  cos_half_angle = _evaluate_with_series(
+      squared_angle, lambda angle: tf.cos(angle / 2.0),
+      (1.0, -1.0 / 8.0, 1.0 / 384.0, -1.0 / 46080.0))
+  return tf.concat((rotation_vector * half_sinc, cos_half_angle), axis=-1)
+
+
+def _rotation_vector_from_quaternion(quaternion):
+  """Converts a normalized quaternion [..., 4] to a rotation vector [..., 3]."""
+  # q and -q are the same rotation, the one with w >= 0 has an angle <= pi.
+  xyz, w = tf.split(quaternion, (3, 1), axis=-1)
+  xyz *= safe_ops.nonzero_sign(w)
+  w = tf.abs(w)
+  squared_sin_half_angle = tf.reduce_sum(
+      input_tensor=tf.square(xyz), axis=-1, keepdims=True)
+  # angle / sin(angle / 2), with the series of 2 * asin(s) / s for small s.
+  ratio = _evaluate_with_series(
+      squared_sin_half_angle,
+      lambda sin_half_angle: 2.0 * tf.atan2(sin_half_angle, w) /
+      sin_half_angle,
+      (2.0, 1.0 / 3.0, 3.0 / 20.0, 5.0 / 56.0, 35.0 / 576.0))
+  return xyz * ratio
+
+
+def from_quaternion(quaternion, translation, name=None):
+  """Builds a rigid transformation from a quaternion and a translation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    quaternion: A tensor of shape `[A1, ..., An, 4]`, where the last dimension
+      represents a normalized quaternion.
+    translation: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a translation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_from_quaternion".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `quaternion` or `translation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_from_quaternion",
+                               [quaternion, translation]):
+    quaternion = tf.convert_to_tensor(value=quaternion)
+    translation = tf.convert_to_tensor(value=translation)
+
+    shape.check_static(
+        tensor=quaternion, tensor_name="quaternion", has_dim_equals=(-1, 4))
+    shape.check_static(
+        tensor=translation, tensor_name="translation", has_dim_equals=(-1, 3))
+    shape.compare_batch_dimensions(
+        tensors=(quaternion, translation),
+        tensor_names=("quaternion", "translation"),
+        last_axes=-2,
+        broadcast_compatible=False)
+    quaternion = asserts.assert_normalized(quaternion)
+
+    return tf.concat((quaternion, translation), axis=-1)
+
+
+def from_rotation_matrix(rotation_matrix, translation, name=None):
+  """Builds a rigid transformation from a rotation matrix and a translation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    rotation_matrix: A tensor of shape `[A1, ..., An, 3, 3]`, where the last
+      two dimensions represent a rotation matrix.
+    translation: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a translation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_from_rotation_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `rotation_matrix` or `translation` is not
+    supported.
+  """
+  with tf.compat.v1.name_scope(name,
+                               "rigid_transformation_3d_from_rotation_matrix",
+                               [rotation_matrix, translation]):
+    quaternion = quaternion_lib.from_rotation_matrix(rotation_matrix)
+    return from_quaternion(quaternion, translation)
+
+
+def from_axis_angle(axis, angle, translation, name=None):
+  """Builds a rigid transformation from an axis-angle and a translation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    axis: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a normalized axis.
+    angle: A tensor of shape `[A1, ..., An, 1]`, where the last dimension
+      represents an angle.
+    translation: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a translation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_from_axis_angle".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `axis`, `angle` or `translation` is not
+    supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_from_axis_angle",
+                               [axis, angle, translation]):
+    quaternion = quaternion_lib.from_axis_angle(axis, angle)
+    return from_quaternion(quaternion, translation)
+
+
+def from_euler(angles, translation, name=None):
+  """Builds a rigid transformation from Euler angles and a translation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    angles: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents the three Euler angles, see `quaternion.from_euler`.
+    translation: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a translation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_from_euler".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `angles` or `translation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_from_euler",
+                               [angles, translation]):
+    quaternion = quaternion_lib.from_euler(angles)
+    return from_quaternion(quaternion, translation)
+
+
+def from_matrix(matrix, name=None):
+  """Builds a rigid transformation from a 3x4 matrix.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    matrix: A tensor of shape `[A1, ..., An, 3, 4]`, where the last two
+      dimensions represent a matrix `[R | t]` with a rotation matrix `R` and a
+      translation `t`.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_from_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `matrix` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_from_matrix",
+                               [matrix]):
+    matrix = tf.convert_to_tensor(value=matrix)
+
+    shape.check_static(
+        tensor=matrix,
+        tensor_name="matrix",
+        has_rank_greater_than=1,
+        has_dim_equals=((-2, 3), (-1, 4)))
+
+    rotation_matrix, translation = tf.split(matrix, (3, 1), axis=-1)
+    return from_rotation_matrix(rotation_matrix,
+                                tf.squeeze(translation, axis=-1))
+
+
+def to_quaternion(transformation, name=None):
+  """Splits a rigid transformation into a quaternion and a translation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_to_quaternion".
+
+  Returns:
+    A tuple of two tensors, respectively of shape `[A1, ..., An, 4]` and
+    `[A1, ..., An, 3]`, where the first tensor represents a normalized
+    quaternion, and the second represents a translation.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_to_quaternion",
+                               [transformation]):
+    transformation = tf.convert_to_tensor(value=transformation)
+
+    shape.check_static(
+        tensor=transformation,
+        tensor_name="transformation",
+        has_dim_equals=(-1, 7))
+
+    quaternion, translation = tf.split(transformation, (4, 3), axis=-1)
+    return asserts.assert_normalized(quaternion), translation
+
+
+def to_rotation_matrix(transformation, name=None):
+  """Splits a rigid transformation into a rotation matrix and a translation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_to_rotation_matrix".
+
+  Returns:
+    A tuple of two tensors, respectively of shape `[A1, ..., An, 3, 3]` and
+    `[A1, ..., An, 3]`, where the first tensor represents a rotation matrix,
+    and the second represents a translation.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name,
+                               "rigid_transformation_3d_to_rotation_matrix",
+                               [transformation]):
+    quaternion, translation = to_quaternion(transformation)
+    return rotation_matrix_3d.from_quaternion(quaternion), translation
+
+
+def to_matrix(transformation, name=None):
+  """Converts a rigid transformation to a 3x4 matrix.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_to_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3, 4]`, where the last two dimensions
+    represent a matrix `[R | t]` with a rotation matrix `R` and a translation
+    `t`.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_to_matrix",
+                               [transformation]):
+    rotation_matrix, translation = to_rotation_matrix(transformation)
+    return tf.concat(
+        (rotation_matrix, tf.expand_dims(translation, axis=-1)), axis=-1)
+
+
+def compose(transformation1, transformation2, name=None):
+  """Composes two rigid transformations.
+
+  The composed transformation first applies `transformation2`, then
+  `transformation1`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions, which must be
+    broadcast compatible.
+
+  Args:
+    transformation1: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    transformation2: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_compose".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `transformation1` or `transformation2` is not
+    supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_compose",
+                               [transformation1, transformation2]):
+    transformation1 = tf.convert_to_tensor(value=transformation1)
+    transformation2 = tf.convert_to_tensor(value=transformation2)
+
+    shape.check_static(
+        tensor=transformation1,
+        tensor_name="transformation1",
+        has_dim_equals=(-1, 7))
+    shape.check_static(
+        tensor=transformation2,
+        tensor_name="transformation2",
+        has_dim_equals=(-1, 7))
+    shape.compare_batch_dimensions(
+        tensors=(transformation1, transformation2),
+        tensor_names=("transformation1", "transformation2"),
+        last_axes=-2,
+        broadcast_compatible=True)
+
+    quaternion1, translation1 = to_quaternion(transformation1)
+    quaternion2, translation2 = to_quaternion(transformation2)
+
+    quaternion = quaternion_lib.multiply(quaternion1, quaternion2)
+    translation = quaternion_lib.rotate(translation2,
+                                        quaternion1) + translation1
+    return tf.concat((quaternion, translation), axis=-1)
+
+
+def inverse(transformation, name=None):
+  """Computes the inverse of a rigid transformation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_inverse".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_inverse",
+                               [transformation]):
+    quaternion, translation = to_quaternion(transformation)
+
+    quaternion = quaternion_lib.conjugate(quaternion)
+    translation = -quaternion_lib.rotate(translation, quaternion)
+    return tf.concat((quaternion, translation), axis=-1)
+
+
+def transform(point, transformation, name=None):
+  """Applies a rigid transformation to a point.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions, which must be
+    broadcast compatible.
+
+  Args:
+    point: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a 3d point.
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to
+      "rigid_transformation_3d_transform".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3]`, where the last dimension represents a
+    3d point.
+
+  Raises:
+    ValueError: If the shape of `point` or `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_transform",
+                               [point, transformation]):
+    point = tf.convert_to_tensor(value=point)
+    transformation = tf.convert_to_tensor(value=transformation)
+
+    shape.check_static(
+        tensor=point, tensor_name="point", has_dim_equals=(-1, 3))
+    shape.check_static(
+        tensor=transformation,
+        tensor_name="transformation",
+        has_dim_equals=(-1, 7))
+    shape.compare_batch_dimensions(
+        tensors=(point, transformation),
+        tensor_names=("point", "transformation"),
+        last_axes=-2,
+        broadcast_compatible=True)
+
+    quaternion, translation = to_quaternion(transformation)
+    return quaternion_lib.rotate(point, quaternion) + translation
+
+
+def exp(twist, name=None):
+  r"""Computes the exponential map from se(3) to rigid transformations.
+
+  The twist $$[\boldsymbol{\omega}, \mathbf{v}]$$ is mapped to the rotation
+  $$\mathbf{R} = \exp([\boldsymbol{\omega}]_\times)$$ and the translation
+  $$\mathbf{t} = \mathbf{V}\mathbf{v}$$, with
+  $$\mathbf{V} = \mathbf{I} + \frac{1 - \cos\theta}{\theta^2}
+  [\boldsymbol{\omega}]_\times + \frac{\theta - \sin\theta}{\theta^3}
+  [\boldsymbol{\omega}]_\times^2$$ and
+  $$\theta = \|\boldsymbol{\omega}\|$$.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    twist: A tensor of shape `[A1, ..., An, 6]`, where the last dimension
+      represents a rotation vector followed by a translational velocity.
+    name: A name for this op that defaults to "rigid_transformation_3d_exp".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rigid transformation.
+
+  Raises:
+    ValueError: If the shape of `twist` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_exp", [twist]):
+    twist = tf.convert_to_tensor(value=twist)
+
+    shape.check_static(
+        tensor=twist, tensor_name="twist", has_dim_equals=(-1, 6))
+
+    rotation_vector, velocity = tf.split(twist, (3, 3), axis=-1)
+    squared_angle = tf.reduce_sum(
+        input_tensor=tf.square(rotation_vector), axis=-1, keepdims=True)
+    # (1 - cos(angle)) / angle^2 and (angle - sin(angle)) / angle^3.
+    coefficient1 = 0.5 * tf.square(_sinc(squared_angle / 4.0))
+    coefficient2 = _evaluate_with_series(
+        squared_angle, lambda angle: (angle - tf.sin(angle)) / angle**3,
+        (1.0 / 6.0, -1.0 / 120.0, 1.0 / 5040.0, -1.0 / 362880.0))
+    cross = vector.cross(rotation_vector, velocity)
+    translation = (
+        velocity + coefficient1 * cross +
+        coefficient2 * vector.cross(rotation_vector, cross))
+    quaternion = _quaternion_from_rotation_vector(rotation_vector)
+    return tf.concat((quaternion, translation), axis=-1)
+
+
+def log(transformation, name=None):
+  r"""Computes the logarithm map from rigid transformations to se(3).
+
+  This is the inverse of `exp`, which returns twists with a rotation angle in
+  $$[0, \pi]$$.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation.
+    name: A name for this op that defaults to "rigid_transformation_3d_log".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 6]`, where the last dimension represents a
+    rotation vector followed by a translational velocity.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "rigid_transformation_3d_log",
+                               [transformation]):
+    quaternion, translation = to_quaternion(transformation)
+
+    rotation_vector = _rotation_vector_from_quaternion(quaternion)
+    squared_angle = tf.reduce_sum(
+        input_tensor=tf.square(rotation_vector), axis=-1, keepdims=True)
+    # (1 - angle / 2 * cot(angle / 2)) / angle^2, from the inverse of V.
+    coefficient = _evaluate_with_series(
+        squared_angle,
+        lambda angle: (1.0 - 0.5 * angle / tf.tan(0.5 * angle)) / angle**2,
+        (1.0 / 12.0, 1.0 / 720.0, 1.0 / 30240.0, 1.0 / 1209600.0))
+    cross = vector.cross(rotation_vector, translation)
+    velocity = (
+        translation - 0.5 * cross +
+        coefficient * vector.cross(rotation_vector, cross))
+    return tf.concat((rotation_vector, velocity), axis=-1)
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
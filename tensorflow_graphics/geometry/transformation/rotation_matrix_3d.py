@@ -394,6 +394,17 @@ def rotate(point, matrix, name=None):
         broadcast_compatible=True)
     matrix = assert_rotation_matrix_normalized(matrix)
 
+    if (matrix.shape[:-2].num_elements() == 1 and
+        point.shape.ndims is not None and
+        point.shape.ndims >= matrix.shape.ndims - 1):
+      # A single rotation shared by all points is applied with one matrix
+      # multiplication, instead of one 3x3 product per point.
+      rotated_point = tf.matmul(
+          tf.reshape(point, (-1, 3)),
+          tf.reshape(matrix, (3, 3)),
+          transpose_b=True)
+      return tf.reshape(rotated_point, tf.shape(input=point))
+
     point = tf.expand_dims(point, axis=-1)
     common_batch_shape = shape.get_broadcasted_shape(
         point.shape[:-2], matrix.shape[:-2])
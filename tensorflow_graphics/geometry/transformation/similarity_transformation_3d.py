@@ -0,0 +1,563 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""This module implements 3d similarity transformation functionalities.
+
+A 3d similarity transformation, or element of the group Sim(3), maps a point
+$$\mathbf{p}$$ to $$s\mathbf{R}\mathbf{p}+\mathbf{t}$$, where $$s > 0$$ is a
+scale, $$\mathbf{R}$$ a rotation and $$\mathbf{t}$$ a translation. In this
+module, similarity transformations are stored as packed tensors of shape
+`[A1, ..., An, 8]`, where the first four entries are a normalized quaternion
+$$[x, y, z, w]$$ representing $$\mathbf{R}$$ (see `quaternion`), the next three
+entries are $$\mathbf{t}$$, and the last entry is $$s$$. The $$3\times4$$ matrix
+form $$[s\mathbf{R} | \mathbf{t}]$$ is available through `from_matrix` and
+`to_matrix`.
+
+The exponential map `exp` converts an element
+$$[\boldsymbol{\omega}, \mathbf{v}, \sigma]$$ of the Lie algebra sim(3), where
+$$\boldsymbol{\omega}$$ is a rotation vector and $$\sigma = \log s$$, to a
+similarity transformation, and `log` is its inverse. Rigid transformations
+(see `rigid_transformation_3d`) are the similarity transformations with
+$$s = 1$$.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import quaternion as quaternion_lib
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.geometry.transformation import rotation_matrix_3d
+from tensorflow_graphics.math import vector
+from tensorflow_graphics.util import asserts
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import shape
+
+# Nodes and weights of the Gauss-Legendre quadrature on [0, 1], which computes
+# the integrals defining the translation part of the exponential map.
+_QUADRATURE_NODES, _QUADRATURE_WEIGHTS = np.polynomial.legendre.leggauss(8)
+_QUADRATURE_NODES = (_QUADRATURE_NODES + 1.0) / 2.0
+_QUADRATURE_WEIGHTS = _QUADRATURE_WEIGHTS / 2.0
+
+
+def _exp_translation_coefficients(rotation_vector, log_scale):
+  r"""Computes the coefficients of the matrix W of the exponential map.
+
+  The translation of the exponential map is $$\mathbf{W}\mathbf{v}$$, where
+  $$\mathbf{W} = \int_0^1 e^{\sigma u} \exp(u[\boldsymbol{\omega}]_\times) du
+  = c_0 \mathbf{I} + c_1 [\boldsymbol{\omega}]_\times +
+  c_2 [\boldsymbol{\omega}]_\times^2$$. The closed forms of the coefficients
+  are numerically unstable when either $$\sigma$$ or the angle are small, so
+  they are integrated with a quadrature, which is accurate to the machine
+  precision for angles in $$[0, \pi]$$ and moderate $$\sigma$$.
+
+  Args:
+    rotation_vector: A tensor of shape `[A1, ..., An, 3]`.
+    log_scale: A tensor of shape `[A1, ..., An, 1]`.
+
+  Returns:
+    A tuple of three tensors of shape `[A1, ..., An, 1]`.
+  """
+  nodes = tf.constant(_QUADRATURE_NODES, dtype=rotation_vector.dtype)
+  weights = tf.constant(_QUADRATURE_WEIGHTS, dtype=rotation_vector.dtype)
+  squared_angle = tf.reduce_sum(
+      input_tensor=tf.square(rotation_vector), axis=-1, keepdims=True)
+  squared_node_angle = squared_angle * tf.square(nodes)
+  weighted_scales = weights * tf.exp(log_scale * nodes)
+  # pylint: disable=protected-access
+  # sin(u * angle) / angle and (1 - cos(u * angle)) / angle^2.
+  sin_ratio = nodes * rigid_transformation_3d._sinc(squared_node_angle)
+  cos_ratio = 0.5 * tf.square(
+      nodes * rigid_transformation_3d._sinc(squared_node_angle / 4.0))
+  # pylint: enable=protected-access
+  return (tf.reduce_sum(input_tensor=weighted_scales, axis=-1, keepdims=True),
+          tf.reduce_sum(
+              input_tensor=weighted_scales * sin_ratio, axis=-1,
+              keepdims=True),
+          tf.reduce_sum(
+              input_tensor=weighted_scales * cos_ratio, axis=-1,
+              keepdims=True))
+
+
+def from_quaternion(quaternion, translation, scale, name=None):
+  """Builds a similarity transformation from a quaternion, translation, scale.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    quaternion: A tensor of shape `[A1, ..., An, 4]`, where the last dimension
+      represents a normalized quaternion.
+    translation: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a translation.
+    scale: A tensor of shape `[A1, ..., An, 1]`, where the last dimension
+      represents a positive scale.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_from_quaternion".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `quaternion`, `translation` or `scale` is not
+    supported.
+  """
+  with tf.compat.v1.name_scope(name,
+                               "similarity_transformation_3d_from_quaternion",
+                               [quaternion, translation, scale]):
+    quaternion = tf.convert_to_tensor(value=quaternion)
+    translation = tf.convert_to_tensor(value=translation)
+    scale = tf.convert_to_tensor(value=scale)
+
+    shape.check_static(
+        tensor=quaternion, tensor_name="quaternion", has_dim_equals=(-1, 4))
+    shape.check_static(
+        tensor=translation, tensor_name="translation", has_dim_equals=(-1, 3))
+    shape.check_static(
+        tensor=scale, tensor_name="scale", has_dim_equals=(-1, 1))
+    shape.compare_batch_dimensions(
+        tensors=(quaternion, translation, scale),
+        tensor_names=("quaternion", "translation", "scale"),
+        last_axes=-2,
+        broadcast_compatible=False)
+    quaternion = asserts.assert_normalized(quaternion)
+    scale = asserts.assert_all_above(scale, 0.0, open_bound=True)
+
+    return tf.concat((quaternion, translation, scale), axis=-1)
+
+
+def from_rotation_matrix(rotation_matrix, translation, scale, name=None):
+  """Builds a similarity transformation from a matrix, translation, scale.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    rotation_matrix: A tensor of shape `[A1, ..., An, 3, 3]`, where the last
+      two dimensions represent a rotation matrix.
+    translation: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a translation.
+    scale: A tensor of shape `[A1, ..., An, 1]`, where the last dimension
+      represents a positive scale.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_from_rotation_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `rotation_matrix`, `translation` or `scale` is
+    not supported.
+  """
+  with tf.compat.v1.name_scope(
+      name, "similarity_transformation_3d_from_rotation_matrix",
+      [rotation_matrix, translation, scale]):
+    quaternion = quaternion_lib.from_rotation_matrix(rotation_matrix)
+    return from_quaternion(quaternion, translation, scale)
+
+
+def from_rigid_transformation(transformation, scale=None, name=None):
+  """Converts a rigid transformation to a similarity transformation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 7]`, where the last
+      dimension represents a rigid transformation, see
+      `rigid_transformation_3d`.
+    scale: A tensor of shape `[A1, ..., An, 1]`, where the last dimension
+      represents a positive scale. Defaults to a scale of 1.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_from_rigid_transformation".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `transformation` or `scale` is not supported.
+  """
+  with tf.compat.v1.name_scope(
+      name, "similarity_transformation_3d_from_rigid_transformation",
+      [transformation, scale]):
+    quaternion, translation = rigid_transformation_3d.to_quaternion(
+        transformation)
+    if scale is None:
+      scale = tf.ones_like(translation[..., :1])
+    return from_quaternion(quaternion, translation, scale)
+
+
+def from_matrix(matrix, name=None):
+  """Builds a similarity transformation from a 3x4 matrix.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    matrix: A tensor of shape `[A1, ..., An, 3, 4]`, where the last two
+      dimensions represent a matrix `[s * R | t]` with a positive scale `s`, a
+      rotation matrix `R` and a translation `t`.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_from_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `matrix` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_from_matrix",
+                               [matrix]):
+    matrix = tf.convert_to_tensor(value=matrix)
+
+    shape.check_static(
+        tensor=matrix,
+        tensor_name="matrix",
+        has_rank_greater_than=1,
+        has_dim_equals=((-2, 3), (-1, 4)))
+
+    scaled_rotation_matrix, translation = tf.split(matrix, (3, 1), axis=-1)
+    # The Frobenius norm of s * R is sqrt(3) * s.
+    scale = tf.norm(
+        tensor=scaled_rotation_matrix, axis=(-2, -1)) / np.sqrt(3.0)
+    scale = tf.expand_dims(scale, axis=-1)
+    rotation_matrix = scaled_rotation_matrix / tf.expand_dims(scale, axis=-1)
+    return from_rotation_matrix(rotation_matrix,
+                                tf.squeeze(translation, axis=-1), scale)
+
+
+def to_quaternion(transformation, name=None):
+  """Splits a similarity transformation into a quaternion, translation, scale.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_to_quaternion".
+
+  Returns:
+    A tuple of three tensors, respectively of shape `[A1, ..., An, 4]`,
+    `[A1, ..., An, 3]` and `[A1, ..., An, 1]`, where the first tensor represents
+    a normalized quaternion, the second a translation and the third a scale.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name,
+                               "similarity_transformation_3d_to_quaternion",
+                               [transformation]):
+    transformation = tf.convert_to_tensor(value=transformation)
+
+    shape.check_static(
+        tensor=transformation,
+        tensor_name="transformation",
+        has_dim_equals=(-1, 8))
+
+    quaternion, translation, scale = tf.split(
+        transformation, (4, 3, 1), axis=-1)
+    return asserts.assert_normalized(quaternion), translation, scale
+
+
+def to_rotation_matrix(transformation, name=None):
+  """Splits a similarity transformation into a matrix, translation, scale.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_to_rotation_matrix".
+
+  Returns:
+    A tuple of three tensors, respectively of shape `[A1, ..., An, 3, 3]`,
+    `[A1, ..., An, 3]` and `[A1, ..., An, 1]`, where the first tensor represents
+    a rotation matrix, the second a translation and the third a scale.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(
+      name, "similarity_transformation_3d_to_rotation_matrix",
+      [transformation]):
+    quaternion, translation, scale = to_quaternion(transformation)
+    return (rotation_matrix_3d.from_quaternion(quaternion), translation,
+            scale)
+
+
+def to_matrix(transformation, name=None):
+  """Converts a similarity transformation to a 3x4 matrix.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_to_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3, 4]`, where the last two dimensions
+    represent a matrix `[s * R | t]` with a scale `s`, a rotation matrix `R`
+    and a translation `t`.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_to_matrix",
+                               [transformation]):
+    rotation_matrix, translation, scale = to_rotation_matrix(transformation)
+    return tf.concat((rotation_matrix * tf.expand_dims(scale, axis=-1),
+                      tf.expand_dims(translation, axis=-1)),
+                     axis=-1)
+
+
+def compose(transformation1, transformation2, name=None):
+  """Composes two similarity transformations.
+
+  The composed transformation first applies `transformation2`, then
+  `transformation1`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions, which must be
+    broadcast compatible.
+
+  Args:
+    transformation1: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    transformation2: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_compose".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `transformation1` or `transformation2` is not
+    supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_compose",
+                               [transformation1, transformation2]):
+    transformation1 = tf.convert_to_tensor(value=transformation1)
+    transformation2 = tf.convert_to_tensor(value=transformation2)
+
+    shape.check_static(
+        tensor=transformation1,
+        tensor_name="transformation1",
+        has_dim_equals=(-1, 8))
+    shape.check_static(
+        tensor=transformation2,
+        tensor_name="transformation2",
+        has_dim_equals=(-1, 8))
+    shape.compare_batch_dimensions(
+        tensors=(transformation1, transformation2),
+        tensor_names=("transformation1", "transformation2"),
+        last_axes=-2,
+        broadcast_compatible=True)
+
+    quaternion1, translation1, scale1 = to_quaternion(transformation1)
+    quaternion2, translation2, scale2 = to_quaternion(transformation2)
+
+    quaternion = quaternion_lib.multiply(quaternion1, quaternion2)
+    translation = scale1 * quaternion_lib.rotate(translation2,
+                                                 quaternion1) + translation1
+    return tf.concat((quaternion, translation, scale1 * scale2), axis=-1)
+
+
+def inverse(transformation, name=None):
+  """Computes the inverse of a similarity transformation.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_inverse".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_inverse",
+                               [transformation]):
+    quaternion, translation, scale = to_quaternion(transformation)
+
+    quaternion = quaternion_lib.conjugate(quaternion)
+    scale = 1.0 / scale
+    translation = -scale * quaternion_lib.rotate(translation, quaternion)
+    return tf.concat((quaternion, translation, scale), axis=-1)
+
+
+def transform(point, transformation, name=None):
+  """Applies a similarity transformation to a point.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions, which must be
+    broadcast compatible.
+
+  Args:
+    point: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a 3d point.
+    transformation: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_transform".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3]`, where the last dimension represents a
+    3d point.
+
+  Raises:
+    ValueError: If the shape of `point` or `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_transform",
+                               [point, transformation]):
+    point = tf.convert_to_tensor(value=point)
+    transformation = tf.convert_to_tensor(value=transformation)
+
+    shape.check_static(
+        tensor=point, tensor_name="point", has_dim_equals=(-1, 3))
+    shape.check_static(
+        tensor=transformation,
+        tensor_name="transformation",
+        has_dim_equals=(-1, 8))
+    shape.compare_batch_dimensions(
+        tensors=(point, transformation),
+        tensor_names=("point", "transformation"),
+        last_axes=-2,
+        broadcast_compatible=True)
+
+    quaternion, translation, scale = to_quaternion(transformation)
+    return scale * quaternion_lib.rotate(point, quaternion) + translation
+
+
+def exp(twist, name=None):
+  r"""Computes the exponential map from sim(3) to similarity transformations.
+
+  The twist $$[\boldsymbol{\omega}, \mathbf{v}, \sigma]$$ is mapped to the
+  rotation $$\mathbf{R} = \exp([\boldsymbol{\omega}]_\times)$$, the scale
+  $$s = e^\sigma$$ and the translation $$\mathbf{t} = \mathbf{W}\mathbf{v}$$,
+  with $$\mathbf{W} = \int_0^1 e^{\sigma u}
+  \exp(u[\boldsymbol{\omega}]_\times) du$$.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    twist: A tensor of shape `[A1, ..., An, 7]`, where the last dimension
+      represents a rotation vector, followed by a translational velocity and
+      the logarithm of the scale.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_exp".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 8]`, where the last dimension represents a
+    similarity transformation.
+
+  Raises:
+    ValueError: If the shape of `twist` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_exp",
+                               [twist]):
+    twist = tf.convert_to_tensor(value=twist)
+
+    shape.check_static(
+        tensor=twist, tensor_name="twist", has_dim_equals=(-1, 7))
+
+    rotation_vector, velocity, log_scale = tf.split(twist, (3, 3, 1), axis=-1)
+    coefficient0, coefficient1, coefficient2 = _exp_translation_coefficients(
+        rotation_vector, log_scale)
+    cross = vector.cross(rotation_vector, velocity)
+    translation = (
+        coefficient0 * velocity + coefficient1 * cross +
+        coefficient2 * vector.cross(rotation_vector, cross))
+    # pylint: disable=protected-access
+    quaternion = rigid_transformation_3d._quaternion_from_rotation_vector(
+        rotation_vector)
+    # pylint: enable=protected-access
+    return tf.concat((quaternion, translation, tf.exp(log_scale)), axis=-1)
+
+
+def log(transformation, name=None):
+  r"""Computes the logarithm map from similarity transformations to sim(3).
+
+  This is the inverse of `exp`, which returns twists with a rotation angle in
+  $$[0, \pi]$$.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    transformation: A tensor of shape `[A1, ..., An, 8]`, where the last
+      dimension represents a similarity transformation.
+    name: A name for this op that defaults to
+      "similarity_transformation_3d_log".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 7]`, where the last dimension represents a
+    rotation vector, followed by a translational velocity and the logarithm of
+    the scale.
+
+  Raises:
+    ValueError: If the shape of `transformation` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "similarity_transformation_3d_log",
+                               [transformation]):
+    quaternion, translation, scale = to_quaternion(transformation)
+
+    # pylint: disable=protected-access
+    rotation_vector = rigid_transformation_3d._rotation_vector_from_quaternion(
+        quaternion)
+    # pylint: enable=protected-access
+    log_scale = tf.math.log(scale)
+    coefficient0, coefficient1, coefficient2 = _exp_translation_coefficients(
+        rotation_vector, log_scale)
+    # Builds W = c0 * I + c1 * K + c2 * K^2, with K the cross product matrix of
+    # the rotation vector, and solves W v = t.
+    x, y, z = tf.unstack(rotation_vector, axis=-1)
+    zeros = tf.zeros_like(x)
+    cross_matrix = tf.reshape(
+        tf.stack((zeros, -z, y, z, zeros, -x, -y, x, zeros), axis=-1),
+        tf.concat((tf.shape(input=x), (3, 3)), axis=-1))
+    identity = tf.eye(3, dtype=rotation_vector.dtype)
+    matrix = (
+        tf.expand_dims(coefficient0, axis=-1) * identity +
+        tf.expand_dims(coefficient1, axis=-1) * cross_matrix +
+        tf.expand_dims(coefficient2, axis=-1) *
+        tf.matmul(cross_matrix, cross_matrix))
+    velocity = tf.squeeze(
+        tf.linalg.solve(matrix, tf.expand_dims(translation, axis=-1)), axis=-1)
+    return tf.concat((rotation_vector, velocity, log_scale), axis=-1)
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
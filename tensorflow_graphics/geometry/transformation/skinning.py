@@ -0,0 +1,267 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""This module implements skinning functionalities.
+
+Skinning deforms the vertices of a mesh with the rigid transformations of the
+bones of a skeleton, where each vertex $$\mathbf{p}$$ follows a blend of the
+transformations of a few bones $$j_1, \dots, j_K$$ with weights
+$$w_1, \dots, w_K$$. In this module, the bones of each vertex are given as
+sparse `[V, K]` tensors of bone indices and weights, see
+`top_k_bone_weights`, and the bone transformations as rigid transformations
+(see `rigid_transformation_3d`). The ops only gather the transformations of
+the `K` bones of each vertex, one bone slot at a time, so their memory usage
+grows with `V` rather than `V * J`.
+
+Linear blend skinning computes
+$$\mathbf{p}' = \sum_k w_k (\mathbf{R}_{j_k}\mathbf{p}+\mathbf{t}_{j_k})$$, and
+dual quaternion skinning blends the dual quaternions of the bones, which
+avoids the volume loss of linear blend skinning under large rotations. More
+details can be found in [Skinning with Dual Quaternions]
+(https://www.cs.utah.edu/~ladislav/kavan07skinning/kavan07skinning.pdf).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import quaternion
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import safe_ops
+from tensorflow_graphics.util import shape
+
+
+def _check_valid_skinning_input(points, bone_indices, bone_weights,
+                                bone_transformation):
+  """Checks that the inputs are valid for skinning ops.
+
+  Args:
+    points: A tensor of shape `[A1, ..., An, V, 3]`.
+    bone_indices: An `int` tensor of shape `[V, K]`.
+    bone_weights: A tensor of shape `[V, K]`.
+    bone_transformation: A tensor of shape `[A1, ..., An, J, 7]`.
+
+  Raises:
+    TypeError: if the input types are invalid.
+    ValueError: if the input dimensions are invalid.
+  """
+  if not bone_indices.dtype.is_integer:
+    raise TypeError("'bone_indices' must have an integer type.")
+
+  shape.check_static(
+      tensor=points,
+      tensor_name="points",
+      has_rank_greater_than=1,
+      has_dim_equals=(-1, 3))
+  shape.check_static(
+      tensor=bone_indices, tensor_name="bone_indices", has_rank=2)
+  shape.check_static(
+      tensor=bone_weights, tensor_name="bone_weights", has_rank=2)
+  shape.check_static(
+      tensor=bone_transformation,
+      tensor_name="bone_transformation",
+      has_rank_greater_than=1,
+      has_dim_equals=(-1, 7))
+  shape.compare_batch_dimensions(
+      tensors=(bone_indices, bone_weights),
+      tensor_names=("bone_indices", "bone_weights"),
+      last_axes=-1,
+      broadcast_compatible=False)
+  shape.compare_dimensions(
+      tensors=(points, bone_indices),
+      tensor_names=("points", "bone_indices"),
+      axes=(-2, -2))
+  shape.compare_batch_dimensions(
+      tensors=(points, bone_transformation),
+      tensor_names=("points", "bone_transformation"),
+      last_axes=-3,
+      broadcast_compatible=True)
+  if tf.compat.v1.dimension_value(bone_indices.shape[-1]) is None:
+    raise ValueError("The number of bones per vertex must be static.")
+
+
+def top_k_bone_weights(skinning_weights, num_bones, name=None):
+  """Sparsifies dense skinning weights to the largest weights of each vertex.
+
+  The weights of each vertex are renormalized to sum to 1.
+
+  Args:
+    skinning_weights: A tensor of shape `[V, J]`, where the last dimension
+      represents the weights of the `J` bones for each of the `V` vertices.
+    num_bones: The number `K` of bones kept for each vertex.
+    name: A name for this op that defaults to "skinning_top_k_bone_weights".
+
+  Returns:
+    A tuple of two tensors of shape `[V, K]`, where the first is an `int32`
+    tensor containing the bone indices of each vertex, and the second contains
+    their weights.
+
+  Raises:
+    ValueError: If the shape of `skinning_weights` is not supported.
+  """
+  with tf.compat.v1.name_scope(name, "skinning_top_k_bone_weights",
+                               [skinning_weights]):
+    skinning_weights = tf.convert_to_tensor(value=skinning_weights)
+
+    shape.check_static(
+        tensor=skinning_weights, tensor_name="skinning_weights", has_rank=2)
+
+    bone_weights, bone_indices = tf.math.top_k(skinning_weights, k=num_bones)
+    bone_weights = safe_ops.safe_unsigned_div(
+        bone_weights,
+        tf.reduce_sum(input_tensor=bone_weights, axis=-1, keepdims=True))
+    return bone_indices, bone_weights
+
+
+def linear_blend(points,
+                 bone_indices,
+                 bone_weights,
+                 bone_transformation,
+                 name=None):
+  """Deforms points with linear blend skinning.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions, which must be
+    broadcast compatible.
+
+  Args:
+    points: A tensor of shape `[A1, ..., An, V, 3]`, where the last dimension
+      represents a 3d point in the rest pose.
+    bone_indices: An `int` tensor of shape `[V, K]`, where the last dimension
+      represents the indices of the bones influencing each vertex. `K` must be
+      static.
+    bone_weights: A tensor of shape `[V, K]`, where the last dimension
+      represents the weights of the bones in `bone_indices`.
+    bone_transformation: A tensor of shape `[A1, ..., An, J, 7]`, where the
+      last dimension represents the rigid transformation of each bone, see
+      `rigid_transformation_3d`.
+    name: A name for this op that defaults to "skinning_linear_blend".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, V, 3]`, where the last dimension
+    represents a deformed 3d point.
+
+  Raises:
+    TypeError: If the type of `bone_indices` is not supported.
+    ValueError: If the shape of the inputs is not supported.
+  """
+  with tf.compat.v1.name_scope(
+      name, "skinning_linear_blend",
+      [points, bone_indices, bone_weights, bone_transformation]):
+    points = tf.convert_to_tensor(value=points)
+    bone_indices = tf.convert_to_tensor(value=bone_indices)
+    bone_weights = tf.convert_to_tensor(value=bone_weights)
+    bone_transformation = tf.convert_to_tensor(value=bone_transformation)
+
+    _check_valid_skinning_input(points, bone_indices, bone_weights,
+                                bone_transformation)
+
+    # The 3x4 matrices of the bones are only computed once per pose, and are
+    # blended before being applied to the points.
+    bone_matrix = rigid_transformation_3d.to_matrix(bone_transformation)
+    blended_matrix = 0.0
+    for indices, weights in zip(
+        tf.unstack(bone_indices, axis=-1), tf.unstack(bone_weights, axis=-1)):
+      matrix = tf.gather(bone_matrix, indices, axis=-3)
+      blended_matrix += tf.expand_dims(tf.expand_dims(weights, axis=-1),
+                                       axis=-1) * matrix
+    rotated_points = tf.reduce_sum(
+        input_tensor=blended_matrix[..., :3] * tf.expand_dims(points, axis=-2),
+        axis=-1)
+    return rotated_points + blended_matrix[..., 3]
+
+
+def dual_quaternion_blend(points,
+                          bone_indices,
+                          bone_weights,
+                          bone_transformation,
+                          name=None):
+  """Deforms points with dual quaternion skinning.
+
+  The dual quaternions of the bones of each vertex are aligned with the one of
+  its first bone before being blended, such that the shortest rotation path is
+  interpolated.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions, which must be
+    broadcast compatible.
+
+  Args:
+    points: A tensor of shape `[A1, ..., An, V, 3]`, where the last dimension
+      represents a 3d point in the rest pose.
+    bone_indices: An `int` tensor of shape `[V, K]`, where the last dimension
+      represents the indices of the bones influencing each vertex. `K` must be
+      static.
+    bone_weights: A tensor of shape `[V, K]`, where the last dimension
+      represents the weights of the bones in `bone_indices`.
+    bone_transformation: A tensor of shape `[A1, ..., An, J, 7]`, where the
+      last dimension represents the rigid transformation of each bone, see
+      `rigid_transformation_3d`.
+    name: A name for this op that defaults to "skinning_dual_quaternion_blend".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, V, 3]`, where the last dimension
+    represents a deformed 3d point.
+
+  Raises:
+    TypeError: If the type of `bone_indices` is not supported.
+    ValueError: If the shape of the inputs is not supported.
+  """
+  with tf.compat.v1.name_scope(
+      name, "skinning_dual_quaternion_blend",
+      [points, bone_indices, bone_weights, bone_transformation]):
+    points = tf.convert_to_tensor(value=points)
+    bone_indices = tf.convert_to_tensor(value=bone_indices)
+    bone_weights = tf.convert_to_tensor(value=bone_weights)
+    bone_transformation = tf.convert_to_tensor(value=bone_transformation)
+
+    _check_valid_skinning_input(points, bone_indices, bone_weights,
+                                bone_transformation)
+
+    # The dual part of the dual quaternion of a rigid transformation (q, t) is
+    # (t, 0) * q / 2.
+    real, translation = rigid_transformation_3d.to_quaternion(
+        bone_transformation)
+    dual = 0.5 * quaternion.multiply(
+        tf.concat((translation, tf.zeros_like(translation[..., :1])), axis=-1),
+        real)
+    bone_dual_quaternion = tf.concat((real, dual), axis=-1)
+    bone_indices = tf.unstack(bone_indices, axis=-1)
+    bone_weights = tf.unstack(bone_weights, axis=-1)
+    pivot_real = tf.gather(real, bone_indices[0], axis=-2)
+    blended = 0.0
+    for indices, weights in zip(bone_indices, bone_weights):
+      dual_quaternion = tf.gather(bone_dual_quaternion, indices, axis=-2)
+      # Flips the dual quaternions that are not in the pivot's hemisphere.
+      sign = safe_ops.nonzero_sign(
+          tf.reduce_sum(
+              input_tensor=dual_quaternion[..., :4] * pivot_real,
+              axis=-1,
+              keepdims=True))
+      blended += tf.expand_dims(weights, axis=-1) * sign * dual_quaternion
+    real, dual = tf.split(blended, (4, 4), axis=-1)
+    norm = tf.norm(tensor=real, axis=-1, keepdims=True)
+    real = safe_ops.safe_unsigned_div(real, norm)
+    dual = safe_ops.safe_unsigned_div(dual, norm)
+    # The translation is the vector part of 2 * dual * conj(real), and the
+    # scalar part of dual * conj(real) is zero for a unit dual quaternion.
+    translation = 2.0 * quaternion.multiply(dual,
+                                            quaternion.conjugate(real))[..., :3]
+    return quaternion.rotate(points, real) + translation
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
@@ -0,0 +1,190 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for kinematics."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import flagsaver
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import kinematics
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.geometry.transformation.tests import test_helpers
+from tensorflow_graphics.util import test_case
+
+
+def _generate_random_skeleton(num_joints, num_roots=1, max_distance=3):
+  """Generates the parents of a random skeleton with shuffled joints."""
+  parents = np.full((num_joints,), -1, dtype=np.int64)
+  for joint in range(num_roots, num_joints):
+    parents[joint] = np.random.randint(max(joint - max_distance, 0), joint)
+  permutation = np.random.permutation(num_joints)
+  inverse_permutation = np.argsort(permutation)
+  shuffled_parents = np.where(parents == -1, -1,
+                              inverse_permutation[parents])[permutation]
+  return shuffled_parents
+
+
+def _generate_random_transformations(tensor_shape):
+  """Generates random rigid transformations."""
+  random_quaternion = test_helpers.generate_random_test_quaternions(
+      tensor_shape)
+  random_translation = np.random.normal(size=tensor_shape + [3])
+  return np.concatenate((random_quaternion, random_translation), axis=-1)
+
+
+def _homogeneous(matrix):
+  """Appends the row [0, 0, 0, 1] to 3x4 matrices."""
+  last_row = np.zeros(matrix.shape[:-2] + (1, 4))
+  last_row[..., 3] = 1.0
+  return np.concatenate((matrix, last_row), axis=-2)
+
+
+def _forward_kinematics_numpy(local_matrix, parents):
+  """Composes the homogeneous matrices of the joints one at a time."""
+  global_matrix = [None] * len(parents)
+
+  def compute(joint):
+    if global_matrix[joint] is None:
+      if parents[joint] == -1:
+        global_matrix[joint] = local_matrix[..., joint, :, :]
+      else:
+        global_matrix[joint] = np.matmul(
+            compute(parents[joint]), local_matrix[..., joint, :, :])
+    return global_matrix[joint]
+
+  return np.stack([compute(joint) for joint in range(len(parents))], axis=-3)
+
+
+class KinematicsTest(test_case.TestCase):
+
+  @parameterized.parameters(
+      ((3, 7),),
+      ((None, 3, 7),),
+      ((2, 5, 3, 7),),
+  )
+  def test_forward_kinematics_exception_not_raised(self, *shapes):
+    """Tests that the shape exceptions are not raised."""
+    self.assert_exception_is_not_raised(
+        kinematics.forward_kinematics, shapes, parents=(-1, 0, 0))
+
+  @parameterized.parameters(
+      ("must have exactly 7 dimensions in axis -1", (-1, 0, 0), (3, 4)),
+      ("must have a rank greater than 1", (-1, 0, 0), (7,)),
+      ("must have the same number of joints", (-1, 0), (3, 7)),
+      ("must be a list of integers", ((-1, 0, 0),), (3, 7)),
+      (r"must contain indices in \[-1, 3\)", (-1, 0, 3), (3, 7)),
+      ("must not contain cycles", (-1, 2, 1), (3, 7)),
+  )
+  def test_forward_kinematics_exception_raised(self, error_msg, parents,
+                                               *shapes):
+    """Tests that the shape exceptions are raised."""
+    self.assert_exception_is_raised(
+        kinematics.forward_kinematics, error_msg, shapes, parents=parents)
+
+  @parameterized.parameters(
+      ([], 12, 1),
+      ([3], 20, 2),
+      ([2, 3], 1, 1),
+  )
+  def test_forward_kinematics_random(self, batch_shape, num_joints,
+                                     num_roots):
+    """Tests forward kinematics against sequential matrix products."""
+    parents = _generate_random_skeleton(num_joints, num_roots)
+    local_transformation = _generate_random_transformations(batch_shape +
+                                                            [num_joints])
+
+    global_transformation = kinematics.forward_kinematics(
+        local_transformation, parents)
+    local_matrix = _homogeneous(
+        self.evaluate(rigid_transformation_3d.to_matrix(local_transformation)))
+    ground_truth = _forward_kinematics_numpy(local_matrix, parents)
+
+    self.assertAllClose(
+        rigid_transformation_3d.to_matrix(global_transformation),
+        ground_truth[..., :3, :])
+
+  def test_forward_kinematics_preset(self):
+    """Tests that translations accumulate along a chain of rotated joints."""
+    axis = np.array(((0.0, 0.0, 1.0),) * 3)
+    angle = np.full((3, 1), np.pi / 2.0)
+    translation = np.array(((1.0, 0.0, 0.0),) * 3)
+    local_transformation = rigid_transformation_3d.from_axis_angle(
+        axis, angle, translation)
+
+    global_transformation = kinematics.forward_kinematics(
+        local_transformation, parents=(-1, 0, 1))
+    _, global_translation = rigid_transformation_3d.to_quaternion(
+        global_transformation)
+
+    self.assertAllClose(global_translation,
+                        ((1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)))
+
+  @parameterized.parameters(
+      ([],),
+      ([2, 3],),
+  )
+  def test_forward_kinematics_no_joints(self, batch_shape):
+    """Tests forward kinematics on a skeleton without joints."""
+    local_transformation = np.zeros(batch_shape + [0, 7])
+
+    global_transformation = kinematics.forward_kinematics(
+        local_transformation, parents=np.zeros((0,), dtype=np.int64))
+
+    self.assertAllEqual(global_transformation, local_transformation)
+
+  @flagsaver.flagsaver(tfg_add_asserts_to_graph=False)
+  def test_forward_kinematics_jacobian_random(self):
+    """Tests the Jacobian of forward_kinematics."""
+    parents = _generate_random_skeleton(6)
+    x_init = _generate_random_transformations([2, 6])
+    x = tf.convert_to_tensor(value=x_init)
+
+    y = kinematics.forward_kinematics(x, parents)
+
+    self.assert_jacobian_is_correct(x, x_init, y)
+
+
+class KinematicsBenchmark(tf.test.Benchmark):
+  """Benchmarks the forward kinematics and its gradient for a batch of poses."""
+
+  def _benchmark(self, num_poses, num_joints):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      parents = _generate_random_skeleton(
+          num_joints, max_distance=num_joints)
+      # Variables prevent the graph from being constant folded.
+      local_transformation = tf.compat.v1.Variable(
+          _generate_random_transformations([num_poses, num_joints]).astype(
+              np.float32))
+      global_transformation = kinematics.forward_kinematics(
+          local_transformation, parents)
+      gradient = tf.gradients(
+          ys=global_transformation, xs=local_transformation)[0]
+      sess.run(tf.compat.v1.global_variables_initializer())
+      self.run_op_benchmark(
+          sess,
+          gradient.op,
+          min_iters=5,
+          name="forward_kinematics_gradient_B%d_J%d" % (num_poses, num_joints))
+
+  def benchmark_forward_kinematics(self):
+    self._benchmark(4096, 64)
+
+
+if __name__ == "__main__":
+  test_case.main()
@@ -643,6 +643,25 @@ class QuaternionTest(test_case.TestCase):
     self.assertAllClose(
         rotated_point_matrix, rotated_point_quaternion, rtol=1e-3)
 
+  @parameterized.parameters(((4,), (5, 3)), ((2, 1, 4), (6, 3)),
+                            ((3, 4), (3, 3)))
+  def test_rotate_vs_multiply_random(self, quaternion_shape, point_shape):
+    """Tests the rotation against the quaternion products q * p * q^-1."""
+    random_quaternion = np.random.normal(size=quaternion_shape)
+    random_quaternion /= np.linalg.norm(
+        random_quaternion, axis=-1, keepdims=True)
+    random_point = np.random.normal(size=point_shape)
+
+    rotated_point = quaternion.rotate(random_point, random_quaternion)
+    padded_point = np.pad(
+        random_point, [(0, 0)] * (len(point_shape) - 1) + [(0, 1)],
+        mode="constant")
+    ground_truth = quaternion.multiply(
+        quaternion.multiply(random_quaternion, padded_point),
+        quaternion.conjugate(random_quaternion))
+
+    self.assertAllClose(rotated_point, ground_truth[..., :3])
+
   @parameterized.parameters(
       ((td.QUAT_ID, td.QUAT_X_45), (np.pi / 4.0,)),
       ((td.QUAT_X_45, td.QUAT_ID), (np.pi / 4.0,)),
@@ -721,5 +740,31 @@ class QuaternionTest(test_case.TestCase):
     self.assert_jacobian_is_finite(x_2, x_2_init, y)
 
 
+class RotateBenchmark(tf.test.Benchmark):
+  """Benchmarks the rotation of large point clouds."""
+
+  def _benchmark(self, quaternion_batch_shape, num_points):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      random_quaternion = np.random.normal(size=quaternion_batch_shape + (4,))
+      random_quaternion /= np.linalg.norm(
+          random_quaternion, axis=-1, keepdims=True)
+      # Variables prevent the graph from being constant folded.
+      point = tf.compat.v1.Variable(
+          np.random.normal(size=(num_points, 3)).astype(np.float32))
+      quaternions = tf.compat.v1.Variable(random_quaternion.astype(np.float32))
+      rotated_point = quaternion.rotate(point, quaternions)
+      sess.run(tf.compat.v1.global_variables_initializer())
+      self.run_op_benchmark(
+          sess,
+          rotated_point.op,
+          min_iters=10,
+          name="rotate_%s_N%d" %
+          ("shared" if not quaternion_batch_shape else "batched", num_points))
+
+  def benchmark_rotate(self):
+    for quaternion_batch_shape in ((), (1000000,)):
+      self._benchmark(quaternion_batch_shape, 1000000)
+
+
 if __name__ == "__main__":
   test_case.main()
@@ -0,0 +1,257 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for 3d rigid transformations."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import flagsaver
+from absl.testing import parameterized
+import numpy as np
+from scipy import linalg
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import quaternion
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.geometry.transformation import rotation_matrix_3d
+from tensorflow_graphics.geometry.transformation.tests import test_helpers
+from tensorflow_graphics.util import test_case
+
+
+def _generate_random_transformations(tensor_shape):
+  """Generates random rigid transformations."""
+  random_quaternion = test_helpers.generate_random_test_quaternions(
+      tensor_shape)
+  random_translation = np.random.normal(size=tensor_shape + [3])
+  return np.concatenate((random_quaternion, random_translation), axis=-1)
+
+
+def _homogeneous(matrix):
+  """Appends the row [0, 0, 0, 1] to 3x4 matrices."""
+  last_row = np.zeros(matrix.shape[:-2] + (1, 4))
+  last_row[..., 3] = 1.0
+  return np.concatenate((matrix, last_row), axis=-2)
+
+
+def _hat(rotation_vector):
+  """Computes the cross product matrix of a rotation vector."""
+  x, y, z = rotation_vector
+  return np.array(((0.0, -z, y), (z, 0.0, -x), (-y, x, 0.0)))
+
+
+def _exp_numpy(twist):
+  """Computes the 3x4 matrix exponential of a single twist."""
+  algebra = np.zeros((4, 4))
+  algebra[:3, :3] = _hat(twist[:3])
+  algebra[:3, 3] = twist[3:]
+  return linalg.expm(algebra)[:3]
+
+
+class RigidTransformation3dTest(test_case.TestCase):
+
+  @parameterized.parameters(
+      ((4,), (3,)),
+      ((None, 4), (None, 3)),
+      ((2, 3, 4), (2, 3, 3)),
+  )
+  def test_from_quaternion_exception_not_raised(self, *shapes):
+    """Tests that the shape exceptions are not raised."""
+    self.assert_exception_is_not_raised(rigid_transformation_3d.from_quaternion,
+                                        shapes)
+
+  @parameterized.parameters(
+      ("must have exactly 4 dimensions in axis -1", (3,), (3,)),
+      ("must have exactly 3 dimensions in axis -1", (4,), (4,)),
+      ("Not all batch dimensions are identical.", (2, 4), (3, 3)),
+  )
+  def test_from_quaternion_exception_raised(self, error_msg, *shapes):
+    """Tests that the shape exceptions are raised."""
+    self.assert_exception_is_raised(rigid_transformation_3d.from_quaternion,
+                                    error_msg, shapes)
+
+  @parameterized.parameters(
+      ((3,), (7,)),
+      ((None, 3), (None, 7)),
+      ((2, 5, 3), (2, 1, 7)),
+      ((5, 3), (7,)),
+  )
+  def test_transform_exception_not_raised(self, *shapes):
+    """Tests that the shape exceptions are not raised."""
+    self.assert_exception_is_not_raised(rigid_transformation_3d.transform,
+                                        shapes)
+
+  @parameterized.parameters(
+      ("must have exactly 3 dimensions in axis -1", (4,), (7,)),
+      ("must have exactly 7 dimensions in axis -1", (3,), (8,)),
+      ("Not all batch dimensions are broadcast-compatible.", (2, 3), (3, 7)),
+  )
+  def test_transform_exception_raised(self, error_msg, *shapes):
+    """Tests that the shape exceptions are raised."""
+    self.assert_exception_is_raised(rigid_transformation_3d.transform,
+                                    error_msg, shapes)
+
+  @parameterized.parameters(
+      ("must have exactly 6 dimensions in axis -1", rigid_transformation_3d.exp,
+       (7,)),
+      ("must have exactly 7 dimensions in axis -1", rigid_transformation_3d.log,
+       (6,)),
+      ("must have exactly 4 dimensions in axis -1",
+       rigid_transformation_3d.from_matrix, (3, 3)),
+  )
+  def test_conversion_exception_raised(self, error_msg, func, *shapes):
+    """Tests that the shape exceptions are raised."""
+    self.assert_exception_is_raised(func, error_msg, shapes)
+
+  def test_matrix_conversion_random(self):
+    """Tests that from_matrix inverts to_matrix."""
+    transformation = _generate_random_transformations([3, 2])
+
+    matrix = rigid_transformation_3d.to_matrix(transformation)
+    rotation_matrix, translation = rigid_transformation_3d.to_rotation_matrix(
+        transformation)
+    prediction = rigid_transformation_3d.to_matrix(
+        rigid_transformation_3d.from_matrix(matrix))
+
+    self.assertAllClose(matrix[..., :3], rotation_matrix)
+    self.assertAllClose(matrix[..., 3], translation)
+    self.assertAllClose(prediction, matrix)
+
+  def test_from_rotation_representations_random(self):
+    """Tests that the conversions from rotations agree with each other."""
+    angles = test_helpers.generate_random_test_euler_angles()
+    translation = np.random.normal(size=angles.shape)
+    matrix = rotation_matrix_3d.from_euler(angles)
+    axis, angle = (angles / np.linalg.norm(angles, axis=-1, keepdims=True),
+                   np.linalg.norm(angles, axis=-1, keepdims=True))
+
+    from_euler = rigid_transformation_3d.to_matrix(
+        rigid_transformation_3d.from_euler(angles, translation))
+    from_rotation_matrix = rigid_transformation_3d.to_matrix(
+        rigid_transformation_3d.from_rotation_matrix(matrix, translation))
+    from_axis_angle = rigid_transformation_3d.to_rotation_matrix(
+        rigid_transformation_3d.from_axis_angle(axis, angle, translation))[0]
+
+    self.assertAllClose(from_euler, from_rotation_matrix)
+    self.assertAllClose(
+        from_axis_angle, rotation_matrix_3d.from_axis_angle(axis, angle))
+
+  def test_compose_random(self):
+    """Tests that the composition matches the product of the matrices."""
+    transformation1 = _generate_random_transformations([4, 1])
+    transformation2 = _generate_random_transformations([1, 3])
+
+    composed = rigid_transformation_3d.compose(transformation1,
+                                               transformation2)
+    matrix1 = _homogeneous(
+        self.evaluate(rigid_transformation_3d.to_matrix(transformation1)))
+    matrix2 = _homogeneous(
+        self.evaluate(rigid_transformation_3d.to_matrix(transformation2)))
+
+    self.assertAllClose(
+        rigid_transformation_3d.to_matrix(composed),
+        np.matmul(matrix1, matrix2)[..., :3, :])
+
+  def test_inverse_random(self):
+    """Tests that composing with the inverse gives the identity."""
+    transformation = _generate_random_transformations([3, 2])
+    point = np.random.normal(size=(3, 2, 3))
+
+    inverse = rigid_transformation_3d.inverse(transformation)
+    identity = rigid_transformation_3d.to_matrix(
+        rigid_transformation_3d.compose(inverse, transformation))
+    transformed_point = rigid_transformation_3d.transform(
+        rigid_transformation_3d.transform(point, transformation), inverse)
+
+    self.assertAllClose(identity,
+                        np.tile(np.eye(3, 4), (3, 2, 1, 1)), atol=1e-6)
+    self.assertAllClose(transformed_point, point)
+
+  def test_transform_random(self):
+    """Tests that the transformation matches the 3x4 matrix product."""
+    transformation = _generate_random_transformations([2, 1])
+    point = np.random.normal(size=(2, 5, 3))
+
+    transformed_point = rigid_transformation_3d.transform(point, transformation)
+    matrix = self.evaluate(rigid_transformation_3d.to_matrix(transformation))
+    ground_truth = (
+        np.einsum("...ij,...j->...i", matrix[..., :3], point) + matrix[..., 3])
+
+    self.assertAllClose(transformed_point, ground_truth)
+
+  @parameterized.parameters((0.0,), (1e-4,), (0.05,), (1.0,), (3.0,))
+  def test_exp_random(self, angle):
+    """Tests the exponential map against the matrix exponential."""
+    rotation_vector = np.random.normal(size=(10, 3))
+    rotation_vector *= angle / np.linalg.norm(
+        rotation_vector, axis=-1, keepdims=True)
+    twist = np.concatenate(
+        (rotation_vector, np.random.normal(size=(10, 3))), axis=-1)
+
+    prediction = rigid_transformation_3d.to_matrix(
+        rigid_transformation_3d.exp(twist))
+    ground_truth = np.stack([_exp_numpy(x) for x in twist])
+
+    self.assertAllClose(prediction, ground_truth)
+
+  @parameterized.parameters((0.0,), (1e-4,), (0.05,), (1.0,), (3.0,))
+  def test_log_exp_random(self, angle):
+    """Tests that the logarithm map inverts the exponential map."""
+    rotation_vector = np.random.normal(size=(10, 3))
+    rotation_vector *= angle / np.linalg.norm(
+        rotation_vector, axis=-1, keepdims=True)
+    twist = np.concatenate(
+        (rotation_vector, np.random.normal(size=(10, 3))), axis=-1)
+    transformation = rigid_transformation_3d.exp(twist)
+    # -q and q represent the same transformation.
+    negated_transformation = tf.concat(
+        (-transformation[..., :4], transformation[..., 4:]), axis=-1)
+
+    self.assertAllClose(rigid_transformation_3d.log(transformation), twist)
+    self.assertAllClose(
+        rigid_transformation_3d.log(negated_transformation), twist)
+
+  @parameterized.parameters((0.0,), (0.05,), (1.0,))
+  @flagsaver.flagsaver(tfg_add_asserts_to_graph=False)
+  def test_exp_log_jacobian_random(self, angle):
+    """Tests the Jacobians of the exponential and logarithm maps."""
+    rotation_vector = np.random.normal(size=(3,))
+    rotation_vector *= angle / np.linalg.norm(rotation_vector)
+    x_twist_init = np.concatenate((rotation_vector, np.random.normal(size=3)))
+    x_twist = tf.convert_to_tensor(value=x_twist_init)
+    x_transformation_init = self.evaluate(
+        rigid_transformation_3d.exp(x_twist_init))
+    x_transformation = tf.convert_to_tensor(value=x_transformation_init)
+
+    y_exp = rigid_transformation_3d.exp(x_twist)
+    y_log = rigid_transformation_3d.log(x_transformation)
+
+    self.assert_jacobian_is_correct(x_twist, x_twist_init, y_exp)
+    self.assert_jacobian_is_correct(x_transformation, x_transformation_init,
+                                    y_log)
+
+  def test_transform_vs_quaternion_rotate(self):
+    """Tests that a transformation without translation is a rotation."""
+    random_quaternion = test_helpers.generate_random_test_quaternions([4])
+    point = np.random.normal(size=(4, 3))
+    transformation = rigid_transformation_3d.from_quaternion(
+        random_quaternion, np.zeros((4, 3)))
+
+    self.assertAllClose(
+        rigid_transformation_3d.transform(point, transformation),
+        quaternion.rotate(point, random_quaternion))
+
+
+if __name__ == "__main__":
+  test_case.main()
@@ -590,6 +590,61 @@ class RotationMatrix3dTest(test_case.TestCase):
 
     self.assertAllClose(ground_truth, prediction, rtol=1e-6)
 
+  @parameterized.parameters(((),), ((1,),), ((1, 1),))
+  def test_rotate_shared_matrix_random(self, matrix_batch_shape):
+    """Tests rotating a batch of points by a single matrix."""
+    random_euler_angle = np.random.uniform(
+        -np.pi, np.pi, size=matrix_batch_shape + (3,))
+    random_matrix = rotation_matrix_3d.from_euler(random_euler_angle)
+    random_point = np.random.normal(size=(4, 5, 3))
+
+    prediction = rotation_matrix_3d.rotate(random_point, random_matrix)
+    ground_truth = np.einsum("ij,abj->abi",
+                             np.reshape(random_matrix, (3, 3)), random_point)
+
+    self.assertAllClose(prediction, ground_truth)
+
+  @flagsaver.flagsaver(tfg_add_asserts_to_graph=False)
+  def test_rotate_shared_matrix_jacobian_random(self):
+    """Test the Jacobian of the rotate function with a single matrix."""
+    x_matrix_init = rotation_matrix_3d.from_euler(
+        np.random.uniform(-np.pi, np.pi, size=(3,))).numpy()
+    x_matrix = tf.convert_to_tensor(value=x_matrix_init)
+    x_point_init = np.random.uniform(size=(4, 3))
+    x_point = tf.convert_to_tensor(value=x_point_init)
+
+    y = rotation_matrix_3d.rotate(x_point, x_matrix)
+
+    self.assert_jacobian_is_correct(x_matrix, x_matrix_init, y)
+    self.assert_jacobian_is_correct(x_point, x_point_init, y)
+
+
+class RotateBenchmark(tf.test.Benchmark):
+  """Benchmarks the rotation of large point clouds."""
+
+  def _benchmark(self, matrix_batch_shape, num_points):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      # Variables prevent the graph from being constant folded.
+      point = tf.compat.v1.Variable(
+          np.random.normal(size=(num_points, 3)).astype(np.float32))
+      matrix = tf.compat.v1.Variable(
+          rotation_matrix_3d.from_euler(
+              np.random.uniform(
+                  -np.pi, np.pi,
+                  size=matrix_batch_shape + (3,)).astype(np.float32)))
+      rotated_point = rotation_matrix_3d.rotate(point, matrix)
+      sess.run(tf.compat.v1.global_variables_initializer())
+      self.run_op_benchmark(
+          sess,
+          rotated_point.op,
+          min_iters=10,
+          name="rotate_%s_N%d" %
+          ("shared" if not matrix_batch_shape else "batched", num_points))
+
+  def benchmark_rotate(self):
+    for matrix_batch_shape in ((), (1000000,)):
+      self._benchmark(matrix_batch_shape, 1000000)
+
 
 if __name__ == "__main__":
   test_case.main()
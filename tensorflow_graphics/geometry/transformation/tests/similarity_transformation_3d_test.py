@@ -0,0 +1,211 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for 3d similarity transformations."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import flagsaver
+from absl.testing import parameterized
+import numpy as np
+from scipy import linalg
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.geometry.transformation import similarity_transformation_3d
+from tensorflow_graphics.geometry.transformation.tests import test_helpers
+from tensorflow_graphics.util import test_case
+
+
+def _generate_random_transformations(tensor_shape):
+  """Generates random similarity transformations."""
+  random_quaternion = test_helpers.generate_random_test_quaternions(
+      tensor_shape)
+  random_translation = np.random.normal(size=tensor_shape + [3])
+  random_scale = np.random.uniform(0.5, 2.0, size=tensor_shape + [1])
+  return np.concatenate((random_quaternion, random_translation, random_scale),
+                        axis=-1)
+
+
+def _homogeneous(matrix):
+  """Appends the row [0, 0, 0, 1] to 3x4 matrices."""
+  last_row = np.zeros(matrix.shape[:-2] + (1, 4))
+  last_row[..., 3] = 1.0
+  return np.concatenate((matrix, last_row), axis=-2)
+
+
+def _exp_numpy(twist):
+  """Computes the 3x4 matrix exponential of a single twist."""
+  x, y, z = twist[:3]
+  algebra = np.zeros((4, 4))
+  algebra[:3, :3] = ((twist[6], -z, y), (z, twist[6], -x), (-y, x, twist[6]))
+  algebra[:3, 3] = twist[3:6]
+  return linalg.expm(algebra)[:3]
+
+
+def _generate_random_twists(angle, log_scale):
+  """Generates random twists with a given rotation angle and log scale."""
+  rotation_vector = np.random.normal(size=(10, 3))
+  rotation_vector *= angle / np.linalg.norm(
+      rotation_vector, axis=-1, keepdims=True)
+  return np.concatenate((rotation_vector, np.random.normal(size=(10, 3)),
+                         np.full((10, 1), log_scale)),
+                        axis=-1)
+
+
+class SimilarityTransformation3dTest(test_case.TestCase):
+
+  @parameterized.parameters(
+      ((4,), (3,), (1,)),
+      ((None, 4), (None, 3), (None, 1)),
+  )
+  def test_from_quaternion_exception_not_raised(self, *shapes):
+    """Tests that the shape exceptions are not raised."""
+    self.assert_exception_is_not_raised(
+        similarity_transformation_3d.from_quaternion, shapes)
+
+  @parameterized.parameters(
+      ("must have exactly 1 dimensions in axis -1", (4,), (3,), (3,)),
+      ("Not all batch dimensions are identical.", (2, 4), (2, 3), (3, 1)),
+  )
+  def test_from_quaternion_exception_raised(self, error_msg, *shapes):
+    """Tests that the shape exceptions are raised."""
+    self.assert_exception_is_raised(
+        similarity_transformation_3d.from_quaternion, error_msg, shapes)
+
+  @parameterized.parameters(
+      ("must have exactly 8 dimensions in axis -1",
+       similarity_transformation_3d.compose, (7,), (8,)),
+      ("must have exactly 8 dimensions in axis -1",
+       similarity_transformation_3d.transform, (3,), (7,)),
+      ("must have exactly 7 dimensions in axis -1",
+       similarity_transformation_3d.exp, (8,)),
+      ("Not all batch dimensions are broadcast-compatible.",
+       similarity_transformation_3d.compose, (2, 8), (3, 8)),
+  )
+  def test_exception_raised(self, error_msg, func, *shapes):
+    """Tests that the shape exceptions are raised."""
+    self.assert_exception_is_raised(func, error_msg, shapes)
+
+  def test_matrix_conversion_random(self):
+    """Tests that from_matrix inverts to_matrix."""
+    transformation = _generate_random_transformations([3, 2])
+
+    matrix = similarity_transformation_3d.to_matrix(transformation)
+    prediction = similarity_transformation_3d.from_matrix(matrix)
+
+    self.assertAllClose(
+        similarity_transformation_3d.to_matrix(prediction), matrix)
+    self.assertAllClose(prediction[..., 4:], transformation[..., 4:])
+
+  def test_from_rigid_transformation_random(self):
+    """Tests that rigid transformations have a unit scale."""
+    random_quaternion = test_helpers.generate_random_test_quaternions([5])
+    transformation = rigid_transformation_3d.from_quaternion(
+        random_quaternion, np.random.normal(size=(5, 3)))
+    point = np.random.normal(size=(5, 3))
+
+    similarity = similarity_transformation_3d.from_rigid_transformation(
+        transformation)
+
+    self.assertAllClose(
+        similarity_transformation_3d.transform(point, similarity),
+        rigid_transformation_3d.transform(point, transformation))
+
+  def test_compose_random(self):
+    """Tests that the composition matches the product of the matrices."""
+    transformation1 = _generate_random_transformations([4, 1])
+    transformation2 = _generate_random_transformations([1, 3])
+
+    composed = similarity_transformation_3d.compose(transformation1,
+                                                    transformation2)
+    matrix1 = _homogeneous(
+        self.evaluate(similarity_transformation_3d.to_matrix(transformation1)))
+    matrix2 = _homogeneous(
+        self.evaluate(similarity_transformation_3d.to_matrix(transformation2)))
+
+    self.assertAllClose(
+        similarity_transformation_3d.to_matrix(composed),
+        np.matmul(matrix1, matrix2)[..., :3, :])
+
+  def test_inverse_random(self):
+    """Tests that inverting a transformation undoes it."""
+    transformation = _generate_random_transformations([3, 2])
+    point = np.random.normal(size=(3, 2, 3))
+
+    inverse = similarity_transformation_3d.inverse(transformation)
+    identity = similarity_transformation_3d.to_matrix(
+        similarity_transformation_3d.compose(transformation, inverse))
+    transformed_point = similarity_transformation_3d.transform(
+        similarity_transformation_3d.transform(point, transformation), inverse)
+
+    self.assertAllClose(identity,
+                        np.tile(np.eye(3, 4), (3, 2, 1, 1)), atol=1e-6)
+    self.assertAllClose(transformed_point, point)
+
+  @parameterized.parameters(
+      (0.0, 0.0),
+      (1e-4, 0.0),
+      (0.0, 1e-4),
+      (0.05, -0.5),
+      (1.0, 0.7),
+      (3.0, -2.0),
+  )
+  def test_exp_random(self, angle, log_scale):
+    """Tests the exponential map against the matrix exponential."""
+    twist = _generate_random_twists(angle, log_scale)
+
+    prediction = similarity_transformation_3d.to_matrix(
+        similarity_transformation_3d.exp(twist))
+    ground_truth = np.stack([_exp_numpy(x) for x in twist])
+
+    self.assertAllClose(prediction, ground_truth)
+
+  @parameterized.parameters(
+      (0.0, 0.0),
+      (1e-4, 1e-4),
+      (0.05, -0.5),
+      (1.0, 0.7),
+      (3.0, -2.0),
+  )
+  def test_log_exp_random(self, angle, log_scale):
+    """Tests that the logarithm map inverts the exponential map."""
+    twist = _generate_random_twists(angle, log_scale)
+
+    prediction = similarity_transformation_3d.log(
+        similarity_transformation_3d.exp(twist))
+
+    self.assertAllClose(prediction, twist)
+
+  @parameterized.parameters((0.0, 0.0), (0.05, 1e-3), (1.0, -0.5))
+  @flagsaver.flagsaver(tfg_add_asserts_to_graph=False)
+  def test_exp_log_jacobian_random(self, angle, log_scale):
+    """Tests the Jacobians of the exponential and logarithm maps."""
+    x_twist_init = _generate_random_twists(angle, log_scale)[0]
+    x_twist = tf.convert_to_tensor(value=x_twist_init)
+    x_transformation_init = self.evaluate(
+        similarity_transformation_3d.exp(x_twist_init))
+    x_transformation = tf.convert_to_tensor(value=x_transformation_init)
+
+    y_exp = similarity_transformation_3d.exp(x_twist)
+    y_log = similarity_transformation_3d.log(x_transformation)
+
+    self.assert_jacobian_is_correct(x_twist, x_twist_init, y_exp)
+    self.assert_jacobian_is_correct(x_transformation, x_transformation_init,
+                                    y_log)
+
+
+if __name__ == "__main__":
+  test_case.main()
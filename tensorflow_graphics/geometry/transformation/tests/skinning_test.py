@@ -0,0 +1,226 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for skinning."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import flagsaver
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import quaternion
+from tensorflow_graphics.geometry.transformation import rigid_transformation_3d
+from tensorflow_graphics.geometry.transformation import skinning
+from tensorflow_graphics.geometry.transformation.tests import test_helpers
+from tensorflow_graphics.util import test_case
+
+
+def _random_skinning_input(batch_shape, num_vertices, num_bones,
+                           num_bones_per_vertex):
+  """Creates random points, sparse bone weights and bone transformations."""
+  points = np.random.normal(size=(num_vertices, 3))
+  bone_indices = np.stack([
+      np.random.choice(num_bones, num_bones_per_vertex, replace=False)
+      for _ in range(num_vertices)
+  ]).astype(np.int32)
+  bone_weights = np.random.uniform(size=(num_vertices, num_bones_per_vertex))
+  bone_weights /= np.sum(bone_weights, axis=-1, keepdims=True)
+  bone_quaternion = test_helpers.generate_random_test_quaternions(
+      batch_shape + [num_bones])
+  bone_translation = np.random.normal(size=batch_shape + [num_bones, 3])
+  bone_transformation = np.concatenate((bone_quaternion, bone_translation),
+                                       axis=-1)
+  return points, bone_indices, bone_weights, bone_transformation
+
+
+def _dense_weights(bone_indices, bone_weights, num_bones):
+  """Converts sparse bone weights to dense [V, J] weights."""
+  weights = np.zeros((bone_indices.shape[0], num_bones))
+  np.put_along_axis(weights, bone_indices, bone_weights, axis=-1)
+  return weights
+
+
+class SkinningTest(test_case.TestCase):
+
+  @parameterized.parameters(
+      ((5, 3), (5, 2), (5, 2), (4, 7)),
+      ((None, 3), (None, 2), (None, 2), (4, 7)),
+      ((2, 5, 3), (5, 2), (5, 2), (2, 4, 7)),
+      ((5, 3), (5, 2), (5, 2), (3, 2, 4, 7)),
+  )
+  def test_linear_blend_exception_not_raised(self, *shapes):
+    """Tests that the shape exceptions are not raised."""
+    self.assert_exception_is_not_raised(
+        skinning.linear_blend, shapes,
+        [tf.float32, tf.int32, tf.float32, tf.float32])
+
+  @parameterized.parameters(
+      ("must have exactly 3 dimensions in axis -1", (5, 2), (5, 2), (5, 2),
+       (4, 7)),
+      ("must have a rank of 2", (5, 3), (1, 5, 2), (5, 2), (4, 7)),
+      ("must have exactly 7 dimensions in axis -1", (5, 3), (5, 2), (5, 2),
+       (4, 8)),
+      ("Not all batch dimensions are identical.", (5, 3), (5, 2), (5, 3),
+       (4, 7)),
+      ("must have the same number of dimensions", (5, 3), (6, 2), (6, 2),
+       (4, 7)),
+      ("Not all batch dimensions are broadcast-compatible.", (2, 5, 3),
+       (5, 2), (5, 2), (3, 4, 7)),
+  )
+  def test_blend_exception_raised(self, error_msg, *shapes):
+    """Tests that the shape exceptions are raised."""
+    for func in (skinning.linear_blend, skinning.dual_quaternion_blend):
+      self.assert_exception_is_raised(
+          func, error_msg, shapes,
+          [tf.float32, tf.int32, tf.float32, tf.float32])
+
+  def test_blend_exception_raised_type(self):
+    """Tests that float bone indices raise a TypeError."""
+    with self.assertRaisesRegexp(TypeError,
+                                 "'bone_indices' must have an integer type."):
+      skinning.linear_blend(
+          np.zeros((5, 3)), np.zeros((5, 2)), np.zeros((5, 2)),
+          np.zeros((4, 7)))
+
+  @parameterized.parameters(
+      ([], 20, 6, 3),
+      ([4], 30, 10, 4),
+      ([2, 3], 10, 5, 1),
+  )
+  def test_linear_blend_random(self, batch_shape, num_vertices, num_bones,
+                               num_bones_per_vertex):
+    """Tests linear blend skinning against a dense computation."""
+    points, bone_indices, bone_weights, bone_transformation = (
+        _random_skinning_input(batch_shape, num_vertices, num_bones,
+                               num_bones_per_vertex))
+
+    deformed_points = skinning.linear_blend(points, bone_indices, bone_weights,
+                                            bone_transformation)
+    matrix = self.evaluate(rigid_transformation_3d.to_matrix(
+        bone_transformation))
+    weights = _dense_weights(bone_indices, bone_weights, num_bones)
+    transformed_points = (
+        np.einsum("...jab,vb->...vja", matrix[..., :3], points) +
+        np.expand_dims(matrix[..., 3], axis=-3))
+    ground_truth = np.einsum("vj,...vja->...va", weights, transformed_points)
+
+    self.assertAllClose(deformed_points, ground_truth)
+
+  @parameterized.parameters(
+      ([], 20, 6, 3),
+      ([4], 30, 10, 4),
+  )
+  def test_dual_quaternion_blend_rigid(self, batch_shape, num_vertices,
+                                       num_bones, num_bones_per_vertex):
+    """Tests that bones with the same transformation move rigidly."""
+    points, bone_indices, bone_weights, bone_transformation = (
+        _random_skinning_input(batch_shape, num_vertices, num_bones,
+                               num_bones_per_vertex))
+    bone_transformation = np.tile(bone_transformation[..., :1, :],
+                                  [1] * len(batch_shape) + [num_bones, 1])
+    # Antipodal quaternions represent the same rotation.
+    bone_transformation[..., ::2, :4] *= -1.0
+
+    deformed_points = skinning.dual_quaternion_blend(points, bone_indices,
+                                                     bone_weights,
+                                                     bone_transformation)
+    ground_truth = rigid_transformation_3d.transform(
+        points, bone_transformation[..., :1, :])
+
+    self.assertAllClose(deformed_points, ground_truth)
+
+  def test_dual_quaternion_blend_preset(self):
+    """Tests that equally weighted rotations about an axis average angles."""
+    axis = np.array(((0.0, 0.0, 1.0),))
+    angles = np.array(((0.2,), (1.4,)))
+    bone_transformation = rigid_transformation_3d.from_axis_angle(
+        np.tile(axis, (2, 1)), angles, np.zeros((2, 3)))
+    points = np.array(((1.0, 0.0, 0.5), (0.0, 2.0, -1.0)))
+    bone_indices = np.array(((0, 1), (1, 0)), dtype=np.int32)
+    bone_weights = np.array(((0.5, 0.5), (0.5, 0.5)))
+
+    deformed_points = skinning.dual_quaternion_blend(points, bone_indices,
+                                                     bone_weights,
+                                                     bone_transformation)
+    blended_angles = np.array(((0.8,), (0.8,)))
+    ground_truth = quaternion.rotate(
+        points, quaternion.from_axis_angle(np.tile(axis, (2, 1)),
+                                           blended_angles))
+
+    self.assertAllClose(deformed_points, ground_truth)
+
+  @flagsaver.flagsaver(tfg_add_asserts_to_graph=False)
+  def test_blend_jacobian_random(self):
+    """Tests the Jacobians of the skinning ops."""
+    (x_points_init, bone_indices, bone_weights,
+     x_transformation_init) = _random_skinning_input([2], 6, 4, 2)
+    x_points = tf.convert_to_tensor(value=x_points_init)
+    x_transformation = tf.convert_to_tensor(value=x_transformation_init)
+
+    for func in (skinning.linear_blend, skinning.dual_quaternion_blend):
+      y = func(x_points, bone_indices, bone_weights, x_transformation)
+
+      self.assert_jacobian_is_correct(x_points, x_points_init, y)
+      self.assert_jacobian_is_correct(x_transformation, x_transformation_init,
+                                      y)
+
+  def test_top_k_bone_weights_random(self):
+    """Tests that the top k weights keep the largest renormalized weights."""
+    skinning_weights = np.random.uniform(size=(10, 8))
+
+    bone_indices, bone_weights = skinning.top_k_bone_weights(
+        skinning_weights, 3)
+    ground_truth_indices = np.argsort(-skinning_weights, axis=-1)[:, :3]
+    ground_truth_weights = np.take_along_axis(
+        skinning_weights, ground_truth_indices, axis=-1)
+    ground_truth_weights /= np.sum(ground_truth_weights, axis=-1,
+                                   keepdims=True)
+
+    self.assertAllEqual(bone_indices, ground_truth_indices)
+    self.assertAllClose(bone_weights, ground_truth_weights)
+
+
+class SkinningBenchmark(tf.test.Benchmark):
+  """Benchmarks the skinning of a mesh for a batch of poses."""
+
+  def _benchmark(self, method, num_poses, num_vertices, num_bones,
+                 num_bones_per_vertex):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      points, bone_indices, bone_weights, bone_transformation = (
+          _random_skinning_input([num_poses], num_vertices, num_bones,
+                                 num_bones_per_vertex))
+      # Variables prevent the graph from being constant folded.
+      bone_transformation = tf.compat.v1.Variable(
+          bone_transformation.astype(np.float32))
+      deformed_points = getattr(skinning, method)(
+          points.astype(np.float32), bone_indices,
+          bone_weights.astype(np.float32), bone_transformation)
+      sess.run(tf.compat.v1.global_variables_initializer())
+      self.run_op_benchmark(
+          sess,
+          deformed_points.op,
+          min_iters=5,
+          name="%s_B%d_V%d_J%d_K%d" % (method, num_poses, num_vertices,
+                                       num_bones, num_bones_per_vertex))
+
+  def benchmark_skinning(self):
+    for method in ("linear_blend", "dual_quaternion_blend"):
+      self._benchmark(method, 64, 20000, 64, 4)
+
+
+if __name__ == "__main__":
+  test_case.main()
@@ -0,0 +1,164 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for rotation conversions for trusted inputs."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import flagsaver
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.geometry.transformation import axis_angle
+from tensorflow_graphics.geometry.transformation import euler
+from tensorflow_graphics.geometry.transformation import quaternion
+from tensorflow_graphics.geometry.transformation import rotation_matrix_3d
+from tensorflow_graphics.geometry.transformation import trusted_conversion
+from tensorflow_graphics.geometry.transformation.tests import test_data as td
+from tensorflow_graphics.geometry.transformation.tests import test_helpers
+from tensorflow_graphics.util import test_case
+
+# The trusted conversions and the checked functions they match.
+_CONVERSIONS = (
+    ("euler_from_quaternion", euler.from_quaternion, "quaternion"),
+    ("euler_from_rotation_matrix", euler.from_rotation_matrix,
+     "rotation_matrix"),
+    ("quaternion_from_rotation_matrix", quaternion.from_rotation_matrix,
+     "rotation_matrix"),
+    ("rotation_matrix_from_quaternion", rotation_matrix_3d.from_quaternion,
+     "quaternion"),
+    ("rotation_matrix_from_axis_angle", rotation_matrix_3d.from_axis_angle,
+     "axis_angle"),
+    ("axis_angle_from_quaternion", axis_angle.from_quaternion, "quaternion"),
+    ("axis_angle_from_rotation_matrix", axis_angle.from_rotation_matrix,
+     "rotation_matrix"),
+)
+
+
+def _generate_inputs(euler_angles, representation):
+  """Converts Euler angles to the inputs of a conversion."""
+  if representation == "quaternion":
+    return (quaternion.from_euler(euler_angles),)
+  if representation == "rotation_matrix":
+    return (rotation_matrix_3d.from_euler(euler_angles),)
+  return axis_angle.from_euler(euler_angles)
+
+
+def _to_rotation_matrix(output, func_name):
+  """Converts the output of a conversion to rotation matrices."""
+  if func_name.startswith("euler"):
+    return rotation_matrix_3d.from_euler(output)
+  if func_name.startswith("quaternion"):
+    return rotation_matrix_3d.from_quaternion(output)
+  if func_name.startswith("axis_angle"):
+    return rotation_matrix_3d.from_axis_angle(*output)
+  return output
+
+
+class TrustedConversionTest(test_case.TestCase):
+
+  @parameterized.parameters(*_CONVERSIONS)
+  def test_conversion_random(self, func_name, checked_func, representation):
+    """Tests that the trusted conversions match the checked functions."""
+    random_euler_angles = test_helpers.generate_random_test_euler_angles()
+    inputs = _generate_inputs(random_euler_angles, representation)
+
+    prediction = getattr(trusted_conversion, func_name)(*inputs)
+    ground_truth = checked_func(*inputs)
+
+    self.assertAllClose(prediction, ground_truth)
+
+  @parameterized.parameters(*_CONVERSIONS)
+  def test_conversion_preset(self, func_name, checked_func, representation):
+    """Tests the trusted conversions on preset rotations."""
+    preset_euler_angles = test_helpers.generate_preset_test_euler_angles()
+    inputs = _generate_inputs(preset_euler_angles, representation)
+
+    prediction = getattr(trusted_conversion, func_name)(*inputs)
+    ground_truth = checked_func(*inputs)
+
+    # Preset rotations can have several valid representations, such as
+    # angles of pi and -pi.
+    self.assertAllClose(
+        _to_rotation_matrix(prediction, func_name),
+        _to_rotation_matrix(ground_truth, func_name))
+
+  @parameterized.parameters(
+      ("euler_from_quaternion", "quaternion", td.ANGLE_90),
+      ("euler_from_quaternion", "quaternion", -td.ANGLE_90),
+      ("euler_from_rotation_matrix", "rotation_matrix", td.ANGLE_90),
+      ("euler_from_rotation_matrix", "rotation_matrix", -td.ANGLE_90),
+  )
+  def test_euler_gimbal(self, func_name, representation, gimbal_configuration):
+    """Tests that the rotations are recovered in Gimbal lock."""
+    random_euler_angles = test_helpers.generate_random_test_euler_angles()
+    random_euler_angles[..., 1] = gimbal_configuration
+    inputs = _generate_inputs(random_euler_angles, representation)
+
+    prediction = getattr(trusted_conversion, func_name)(*inputs)
+
+    self.assertAllClose(
+        rotation_matrix_3d.from_euler(prediction),
+        rotation_matrix_3d.from_euler(random_euler_angles),
+        atol=2e-3)
+
+  @parameterized.parameters(
+      ("euler_from_quaternion", "quaternion"),
+      ("euler_from_rotation_matrix", "rotation_matrix"),
+      ("quaternion_from_rotation_matrix", "rotation_matrix"),
+  )
+  @flagsaver.flagsaver(tfg_add_asserts_to_graph=False)
+  def test_conversion_jacobian_random(self, func_name, representation):
+    """Tests the Jacobians of the branching conversions."""
+    random_euler_angles = test_helpers.generate_random_test_euler_angles()
+    x_init = self.evaluate(
+        _generate_inputs(random_euler_angles, representation)[0])
+    x = tf.convert_to_tensor(value=x_init)
+
+    y = getattr(trusted_conversion, func_name)(x)
+
+    self.assert_jacobian_is_correct(x, x_init, y)
+
+
+class TrustedConversionBenchmark(tf.test.Benchmark):
+  """Benchmarks the trusted conversions against the checked functions."""
+
+  def _benchmark(self, func_name, checked_func, representation, num_rotations):
+    random_euler_angles = np.random.uniform(
+        -np.pi, np.pi, size=(num_rotations, 3)).astype(np.float32)
+    for prefix, func in (("checked", checked_func),
+                         ("trusted",
+                          getattr(trusted_conversion, func_name))):
+      with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+        # Variables prevent the graph from being constant folded.
+        inputs = [
+            tf.compat.v1.Variable(x) for x in sess.run(
+                _generate_inputs(random_euler_angles, representation))
+        ]
+        outputs = tf.nest.flatten(func(*inputs))
+        sess.run(tf.compat.v1.global_variables_initializer())
+        self.run_op_benchmark(
+            sess, [output.op for output in outputs],
+            min_iters=10,
+            name="%s_%s_N%d" % (prefix, func_name, num_rotations))
+
+  def benchmark_conversions(self):
+    for func_name, checked_func, representation in _CONVERSIONS:
+      self._benchmark(func_name, checked_func, representation, 1000000)
+
+
+if __name__ == "__main__":
+  test_case.main()
@@ -0,0 +1,372 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module implements rotation conversions for trusted inputs.
+
+The functions of this module compute the same conversions as their
+counterparts in `quaternion`, `euler`, `axis_angle` and `rotation_matrix_3d`,
+but assume that their inputs are valid: they do not check the shapes of their
+inputs, do not add assert nodes to the graph, and do not clip intermediate
+values except where a function would otherwise be evaluated outside of its
+domain. Conversions with several branches select the inputs of the branch
+to evaluate before applying the costly operations, instead of evaluating all
+the branches and selecting their outputs.
+
+They are intended for hot loops, such as the body of a `tf.while_loop`
+optimizer, where the inputs are known to be valid. Invalid inputs lead to
+undefined results.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+import tensorflow as tf
+
+from tensorflow_graphics.util import asserts
+from tensorflow_graphics.util import export_api
+from tensorflow_graphics.util import safe_ops
+
+
+def _stack_matrix(rows):
+  """Stacks the rows of entries of a 3x3 matrix."""
+  matrix = tf.stack([entry for row in rows for entry in row], axis=-1)
+  output_shape = tf.concat((tf.shape(input=matrix)[:-1], (3, 3)), axis=-1)
+  return tf.reshape(matrix, shape=output_shape)
+
+
+def _unstack_matrix(matrix):
+  """Unstacks a 3x3 matrix into a list of rows of entries."""
+  return [tf.unstack(row, axis=-1) for row in tf.unstack(matrix, axis=-2)]
+
+
+def _euler_from_entries(r00, r01, r02, r10, r20, r21, r22, is_gimbal):
+  """Computes Euler angles from the entries of a rotation matrix.
+
+  The arguments of the arctangents of the general and Gimbal lock cases are
+  selected before evaluating them, such that each angle only requires a
+  single arctangent.
+
+  Args:
+    r00: A tensor of shape `[A1, ..., An]` with the entry (0, 0) of a rotation
+      matrix.
+    r01: A tensor of shape `[A1, ..., An]` with the entry (0, 1).
+    r02: A tensor of shape `[A1, ..., An]` with the entry (0, 2).
+    r10: A tensor of shape `[A1, ..., An]` with the entry (1, 0).
+    r20: A tensor of shape `[A1, ..., An]` with the entry (2, 0), in [-1, 1].
+    r21: A tensor of shape `[A1, ..., An]` with the entry (2, 1).
+    r22: A tensor of shape `[A1, ..., An]` with the entry (2, 2).
+    is_gimbal: A `bool` tensor of shape `[A1, ..., An]` indicating the Gimbal
+      locks.
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3]`, where the last dimension represents
+    the three Euler angles.
+  """
+  eps_addition = asserts.select_eps_for_addition(r00.dtype)
+  sign_r20 = safe_ops.nonzero_sign(r20)
+  # The cosine of theta_y is always positive outside of Gimbal locks.
+  theta_y = tf.where(is_gimbal, -sign_r20 * (math.pi / 2.0), -tf.asin(r20))
+  r00 = safe_ops.nonzero_sign(r00) * eps_addition + r00
+  r02 = safe_ops.nonzero_sign(r02) * eps_addition + r02
+  r22 = safe_ops.nonzero_sign(r22) * eps_addition + r22
+  theta_x = tf.atan2(
+      tf.where(is_gimbal, -sign_r20 * r01, r21),
+      tf.where(is_gimbal, -sign_r20 * r02, r22))
+  theta_z = tf.atan2(
+      tf.where(is_gimbal, tf.zeros_like(r10), r10),
+      tf.where(is_gimbal, tf.ones_like(r00), r00))
+  return tf.stack((theta_x, theta_y, theta_z), axis=-1)
+
+
+def euler_from_quaternion(quaternion, name=None):
+  """Converts normalized quaternions to Euler angles.
+
+  See `euler.from_quaternion`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    quaternion: A tensor of shape `[A1, ..., An, 4]`, where the last dimension
+      represents a normalized quaternion.
+    name: A name for this op that defaults to
+      "trusted_conversion_euler_from_quaternion".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3]`, where the last dimension represents
+    the three Euler angles.
+  """
+  with tf.compat.v1.name_scope(name, "trusted_conversion_euler_from_quaternion",
+                               [quaternion]):
+    quaternion = tf.convert_to_tensor(value=quaternion)
+
+    x, y, z, w = tf.unstack(quaternion, axis=-1)
+    tx = 2.0 * x
+    ty = 2.0 * y
+    tz = 2.0 * z
+    twx = tx * w
+    twy = ty * w
+    twz = tz * w
+    txx = tx * x
+    txy = ty * x
+    txz = tz * x
+    tyy = ty * y
+    tyz = tz * y
+    tzz = tz * z
+    # Rounding errors can take r20 slightly outside of the domain of asin.
+    r20 = tf.clip_by_value(txz - twy, -1.0, 1.0)
+    is_gimbal = tf.less(tf.abs(tf.abs(r20) - 1.0), 1.0e-6)
+    return _euler_from_entries(1.0 - (tyy + tzz), txy - twz, txz + twy,
+                               txy + twz, r20, tyz + twx, 1.0 - (txx + tyy),
+                               is_gimbal)
+
+
+def euler_from_rotation_matrix(rotation_matrix, name=None):
+  """Converts rotation matrices to Euler angles.
+
+  See `euler.from_rotation_matrix`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    rotation_matrix: A tensor of shape `[A1, ..., An, 3, 3]`, where the last
+      two dimensions represent a rotation matrix.
+    name: A name for this op that defaults to
+      "trusted_conversion_euler_from_rotation_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3]`, where the last dimension represents
+    the three Euler angles.
+  """
+  with tf.compat.v1.name_scope(
+      name, "trusted_conversion_euler_from_rotation_matrix", [rotation_matrix]):
+    rotation_matrix = tf.convert_to_tensor(value=rotation_matrix)
+
+    (r00, r01, r02), (r10, _, _), (r20, r21, r22) = _unstack_matrix(
+        rotation_matrix)
+    is_gimbal = tf.equal(tf.abs(r20), 1.0)
+    return _euler_from_entries(r00, r01, r02, r10, r20, r21, r22, is_gimbal)
+
+
+def quaternion_from_rotation_matrix(rotation_matrix, name=None):
+  """Converts rotation matrices to quaternions.
+
+  See `quaternion.from_rotation_matrix`, which selects the same quaternion
+  among `q` and `-q`. Only the branch of the selected component is evaluated,
+  with a single square root from which the other components are deduced.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    rotation_matrix: A tensor of shape `[A1, ..., An, 3, 3]`, where the last
+      two dimensions represent a rotation matrix.
+    name: A name for this op that defaults to
+      "trusted_conversion_quaternion_from_rotation_matrix".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 4]`, where the last dimension represents
+    a normalized quaternion.
+  """
+  with tf.compat.v1.name_scope(
+      name, "trusted_conversion_quaternion_from_rotation_matrix",
+      [rotation_matrix]):
+    rotation_matrix = tf.convert_to_tensor(value=rotation_matrix)
+
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = _unstack_matrix(
+        rotation_matrix)
+    # The entries of 4 * q * q^T, with q = (x, y, z, w).
+    four_qx2 = 1.0 + m00 - m11 - m22
+    four_qy2 = 1.0 - m00 + m11 - m22
+    four_qz2 = 1.0 - m00 - m11 + m22
+    trace = m00 + m11 + m22
+    four_qw2 = 1.0 + trace
+    four_qxqy = m01 + m10
+    four_qxqz = m02 + m20
+    four_qyqz = m12 + m21
+    four_qxqw = m21 - m12
+    four_qyqw = m02 - m20
+    four_qzqw = m10 - m01
+    # Same selection as quaternion.from_rotation_matrix: w if the trace is
+    # positive, otherwise the largest of x, y and z.
+    is_w = trace > 0.0
+    is_x = tf.logical_and(four_qx2 > four_qy2, four_qx2 > four_qz2)
+    is_y = four_qy2 > four_qz2
+
+    def select(x, y, z, w):
+      """Selects the entry corresponding to the largest component."""
+      return tf.where(is_w, w, tf.where(is_x, x, tf.where(is_y, y, z)))
+
+    # The selected entries are 4 * q_i * q, where 4 * q_i^2 is at least 1.
+    scale = 0.5 * tf.math.rsqrt(select(four_qx2, four_qy2, four_qz2, four_qw2))
+    quaternion = tf.stack(
+        (select(four_qx2, four_qxqy, four_qxqz, four_qxqw),
+         select(four_qxqy, four_qy2, four_qyqz, four_qyqw),
+         select(four_qxqz, four_qyqz, four_qz2, four_qzqw),
+         select(four_qxqw, four_qyqw, four_qzqw, four_qw2)),
+        axis=-1)
+    return quaternion * tf.expand_dims(scale, axis=-1)
+
+
+def rotation_matrix_from_quaternion(quaternion, name=None):
+  """Converts normalized quaternions to rotation matrices.
+
+  See `rotation_matrix_3d.from_quaternion`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    quaternion: A tensor of shape `[A1, ..., An, 4]`, where the last dimension
+      represents a normalized quaternion.
+    name: A name for this op that defaults to
+      "trusted_conversion_rotation_matrix_from_quaternion".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3, 3]`, where the last two dimensions
+    represent a rotation matrix.
+  """
+  with tf.compat.v1.name_scope(
+      name, "trusted_conversion_rotation_matrix_from_quaternion", [quaternion]):
+    quaternion = tf.convert_to_tensor(value=quaternion)
+
+    x, y, z, w = tf.unstack(quaternion, axis=-1)
+    tx = 2.0 * x
+    ty = 2.0 * y
+    tz = 2.0 * z
+    twx = tx * w
+    twy = ty * w
+    twz = tz * w
+    txx = tx * x
+    txy = ty * x
+    txz = tz * x
+    tyy = ty * y
+    tyz = tz * y
+    tzz = tz * z
+    return _stack_matrix(((1.0 - (tyy + tzz), txy - twz, txz + twy),
+                          (txy + twz, 1.0 - (txx + tzz), tyz - twx),
+                          (txz - twy, tyz + twx, 1.0 - (txx + tyy))))
+
+
+def rotation_matrix_from_axis_angle(axis, angle, name=None):
+  """Converts axis-angle representations to rotation matrices.
+
+  See `rotation_matrix_3d.from_axis_angle`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    axis: A tensor of shape `[A1, ..., An, 3]`, where the last dimension
+      represents a normalized axis.
+    angle: A tensor of shape `[A1, ..., An, 1]`, where the last dimension
+      represents an angle.
+    name: A name for this op that defaults to
+      "trusted_conversion_rotation_matrix_from_axis_angle".
+
+  Returns:
+    A tensor of shape `[A1, ..., An, 3, 3]`, where the last two dimensions
+    represent a rotation matrix.
+  """
+  with tf.compat.v1.name_scope(
+      name, "trusted_conversion_rotation_matrix_from_axis_angle",
+      [axis, angle]):
+    axis = tf.convert_to_tensor(value=axis)
+    angle = tf.convert_to_tensor(value=angle)
+
+    sin_axis = tf.sin(angle) * axis
+    cos_angle = tf.cos(angle)
+    cos1_axis = (1.0 - cos_angle) * axis
+    _, axis_y, axis_z = tf.unstack(axis, axis=-1)
+    cos1_axis_x, cos1_axis_y, _ = tf.unstack(cos1_axis, axis=-1)
+    sin_axis_x, sin_axis_y, sin_axis_z = tf.unstack(sin_axis, axis=-1)
+    tmp = cos1_axis_x * axis_y
+    m01 = tmp - sin_axis_z
+    m10 = tmp + sin_axis_z
+    tmp = cos1_axis_x * axis_z
+    m02 = tmp + sin_axis_y
+    m20 = tmp - sin_axis_y
+    tmp = cos1_axis_y * axis_z
+    m12 = tmp - sin_axis_x
+    m21 = tmp + sin_axis_x
+    diag_x, diag_y, diag_z = tf.unstack(cos1_axis * axis + cos_angle, axis=-1)
+    return _stack_matrix(((diag_x, m01, m02),
+                          (m10, diag_y, m12),
+                          (m20, m21, diag_z)))  # pyformat: disable
+
+
+def axis_angle_from_quaternion(quaternion, name=None):
+  """Converts normalized quaternions to axis-angle representations.
+
+  See `axis_angle.from_quaternion`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    quaternion: A tensor of shape `[A1, ..., An, 4]`, where the last dimension
+      represents a normalized quaternion.
+    name: A name for this op that defaults to
+      "trusted_conversion_axis_angle_from_quaternion".
+
+  Returns:
+    Tuple of two tensors of shape `[A1, ..., An, 3]` and `[A1, ..., An, 1]`,
+    where the first tensor represents the axis, and the second represents the
+    angle.
+  """
+  with tf.compat.v1.name_scope(
+      name, "trusted_conversion_axis_angle_from_quaternion", [quaternion]):
+    quaternion = tf.convert_to_tensor(value=quaternion)
+
+    # This prevents zero norm xyz and zero w, and is differentiable.
+    quaternion += asserts.select_eps_for_addition(quaternion.dtype)
+    xyz, w = tf.split(quaternion, (3, 1), axis=-1)
+    norm = tf.norm(tensor=xyz, axis=-1, keepdims=True)
+    angle = 2.0 * tf.atan2(norm, tf.abs(w))
+    eps_division = asserts.select_eps_for_division(quaternion.dtype)
+    axis = safe_ops.nonzero_sign(w) * xyz / (norm + eps_division)
+    return axis, angle
+
+
+def axis_angle_from_rotation_matrix(rotation_matrix, name=None):
+  """Converts rotation matrices to axis-angle representations.
+
+  See `axis_angle.from_rotation_matrix`.
+
+  Note:
+    In the following, A1 to An are optional batch dimensions.
+
+  Args:
+    rotation_matrix: A tensor of shape `[A1, ..., An, 3, 3]`, where the last
+      two dimensions represent a rotation matrix.
+    name: A name for this op that defaults to
+      "trusted_conversion_axis_angle_from_rotation_matrix".
+
+  Returns:
+    Tuple of two tensors of shape `[A1, ..., An, 3]` and `[A1, ..., An, 1]`,
+    where the first tensor represents the axis, and the second represents the
+    angle.
+  """
+  with tf.compat.v1.name_scope(
+      name, "trusted_conversion_axis_angle_from_rotation_matrix",
+      [rotation_matrix]):
+    return axis_angle_from_quaternion(
+        quaternion_from_rotation_matrix(rotation_matrix))
+
+
+# API contains all public functions and classes.
+__all__ = export_api.get_functions_and_classes()
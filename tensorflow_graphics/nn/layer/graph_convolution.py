@@ -20,9 +20,79 @@ from __future__ import print_function
 import tensorflow as tf
 
 import tensorflow_graphics.geometry.convolution.graph_convolution as gc
+from tensorflow_graphics.geometry.convolution import utils
 from tensorflow_graphics.util import export_api
 
 
+def _tiled_graph_convolution(convolution, data, neighbors, sizes,
+                             num_vertices_per_tile):
+  """Applies a graph convolution to tiles of vertices and stitches the outputs.
+
+  The output of a graph convolution at a vertex only depends on the vertex and
+  its neighbors. The vertices are split in tiles of `num_vertices_per_tile`
+  consecutive vertices, and the convolution is applied to each tile together
+  with its halo of neighbors, using only the neighborhoods of the tile
+  vertices. The tiles are processed one after the other, such that the memory
+  used by the convolution scales with the tile size instead of the graph size.
+
+  Args:
+    convolution: A callable taking a 2-D `data` tensor and a 2-D `neighbors`
+      `SparseTensor`, and returning the output of the convolution.
+    data: A `float` tensor with shape `[A1, ..., An, V, C]`.
+    neighbors: A `SparseTensor` with shape `[A1, ..., An, V, V]`, or a
+      `utils.PreparedGraph`.
+    sizes: An `int` tensor of shape `[A1, ..., An]`, or `None`.
+    num_vertices_per_tile: An `int`, the number of vertices in each tile.
+
+  Returns:
+    The output of `convolution` for all the vertices, with shape
+    `[A1, ..., An, V, D]`.
+  """
+  data = tf.convert_to_tensor(value=data)
+  if isinstance(neighbors, utils.PreparedGraph):
+    graph = neighbors
+  else:
+    graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+  x_flat = utils.flatten_prepared_graph_input(data, graph)
+  num_vertices = tf.shape(input=x_flat, out_type=tf.int64)[0]
+  num_tiles = tf.cast(
+      (num_vertices + num_vertices_per_tile - 1) // num_vertices_per_tile,
+      tf.int32)
+
+  def _convolve_tile(index, outputs):
+    """Applies the convolution to the tile `index`."""
+    start = tf.cast(index, tf.int64) * num_vertices_per_tile
+    stop = tf.minimum(start + num_vertices_per_tile, num_vertices)
+    edge_start = graph.row_splits[start]
+    edge_stop = graph.row_splits[stop]
+    # The tile vertices come first in the local vertex ids, then their halo.
+    tile_vertex_ids = tf.range(start, stop)
+    local_vertex_ids, local_col_ids = tf.unique(
+        tf.concat((tile_vertex_ids, graph.col_ids[edge_start:edge_stop]),
+                  axis=0),
+        out_idx=tf.int64)
+    local_row_ids = graph.row_ids[edge_start:edge_stop] - start
+    local_col_ids = local_col_ids[stop - start:]
+    num_local_vertices = tf.size(input=local_vertex_ids, out_type=tf.int64)
+    tile_neighbors = tf.SparseTensor(
+        tf.stack((local_row_ids, local_col_ids), axis=-1),
+        graph.adjacency.values[edge_start:edge_stop],
+        tf.stack((num_local_vertices, num_local_vertices)))
+    tile_output = convolution(
+        tf.gather(x_flat, local_vertex_ids), tile_neighbors)
+    return index + 1, outputs.write(index, tile_output[:stop - start])
+
+  outputs = tf.TensorArray(
+      dtype=data.dtype, size=num_tiles, infer_shape=False)
+  # Tiles are processed sequentially to bound the memory usage.
+  _, outputs = tf.while_loop(
+      cond=lambda index, _: index < num_tiles,
+      body=_convolve_tile,
+      loop_vars=(tf.constant(0), outputs),
+      parallel_iterations=1)
+  return utils.unflatten_prepared_graph_output(outputs.concat(), graph)
+
+
 # pyformat: disable
 def feature_steered_convolution_layer(
     data,
@@ -32,6 +102,7 @@ def feature_steered_convolution_layer(
     num_weight_matrices=8,
     num_output_channels=None,
     initializer=tf.compat.v1.truncated_normal_initializer(stddev=0.1),
+    fused=False,
     name=None,
     var_name=None):
   """Wraps the function `feature_steered_convolution` as a TensorFlow layer.
@@ -75,6 +146,8 @@ def feature_steered_convolution_layer(
     num_output_channels: An optional `int` specifying the number of channels in
       the output. If `None` then `num_output_channels = C`.
     initializer: An initializer for the trainable variables.
+    fused: A `bool`. If `True`, the contributions of all weight matrices are
+      aggregated at once. Passed through to feature_steered_convolution().
     name: A (name_scope) name for this op. Passed through to
       feature_steered_convolution().
     var_name: A (var_scope) name for the variables. Defaults to
@@ -135,6 +208,7 @@ def feature_steered_convolution_layer(
         var_c=var_c,
         var_w=var_w,
         var_b=var_b,
+        fused=fused,
         name=name)
 
 
@@ -146,6 +220,8 @@ class FeatureSteeredConvolutionKerasLayer(tf.keras.layers.Layer):
                num_weight_matrices=8,
                num_output_channels=None,
                initializer=None,
+               fused=False,
+               num_vertices_per_tile=None,
                name=None,
                **kwargs):
     """Initializes FeatureSteeredConvolutionKerasLayer.
@@ -160,6 +236,13 @@ class FeatureSteeredConvolutionKerasLayer(tf.keras.layers.Layer):
         the input dimensionality.
       initializer: An initializer for the trainable variables. If `None`,
         defaults to `tf.compat.v1.truncated_normal_initializer(stddev=0.1)`.
+      fused: A `bool`. If `True`, the contributions of all weight matrices are
+        aggregated at once. See `feature_steered_convolution` for details.
+      num_vertices_per_tile: An optional `int`. If not `None`, the convolution
+        is applied to tiles of `num_vertices_per_tile` vertices one after the
+        other, each tile with its halo of neighbors, and the outputs are
+        stitched. The result is the same, but the peak memory usage scales with
+        the tile size instead of the number of vertices and edges.
       name: A name for this layer.
       **kwargs: Additional keyword arguments passed to the base layer.
     """
@@ -168,6 +251,8 @@ class FeatureSteeredConvolutionKerasLayer(tf.keras.layers.Layer):
     self._num_weight_matrices = num_weight_matrices
     self._num_output_channels = num_output_channels
     self._translation_invariant = translation_invariant
+    self._fused = fused
+    self._num_vertices_per_tile = num_vertices_per_tile
     if initializer is None:
       self._initializer = tf.compat.v1.truncated_normal_initializer(stddev=0.1)
     else:
@@ -189,10 +274,8 @@ class FeatureSteeredConvolutionKerasLayer(tf.keras.layers.Layer):
         dtype=dtype,
         initializer=initializer,
         name='u')
-    if self._translation_invariant:
-      self.var_v = -self.var_u
-    else:
-      self.var_v = self.add_weight(
+    if not self._translation_invariant:
+      self._var_v = self.add_weight(
           shape=(in_channels, num_weight_matrices),
           dtype=dtype,
           initializer=initializer,
@@ -215,6 +298,25 @@ class FeatureSteeredConvolutionKerasLayer(tf.keras.layers.Layer):
         name='b',
         trainable=True)
 
+  def compute_output_shape(self, input_shape):
+    """Returns the shape of the output for the shapes of `[data, neighbors]`."""
+    data_shape = tf.TensorShape(input_shape[0])
+    if self._num_output_channels is None:
+      return data_shape
+    return data_shape[:-1].concatenate(self._num_output_channels)
+
+  @property
+  def var_v(self):
+    """The `v` weights, or `-var_u` if the layer is translation invariant.
+
+    When the layer is translation invariant, `var_v` is derived from `var_u`
+    each time it is read, such that it follows the updates of `var_u` and is
+    cast to the compute dtype of the layer in `call`.
+    """
+    if self._translation_invariant:
+      return -self.var_u
+    return self._var_v
+
   # pyformat: disable
   def call(self, inputs, sizes=None):
     """Executes the convolution.
@@ -257,15 +359,24 @@ class FeatureSteeredConvolutionKerasLayer(tf.keras.layers.Layer):
       Tensor with shape `[A1, ..., An, V, num_output_channels]`.
     """
     # pyformat: enable
-    return gc.feature_steered_convolution(
-        data=inputs[0],
-        neighbors=inputs[1],
-        sizes=sizes,
-        var_u=self.var_u,
-        var_v=self.var_v,
-        var_c=self.var_c,
-        var_w=self.var_w,
-        var_b=self.var_b)
+    var_v = self.var_v
+
+    def _convolution(data, neighbors, sizes=None):
+      return gc.feature_steered_convolution(
+          data=data,
+          neighbors=neighbors,
+          sizes=sizes,
+          var_u=self.var_u,
+          var_v=var_v,
+          var_c=self.var_c,
+          var_w=self.var_w,
+          var_b=self.var_b,
+          fused=self._fused)
+
+    if self._num_vertices_per_tile is not None:
+      return _tiled_graph_convolution(_convolution, inputs[0], inputs[1], sizes,
+                                      self._num_vertices_per_tile)
+    return _convolution(inputs[0], inputs[1], sizes)
 
 
 class DynamicGraphConvolutionKerasLayer(tf.keras.layers.Layer):
@@ -300,6 +411,8 @@ class DynamicGraphConvolutionKerasLayer(tf.keras.layers.Layer):
                activity_regularizer=None,
                kernel_constraint=None,
                bias_constraint=None,
+               num_vertices_per_tile=None,
+               decompose_edge_function=False,
                name=None,
                **kwargs):
     """Initializes DynamicGraphConvolutionKerasLayer.
@@ -324,9 +437,31 @@ class DynamicGraphConvolutionKerasLayer(tf.keras.layers.Layer):
         `tf.keras.layers.Conv1D`.
       bias_constraint: The `bias_constraint` argument of
         `tf.keras.layers.Conv1D`.
+      num_vertices_per_tile: An optional `int`. If not `None`, the convolution
+        is applied to tiles of `num_vertices_per_tile` vertices one after the
+        other, each tile with its halo of neighbors, and the outputs are
+        stitched. The result is the same, but the peak memory usage scales with
+        the tile size instead of the number of vertices and edges.
+      decompose_edge_function: A `bool`. If `True`, the linear part of the
+        edge function is decomposed as
+        `W [x_i, x_j - x_i] = (W_1 - W_2) x_i + W_2 x_j`, where `W_1` and `W_2`
+        are the halves of the 1d convolution kernel, such that the matrix
+        multiplications are applied once per vertex instead of once per edge.
+        The edge features are then only formed by summing the gathered
+        projections, and are recomputed in the backward pass instead of being
+        stored. The weights and the result are the same as with `False`.
+        `activity_regularizer` is not supported in this mode.
       name: A name for this layer.
       **kwargs: Additional keyword arguments passed to the base layer.
+
+    Raises:
+      ValueError: if `decompose_edge_function` is `True` and an
+        `activity_regularizer` is given.
     """
+    if decompose_edge_function and activity_regularizer is not None:
+      raise ValueError(
+          "'activity_regularizer' is not supported with "
+          "'decompose_edge_function'.")
     super(DynamicGraphConvolutionKerasLayer, self).__init__(
         name=name, **kwargs)
     self._num_output_channels = num_output_channels
@@ -340,6 +475,8 @@ class DynamicGraphConvolutionKerasLayer(tf.keras.layers.Layer):
     self._activity_regularizer = activity_regularizer
     self._kernel_constraint = kernel_constraint
     self._bias_constraint = bias_constraint
+    self._num_vertices_per_tile = num_vertices_per_tile
+    self._decompose_edge_function = decompose_edge_function
 
   def build(self, input_shape):
     """Initializes the layer weights."""
@@ -356,7 +493,17 @@ class DynamicGraphConvolutionKerasLayer(tf.keras.layers.Layer):
         bias_regularizer=self._bias_regularizer,
         activity_regularizer=self._activity_regularizer,
         kernel_constraint=self._kernel_constraint,
-        bias_constraint=self._bias_constraint)
+        bias_constraint=self._bias_constraint,
+        dtype=self.dtype_policy)
+    # The weights cannot be created inside the loop over the tiles, or inside
+    # a function recomputed in the backward pass.
+    in_channels = tf.TensorShape(input_shape[0]).as_list()[-1]
+    self._conv1d_layer.build((1, None, 2 * in_channels))
+
+  def compute_output_shape(self, input_shape):
+    """Returns the shape of the output for the shapes of `[data, neighbors]`."""
+    data_shape = tf.TensorShape(input_shape[0])
+    return data_shape[:-1].concatenate(self._num_output_channels)
 
   # pyformat: disable
   def call(self, inputs, sizes=None):
@@ -423,13 +570,300 @@ class DynamicGraphConvolutionKerasLayer(tf.keras.layers.Layer):
         'conv1d_layer': self._conv1d_layer
     }
 
-    return gc.edge_convolution_template(
-        data=inputs[0],
-        neighbors=inputs[1],
-        sizes=sizes,
-        edge_function=_edge_convolution,
-        reduction=self._reduction,
-        edge_function_kwargs=kwargs)
+    def _convolution(data, neighbors, sizes=None):
+      return gc.edge_convolution_template(
+          data=data,
+          neighbors=neighbors,
+          sizes=sizes,
+          edge_function=_edge_convolution,
+          reduction=self._reduction,
+          edge_function_kwargs=kwargs)
+
+    def _decomposed_convolution(data, neighbors, sizes=None):
+      # `[x_i, x_j - x_i] W = x_i (W_1 - W_2) + x_j W_2`. Each projection is
+      # only gathered at the edge endpoint where it is used.
+      kernel_vertex, kernel_neighbor = tf.split(
+          self._conv1d_layer.kernel[0], 2, axis=0)
+      data = tf.convert_to_tensor(value=data)
+      if isinstance(neighbors, (utils.PreparedGraph, utils.PaddedGraph)):
+        graph = neighbors
+        utils.check_valid_prepared_graph_input(data, graph, 'neighbors')
+      else:
+        neighbors = tf.compat.v1.convert_to_tensor_or_sparse_tensor(
+            value=neighbors)
+        if sizes is not None:
+          sizes = tf.convert_to_tensor(value=sizes)
+        utils.check_valid_graph_convolution_input(data, neighbors, sizes)
+        graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+      x_flat = utils.flatten_prepared_graph_input(data, graph)
+      vertex_projections = tf.matmul(x_flat, kernel_vertex - kernel_neighbor)
+      neighbor_projections = tf.matmul(x_flat, kernel_neighbor)
+      if self._use_bias:
+        bias = (tf.convert_to_tensor(value=self._conv1d_layer.bias),)
+      else:
+        bias = ()
+
+      def _edge_convolution(vertex_projections, neighbor_projections, *bias):
+        """Applies the edge function and reduces it over the neighborhoods."""
+        features = (
+            tf.gather(vertex_projections, graph.row_ids) +
+            tf.gather(neighbor_projections, graph.col_ids))
+        for bias_term in bias:
+          features += bias_term
+        features = self._conv1d_layer.activation(features)
+        return utils.segment_reduce_2d(features, graph, self._reduction)
+
+      # The per-edge features are recomputed in the backward pass.
+      features = tf.recompute_grad(_edge_convolution)(vertex_projections,
+                                                      neighbor_projections,
+                                                      *bias)
+      features.set_shape(
+          features.shape.merge_with(
+              (tf.compat.v1.dimension_value(x_flat.shape[0]),
+               self._num_output_channels)))
+      return utils.unflatten_prepared_graph_output(features, graph)
+
+    if self._decompose_edge_function:
+      convolution = _decomposed_convolution
+    else:
+      convolution = _convolution
+    if self._num_vertices_per_tile is not None:
+      return _tiled_graph_convolution(convolution, inputs[0], inputs[1], sizes,
+                                      self._num_vertices_per_tile)
+    return convolution(inputs[0], inputs[1], sizes)
+
+
+class GraphAttentionConvolutionKerasLayer(tf.keras.layers.Layer):
+  """Wraps the function `graph_attention_convolution` as a Keras layer."""
+
+  def __init__(self,
+               num_heads=8,
+               num_output_channels=None,
+               concatenate_heads=True,
+               negative_slope=0.2,
+               initializer=None,
+               num_vertices_per_tile=None,
+               name=None,
+               **kwargs):
+    """Initializes GraphAttentionConvolutionKerasLayer.
+
+    Args:
+      num_heads: An `int` specifying the number of attention heads.
+      num_output_channels: An optional `int` specifying the number of output
+        channels of each head. If `None` then it will be the same as the input
+        dimensionality.
+      concatenate_heads: A `bool`. If `True`, the outputs of the heads are
+        concatenated, otherwise they are averaged.
+      negative_slope: A `float`, the slope of the leaky ReLU applied to the
+        attention logits for negative inputs.
+      initializer: An initializer for the trainable variables. If `None`,
+        defaults to `tf.compat.v1.truncated_normal_initializer(stddev=0.1)`.
+      num_vertices_per_tile: An optional `int`. If not `None`, the convolution
+        is applied to tiles of `num_vertices_per_tile` vertices one after the
+        other, each tile with its halo of neighbors, and the outputs are
+        stitched. The result is the same, but the peak memory usage scales with
+        the tile size instead of the number of vertices and edges.
+      name: A name for this layer.
+      **kwargs: Additional keyword arguments passed to the base layer.
+    """
+    super(GraphAttentionConvolutionKerasLayer, self).__init__(
+        name=name, **kwargs)
+    self._num_heads = num_heads
+    self._num_output_channels = num_output_channels
+    self._concatenate_heads = concatenate_heads
+    self._negative_slope = negative_slope
+    self._num_vertices_per_tile = num_vertices_per_tile
+    if initializer is None:
+      self._initializer = tf.compat.v1.truncated_normal_initializer(stddev=0.1)
+    else:
+      self._initializer = initializer
+
+  def build(self, input_shape):
+    """Initializes the trainable weights."""
+    in_channels = tf.TensorShape(input_shape[0]).as_list()[-1]
+    if self._num_output_channels is None:
+      out_channels = in_channels
+    else:
+      out_channels = self._num_output_channels
+    if self._concatenate_heads:
+      bias_channels = self._num_heads * out_channels
+    else:
+      bias_channels = out_channels
+
+    self.var_w = self.add_weight(
+        shape=(self._num_heads, in_channels, out_channels),
+        dtype=self.dtype,
+        initializer=self._initializer,
+        name='w')
+    self.var_a = self.add_weight(
+        shape=(self._num_heads, 2 * out_channels),
+        dtype=self.dtype,
+        initializer=self._initializer,
+        name='a')
+    self.var_b = self.add_weight(
+        shape=(bias_channels,),
+        dtype=self.dtype,
+        initializer=self._initializer,
+        name='b')
+
+  def compute_output_shape(self, input_shape):
+    """Returns the shape of the output for the shapes of `[data, neighbors]`."""
+    data_shape = tf.TensorShape(input_shape[0])
+    if self._num_output_channels is None:
+      out_channels = tf.compat.v1.dimension_value(data_shape[-1])
+    else:
+      out_channels = self._num_output_channels
+    if self._concatenate_heads and out_channels is not None:
+      out_channels *= self._num_heads
+    return data_shape[:-1].concatenate(out_channels)
+
+  # pyformat: disable
+  def call(self, inputs, sizes=None):
+    """Executes the convolution.
+
+    The shorthands used below are
+      `V`: The number of vertices.
+      `C`: The number of channels in the input data.
+      `H`: The number of attention heads.
+      `D`: The number of output channels of each head.
+
+    Note:
+      In the following, A1 to An are optional batch dimensions.
+
+    Args:
+      inputs: A list of two tensors `[data, neighbors]`. `data` is a `float`
+        tensor with shape `[A1, ..., An, V, C]`. `neighbors` is a `SparseTensor`
+        with the same type as `data` and with shape `[A1, ..., An, V, V]`
+        representing vertex neighborhoods. Only the sparsity pattern of
+        `neighbors` is used. Each vertex should have at least one neighbor,
+        typically itself.
+      sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+        sizes in case of padding (`sizes=None` indicates no padding).
+        `sizes[A1, ..., An] <= V`. If `data` and `neighbors` are 2-D, `sizes`
+        will be ignored. See `FeatureSteeredConvolutionKerasLayer` for an
+        example usage of `sizes`.
+
+    Returns:
+      Tensor with shape `[A1, ..., An, V, H * D]` if the heads are
+      concatenated, and `[A1, ..., An, V, D]` otherwise.
+    """
+    # pyformat: enable
+    def _convolution(data, neighbors, sizes=None):
+      return gc.graph_attention_convolution(
+          data=data,
+          neighbors=neighbors,
+          sizes=sizes,
+          var_w=self.var_w,
+          var_a=self.var_a,
+          var_b=self.var_b,
+          concatenate_heads=self._concatenate_heads,
+          negative_slope=self._negative_slope)
+
+    if self._num_vertices_per_tile is not None:
+      return _tiled_graph_convolution(_convolution, inputs[0], inputs[1], sizes,
+                                      self._num_vertices_per_tile)
+    return _convolution(inputs[0], inputs[1], sizes)
+
+
+class GraphConvolutionSequential(tf.keras.layers.Layer):
+  """Applies a stack of graph convolution layers on the same graph.
+
+  The graph convolution layers flatten and validate their `neighbors` input on
+  every call. This container prepares the graph once with
+  `utils.prepare_graph_convolution_input`, and passes the resulting
+  `utils.PreparedGraph` to all the stacked layers, which share its flattened
+  vertex indices and edge index vectors.
+  """
+
+  def __init__(self,
+               layers,
+               activation=None,
+               recompute_gradients=False,
+               name=None,
+               **kwargs):
+    """Initializes GraphConvolutionSequential.
+
+    Args:
+      layers: A list of graph convolution layers, such as
+        `FeatureSteeredConvolutionKerasLayer` or
+        `DynamicGraphConvolutionKerasLayer`, whose `call` takes a list of two
+        tensors `[data, neighbors]` and optional `sizes`.
+      activation: An optional activation function applied to the output of
+        each layer.
+      recompute_gradients: A `bool`. If `True`, the outputs of each layer are
+        recomputed in the backward pass with `tf.recompute_grad` instead of
+        being stored, which includes the per-edge tensors gathered along the
+        edges of the graph. This trades computation for memory.
+      name: A name for this layer.
+      **kwargs: Additional keyword arguments passed to the base layer.
+    """
+    super(GraphConvolutionSequential, self).__init__(name=name, **kwargs)
+    self._conv_layers = list(layers)
+    self._activation = tf.keras.activations.get(activation)
+    self._recompute_gradients = recompute_gradients
+
+  def build(self, input_shape):
+    """Builds the stacked layers.
+
+    The layers are built here rather than lazily in `call`, such that their
+    weights are not created inside a function recomputed in the backward pass.
+    Each layer must implement `compute_output_shape`.
+    """
+    data_shape = tf.TensorShape(input_shape[0])
+    for layer in self._conv_layers:
+      if not layer.built:
+        with tf.name_scope(layer.name):
+          layer.build((data_shape, None))
+        layer.built = True
+      data_shape = layer.compute_output_shape((data_shape, None))
+    super(GraphConvolutionSequential, self).build(input_shape)
+
+  # pyformat: disable
+  def call(self, inputs, sizes=None):
+    """Executes the stacked convolutions.
+
+    The shorthands used below are
+      `V`: The number of vertices.
+      `C`: The number of channels in the input data.
+
+    Note:
+      In the following, A1 to An are optional batch dimensions.
+
+    Args:
+      inputs: A list of two tensors `[data, neighbors]`. `data` is a `float`
+        tensor with shape `[A1, ..., An, V, C]`. `neighbors` is a `SparseTensor`
+        with the same type as `data` and with shape `[A1, ..., An, V, V]`
+        representing vertex neighborhoods, see
+        `FeatureSteeredConvolutionKerasLayer`, or a `utils.PreparedGraph`.
+      sizes: An `int` tensor of shape `[A1, ..., An]` indicating the true input
+        sizes in case of padding (`sizes=None` indicates no padding), see
+        `FeatureSteeredConvolutionKerasLayer`. `sizes` is ignored if
+        `neighbors` is a `utils.PreparedGraph`.
+
+    Returns:
+      Tensor with shape `[A1, ..., An, V, D]`, where `D` is the number of
+      output channels of the last layer.
+    """
+    # pyformat: enable
+    data, neighbors = inputs
+    data = tf.convert_to_tensor(value=data)
+    if isinstance(neighbors, utils.PreparedGraph):
+      graph = neighbors
+    else:
+      graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+
+    for layer in self._conv_layers:
+      if self._recompute_gradients:
+
+        def _convolution(data, layer=layer):
+          return layer([data, graph])
+
+        data = tf.recompute_grad(_convolution)(data)
+      else:
+        data = layer([data, graph])
+      if self._activation is not None:
+        data = self._activation(data)
+    return data
 
 
 # API contains all public functions and classes.
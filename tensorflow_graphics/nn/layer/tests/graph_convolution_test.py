@@ -21,6 +21,7 @@ from absl.testing import parameterized
 import numpy as np
 import tensorflow as tf
 
+from tensorflow_graphics.geometry.convolution import utils
 import tensorflow_graphics.nn.layer.graph_convolution as gc_layer
 from tensorflow_graphics.util import test_case
 
@@ -45,6 +46,23 @@ def _dummy_data(batch_size, num_vertices, num_channels):
   return data, neighbors
 
 
+def _random_data(batch_size, num_vertices, num_channels, padding=True):
+  """Create random inputs for the graph convolution layers."""
+  if padding:
+    sizes = np.random.randint(low=1, high=num_vertices + 1, size=(batch_size,))
+  else:
+    sizes = np.full((batch_size,), num_vertices)
+  data = np.zeros(
+      shape=(batch_size, num_vertices, num_channels), dtype=np.float32)
+  neighbors = np.zeros(
+      shape=(batch_size, num_vertices, num_vertices), dtype=np.float32)
+  for k, size in enumerate(sizes):
+    data[k, :size] = np.random.uniform(size=(size, num_channels))
+    random = np.random.uniform(size=(size, size)) > 0.7
+    neighbors[k, :size, :size] = np.maximum(random, np.eye(size))
+  return data, _dense_to_sparse(neighbors), sizes
+
+
 class GraphConvolutionTestFeatureSteeredConvolutionLayerTests(
     test_case.TestCase):
 
@@ -191,6 +209,68 @@ class GraphConvolutionTestFeatureSteeredConvolutionLayerTests(
         for _ in range(num_training_iterations):
           sess.run(train_op)
 
+  @parameterized.parameters((True,), (False,))
+  def test_feature_steered_convolution_layer_var_v(self, translation_invariant):
+    """Check that `var_v` is exposed for both parameterizations."""
+    if not tf.executing_eagerly():
+      self.skipTest("The weights of the layer are only read in eager mode.")
+    data, neighbors, sizes = _random_data(1, 5, 3)
+    layer = gc_layer.FeatureSteeredConvolutionKerasLayer(
+        translation_invariant=translation_invariant, num_weight_matrices=4)
+
+    layer(inputs=[data, neighbors], sizes=sizes)
+
+    if translation_invariant:
+      self.assertAllEqual(layer.var_v, -layer.var_u)
+      self.assertLen(layer.trainable_weights, 4)
+    else:
+      self.assertIs(layer.var_v, layer.trainable_weights[1])
+      self.assertLen(layer.trainable_weights, 5)
+
+  @parameterized.parameters((1, 8, 1), (1, 8, 3), (3, 10, 4), (2, 6, 20))
+  def test_feature_steered_convolution_layer_tiled(self, batch_size,
+                                                   num_vertices,
+                                                   num_vertices_per_tile):
+    """Check that the tiled execution matches the monolithic one."""
+    if not tf.executing_eagerly():
+      return
+    data, neighbors, sizes = _random_data(batch_size, num_vertices, 3)
+    layer = gc_layer.FeatureSteeredConvolutionKerasLayer(
+        translation_invariant=False, num_weight_matrices=4,
+        num_output_channels=5)
+    tiled_layer = gc_layer.FeatureSteeredConvolutionKerasLayer(
+        translation_invariant=False, num_weight_matrices=4,
+        num_output_channels=5, num_vertices_per_tile=num_vertices_per_tile)
+
+    output = layer(inputs=[data, neighbors], sizes=sizes)
+    tiled_layer(inputs=[data, neighbors], sizes=sizes)
+    tiled_layer.set_weights(layer.get_weights())
+    tiled_output = tiled_layer(inputs=[data, neighbors], sizes=sizes)
+
+    self.assertAllClose(tiled_output, output)
+
+  @parameterized.parameters(("mixed_float16",), ("mixed_bfloat16",))
+  def test_feature_steered_convolution_layer_mixed_precision(self, policy):
+    """Check the dtypes and the outputs of a mixed precision layer."""
+    if not tf.executing_eagerly():
+      self.skipTest("Setting the weights of the layers requires eager mode.")
+    data, neighbors, sizes = _random_data(2, 8, 3)
+    layer = gc_layer.FeatureSteeredConvolutionKerasLayer(
+        num_weight_matrices=4, num_output_channels=5)
+    mixed_layer = gc_layer.FeatureSteeredConvolutionKerasLayer(
+        num_weight_matrices=4, num_output_channels=5, dtype=policy)
+
+    output = layer(inputs=[data, neighbors], sizes=sizes)
+    mixed_layer(inputs=[data, neighbors], sizes=sizes)
+    mixed_layer.set_weights(layer.get_weights())
+    mixed_output = mixed_layer(inputs=[data, neighbors], sizes=sizes)
+
+    self.assertEqual(mixed_output.dtype, mixed_layer.compute_dtype)
+    for weight in mixed_layer.weights:
+      self.assertEqual(weight.dtype, tf.float32)
+    self.assertAllClose(
+        tf.cast(mixed_output, tf.float32), output, rtol=5e-2, atol=5e-2)
+
 
 class GraphConvolutionTestDynamicGraphConvolutionKerasLayerTests(
     test_case.TestCase):
@@ -295,5 +375,232 @@ class GraphConvolutionTestDynamicGraphConvolutionKerasLayerTests(
         tf.compat.v1.train.GradientDescentOptimizer(1e-4).apply_gradients(
             zip(grads, trainable_variables))
 
+  @parameterized.parameters(
+      (0, 8, 3, "weighted"),
+      (1, 8, 1, "max"),
+      (3, 10, 4, "weighted"),
+      (2, 6, 20, "max"),
+  )
+  def test_dynamic_graph_convolution_keras_layer_tiled(
+      self, batch_size, num_vertices, num_vertices_per_tile, reduction):
+    """Check that the tiled execution matches the monolithic one."""
+    if not tf.executing_eagerly():
+      return
+    if batch_size > 0:
+      data, neighbors, sizes = _random_data(batch_size, num_vertices, 3)
+    else:
+      data, neighbors, _ = _random_data(1, num_vertices, 3, padding=False)
+      data = data[0]
+      neighbors = tf.sparse.reshape(neighbors, (num_vertices, num_vertices))
+      sizes = None
+    layer = gc_layer.DynamicGraphConvolutionKerasLayer(
+        num_output_channels=4, reduction=reduction, activation="relu")
+    tiled_layer = gc_layer.DynamicGraphConvolutionKerasLayer(
+        num_output_channels=4, reduction=reduction, activation="relu",
+        num_vertices_per_tile=num_vertices_per_tile)
+
+    output = layer(inputs=[data, neighbors], sizes=sizes)
+    tiled_layer(inputs=[data, neighbors], sizes=sizes)
+    tiled_layer.set_weights(layer.get_weights())
+    tiled_output = tiled_layer(inputs=[data, neighbors], sizes=sizes)
+
+    self.assertAllClose(tiled_output, output)
+
+  @parameterized.parameters(
+      (2, 8, None, "weighted", True, "relu"),
+      (3, 10, None, "max", False, None),
+      (2, 12, 5, "weighted", True, None),
+      (1, 9, 4, "max", True, "relu"),
+  )
+  def test_dynamic_graph_convolution_keras_layer_decomposed(
+      self, batch_size, num_vertices, num_vertices_per_tile, reduction,
+      use_bias, activation):
+    """Check that the decomposed edge function gives the same results."""
+    if not tf.executing_eagerly():
+      return
+    data, neighbors, sizes = _random_data(batch_size, num_vertices, 3)
+    data = tf.convert_to_tensor(value=data)
+    layer = gc_layer.DynamicGraphConvolutionKerasLayer(
+        num_output_channels=4, reduction=reduction, activation=activation,
+        use_bias=use_bias, bias_initializer="glorot_uniform")
+    decomposed_layer = gc_layer.DynamicGraphConvolutionKerasLayer(
+        num_output_channels=4, reduction=reduction, activation=activation,
+        use_bias=use_bias, num_vertices_per_tile=num_vertices_per_tile,
+        decompose_edge_function=True)
+    decomposed_layer(inputs=[data, neighbors], sizes=sizes)
+
+    def _output_and_gradients(layer):
+      with tf.GradientTape() as tape:
+        tape.watch(data)
+        output = layer(inputs=[data, neighbors], sizes=sizes)
+        loss = tf.reduce_sum(input_tensor=tf.sin(output))
+      return output, tape.gradient(loss, [data] + layer.trainable_variables)
+
+    output, gradients = _output_and_gradients(layer)
+    decomposed_layer.set_weights(layer.get_weights())
+    decomposed_output, decomposed_gradients = _output_and_gradients(
+        decomposed_layer)
+
+    self.assertAllClose(decomposed_output, output)
+    for decomposed_gradient, gradient in zip(decomposed_gradients, gradients):
+      self.assertAllClose(decomposed_gradient, gradient)
+
+  def test_dynamic_graph_convolution_keras_layer_decomposed_exception(self):
+    """Check that the activity regularizer is rejected."""
+    with self.assertRaisesRegexp(ValueError, "activity_regularizer"):
+      gc_layer.DynamicGraphConvolutionKerasLayer(
+          num_output_channels=4, reduction="max",
+          activity_regularizer="l2", decompose_edge_function=True)
+
+  @parameterized.parameters(("mixed_float16", "weighted"),
+                            ("mixed_bfloat16", "max"))
+  def test_dynamic_graph_convolution_keras_layer_mixed_precision(
+      self, policy, reduction):
+    """Check the dtypes and the outputs of a mixed precision layer."""
+    if not tf.executing_eagerly():
+      self.skipTest("Setting the weights of the layers requires eager mode.")
+    data, neighbors, sizes = _random_data(2, 8, 3)
+    layer = gc_layer.DynamicGraphConvolutionKerasLayer(
+        num_output_channels=4, reduction=reduction)
+    mixed_layer = gc_layer.DynamicGraphConvolutionKerasLayer(
+        num_output_channels=4, reduction=reduction, dtype=policy)
+
+    output = layer(inputs=[data, neighbors], sizes=sizes)
+    mixed_layer(inputs=[data, neighbors], sizes=sizes)
+    mixed_layer.set_weights(layer.get_weights())
+    mixed_output = mixed_layer(inputs=[data, neighbors], sizes=sizes)
+
+    self.assertEqual(mixed_output.dtype, mixed_layer.compute_dtype)
+    for weight in mixed_layer.weights:
+      self.assertEqual(weight.dtype, tf.float32)
+    self.assertAllClose(
+        tf.cast(mixed_output, tf.float32), output, rtol=5e-2, atol=5e-2)
+
+
+class GraphAttentionConvolutionKerasLayerTests(test_case.TestCase):
+
+  @parameterized.parameters(
+      (1, 5, 3, 2, None, True),
+      (3, 8, 4, 1, 6, False),
+      (2, 6, 2, 4, 3, True),
+  )
+  def test_graph_attention_convolution_keras_layer_output_shape(
+      self, batch_size, num_vertices, in_channels, num_heads,
+      num_output_channels, concatenate_heads):
+    """Check the output shape and the variables of the layer."""
+    data, neighbors, sizes = _random_data(batch_size, num_vertices,
+                                          in_channels)
+    layer = gc_layer.GraphAttentionConvolutionKerasLayer(
+        num_heads=num_heads,
+        num_output_channels=num_output_channels,
+        concatenate_heads=concatenate_heads)
+
+    output = layer(inputs=[data, neighbors], sizes=sizes)
+
+    out_channels = num_output_channels or in_channels
+    if concatenate_heads:
+      out_channels *= num_heads
+    self.assertAllEqual(output.shape,
+                        (batch_size, num_vertices, out_channels))
+    self.assertLen(layer.trainable_variables, 3)
+
+  def test_graph_attention_convolution_keras_layer_tiled(self):
+    """Check that the tiled execution matches the monolithic one."""
+    if not tf.executing_eagerly():
+      return
+    data, neighbors, sizes = _random_data(2, 12, 3)
+    layer = gc_layer.GraphAttentionConvolutionKerasLayer(
+        num_heads=2, num_output_channels=4)
+    tiled_layer = gc_layer.GraphAttentionConvolutionKerasLayer(
+        num_heads=2, num_output_channels=4, num_vertices_per_tile=5)
+
+    output = layer(inputs=[data, neighbors], sizes=sizes)
+    tiled_layer(inputs=[data, neighbors], sizes=sizes)
+    tiled_layer.set_weights(layer.get_weights())
+    tiled_output = tiled_layer(inputs=[data, neighbors], sizes=sizes)
+
+    self.assertAllClose(tiled_output, output)
+
+
+class GraphConvolutionSequentialTests(test_case.TestCase):
+
+  def _layers(self):
+    """Creates a stack of graph convolution layers."""
+    return [
+        gc_layer.FeatureSteeredConvolutionKerasLayer(
+            translation_invariant=False, num_output_channels=6),
+        gc_layer.DynamicGraphConvolutionKerasLayer(
+            num_output_channels=5, reduction="max"),
+        gc_layer.FeatureSteeredConvolutionKerasLayer(
+            translation_invariant=False, num_output_channels=2, fused=True),
+    ]
+
+  @parameterized.parameters((1, 6, False), (3, 10, False), (3, 10, True))
+  def test_graph_convolution_sequential_matches_stacked_layers(
+      self, batch_size, num_vertices, prepared):
+    """Check that the container matches applying its layers one by one."""
+    if not tf.executing_eagerly():
+      return
+    data, neighbors, sizes = _random_data(batch_size, num_vertices, 3)
+    layers = self._layers()
+    sequential = gc_layer.GraphConvolutionSequential(layers, activation="tanh")
+
+    if prepared:
+      graph = utils.prepare_graph_convolution_input(neighbors, sizes)
+      output = sequential(inputs=[data, graph])
+    else:
+      output = sequential(inputs=[data, neighbors], sizes=sizes)
+    true_output = data
+    for layer in layers:
+      true_output = tf.tanh(
+          layer(inputs=[true_output, neighbors], sizes=sizes))
+
+    self.assertAllClose(output, true_output)
+
+  @parameterized.parameters((False,), (True,))
+  def test_graph_convolution_sequential_tracks_weights(self,
+                                                       recompute_gradients):
+    """Check that the weights of the stacked layers are tracked and named."""
+    if not tf.executing_eagerly():
+      self.skipTest("The layers are built when called in eager mode.")
+    data, neighbors, sizes = _random_data(2, 6, 3)
+    layers = self._layers()
+    sequential = gc_layer.GraphConvolutionSequential(
+        layers, recompute_gradients=recompute_gradients, name="sequential")
+
+    sequential(inputs=[data, neighbors], sizes=sizes)
+
+    self.assertTrue(all(layer.built for layer in layers))
+    self.assertLen(sequential.trainable_weights,
+                   sum(len(layer.trainable_weights) for layer in layers))
+    for layer in layers:
+      for weight in layer.weights:
+        self.assertStartsWith(weight.name, "sequential/" + layer.name + "/")
+
+  def test_graph_convolution_sequential_recompute_gradients(self):
+    """Check that recomputing the layers gives the same gradients."""
+    if not tf.executing_eagerly():
+      return
+    data, neighbors, sizes = _random_data(3, 10, 3)
+    sequential = gc_layer.GraphConvolutionSequential(
+        self._layers(), activation="tanh")
+    recomputed = gc_layer.GraphConvolutionSequential(
+        self._layers(), activation="tanh", recompute_gradients=True)
+    sequential(inputs=[data, neighbors], sizes=sizes)
+    recomputed(inputs=[data, neighbors], sizes=sizes)
+    recomputed.set_weights(sequential.get_weights())
+
+    gradients = []
+    for layer in (sequential, recomputed):
+      with tf.GradientTape() as tape:
+        output = layer(inputs=[data, neighbors], sizes=sizes)
+        loss = tf.reduce_sum(input_tensor=output**2)
+      gradients.append(tape.gradient(loss, layer.trainable_variables))
+
+    self.assertLen(gradients[1], len(gradients[0]))
+    for gradient, recomputed_gradient in zip(*gradients):
+      self.assertAllClose(recomputed_gradient, gradient)
+
+
 if __name__ == "__main__":
   test_case.main()
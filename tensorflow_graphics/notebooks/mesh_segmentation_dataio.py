@@ -27,7 +27,6 @@ from __future__ import print_function
 import numpy as np
 import tensorflow as tf
 
-from tensorflow_graphics.geometry.convolution import utils as conv_utils
 from tensorflow_graphics.geometry.representation.mesh import utils as mesh_utils
 from tensorflow_graphics.util import shape
 
@@ -39,18 +38,33 @@ DEFAULT_IO_PARAMS = {
     'mean_center': True,
     'shuffle': None,
     'repeat': None,
+    'bucket_boundaries': None,
+    'bucket_batch_sizes': None,
+    'bucket_key': 'num_vertices',
+    'preprocessed': False,
+    'num_rings': 0,
 }
 
 
-def adjacency_from_edges(edges, weights, num_edges, num_vertices):
+def adjacency_from_edges(edges,
+                         weights,
+                         num_edges,
+                         num_vertices,
+                         reorder=False):
   """Returns a batched sparse 1-ring adj tensor from edge list tensor.
 
+  The entries of the output are in the order of the valid edges of each batch
+  sample, which is the canonical row-major order when the edges of each mesh
+  are sorted, as returned by get_weighted_edges() or get_weighted_edges_tf().
+  Other edge lists must be reordered with reorder=True.
+
   Args:
     edges: [B, E, 2] `int32` tensor of edges, possibly 0 padded.
     weights: [B, E] `float32` tensor of edge weights, possibly 0 padded.
     num_edges: [B] `int32` tensor of number of valid edges per batch sample.
     num_vertices: [B] `int32` tensor of number of valid vertices per batch
       sample.
+    reorder: If true, sorts the entries of the output with tf.sparse.reorder.
 
   Returns:
     adj: A batched SparseTensor of weighted adjacency graph, of
@@ -84,22 +98,22 @@ def adjacency_from_edges(edges, weights, num_edges, num_vertices):
       tensor_names=('edges', 'weights'),
       axes=(-2, -1))
 
-  batch_size = tf.shape(input=edges)[0]
-  max_num_vertices = tf.reduce_max(input_tensor=num_vertices)
+  batch_size = tf.shape(input=edges, out_type=tf.int64)[0]
+  max_num_vertices = tf.cast(
+      tf.reduce_max(input_tensor=num_vertices), tf.int64)
   max_num_edges = tf.shape(input=edges)[1]
-  batch_col = tf.reshape(tf.range(batch_size, dtype=edges.dtype), [-1, 1, 1])
-  batch_col = tf.tile(batch_col, [1, max_num_edges, 1])
-  batch_edges = tf.concat([batch_col, edges], axis=-1)
-
-  indices, _ = conv_utils.flatten_batch_to_2d(batch_edges, sizes=num_edges)
-  values, _ = conv_utils.flatten_batch_to_2d(
-      tf.expand_dims(weights, -1), sizes=num_edges)
-  values = tf.squeeze(values)
+  # The [b, e] indices of the valid edges are in row-major order, so that the
+  # adjacency entries are sorted by batch sample, then in the edge list order.
+  valid_edges = tf.where(tf.sequence_mask(num_edges, max_num_edges))
+  indices = tf.concat(
+      (valid_edges[:, :1], tf.cast(tf.gather_nd(edges, valid_edges), tf.int64)),
+      axis=-1)
   adjacency = tf.SparseTensor(
-      indices=tf.cast(indices, tf.int64),
-      values=values,
-      dense_shape=[batch_size, max_num_vertices, max_num_vertices])
-  adjacency = tf.sparse.reorder(adjacency)
+      indices=indices,
+      values=tf.gather_nd(weights, valid_edges),
+      dense_shape=tf.stack((batch_size, max_num_vertices, max_num_vertices)))
+  if reorder:
+    adjacency = tf.sparse.reorder(adjacency)
   return adjacency
 
 
@@ -126,14 +140,213 @@ def get_weighted_edges(faces, self_edges=True):
     \sum_{j} w_{ij} = 1
     $$
   """
-  edges = mesh_utils.extract_unique_edges_from_triangular_mesh(
-      faces, directed_edges=True).astype(np.int32)
-  if self_edges:
-    vertices = np.expand_dims(np.unique(edges[:, 0]), axis=1)
-    self_edges = np.concatenate((vertices, vertices), axis=1)
-    edges = np.unique(np.concatenate((edges, self_edges), axis=0), axis=0)
-  weights = mesh_utils.get_degree_based_edge_weights(edges, dtype=np.float32)
-  return edges, weights
+  edges, weights = mesh_utils.extract_weighted_edges_from_triangular_mesh(
+      faces, self_edges=self_edges, dtype=np.float32)
+  return edges.astype(np.int32), weights
+
+
+def get_weighted_edges_tf(faces, self_edges=True, name=None):
+  r"""Gets unique edges and degree weights from a triangular mesh tensor.
+
+  This is the graph-native equivalent of `get_weighted_edges`. It returns the
+  same edges, in the same order, and weights, but runs inside the TensorFlow
+  graph such that it can be parallelized by `tf.data` without holding the
+  Python global interpreter lock.
+
+  The shorthands used below are:
+      `T`: The number of triangles in the mesh.
+      `E`: The number of unique directed edges in the mesh.
+
+  Args:
+    faces: A [T, 3] `int32` tensor of triangle vertex indices.
+    self_edges: A `bool` flag. If true, then for every vertex 'i' an edge
+      [i, i] is added to edge list.
+    name: A name for this op. Defaults to 'get_weighted_edges_tf'.
+
+  Returns:
+    edges: A [E, 2] `int32` tensor of directed edges, sorted by source and
+      target vertex.
+    weights: A [E] `float32` tensor denoting edge weights, see
+      `get_weighted_edges`.
+  """
+  with tf.compat.v1.name_scope(name, 'get_weighted_edges_tf', [faces]):
+    faces = tf.convert_to_tensor(value=faces)
+
+    if not faces.dtype.is_integer:
+      raise TypeError("'faces' must have an integer type.")
+    shape.check_static(
+        tensor=faces,
+        tensor_name='faces',
+        has_rank=2,
+        has_dim_equals=(-1, 3))
+
+    faces = tf.cast(faces, tf.int64)
+    sources = tf.reshape(faces, [-1])
+    targets = tf.reshape(tf.roll(faces, shift=-1, axis=-1), [-1])
+    sources, targets = (tf.concat((sources, targets), axis=0),
+                        tf.concat((targets, sources), axis=0))
+    if self_edges:
+      sources = tf.concat((sources, tf.reshape(faces, [-1])), axis=0)
+      targets = tf.concat((targets, tf.reshape(faces, [-1])), axis=0)
+    num_vertices = tf.reduce_max(
+        input_tensor=tf.concat((sources, [0]), axis=0)) + 1
+
+    # Each directed edge is encoded by a single int64 key, such that sorting
+    # the unique keys sorts the edges by source and then by target vertex.
+    keys, _ = tf.unique(sources * num_vertices + targets)
+    keys = tf.sort(keys)
+    edge_sources = keys // num_vertices
+    edge_targets = keys % num_vertices
+    degree = tf.math.segment_sum(
+        data=tf.ones_like(edge_sources, dtype=tf.float32),
+        segment_ids=edge_sources)
+    weights = 1.0 / tf.gather(degree, edge_sources)
+    edges = tf.stack((edge_sources, edge_targets), axis=-1)
+    return tf.cast(edges, tf.int32), weights
+
+
+def get_k_ring_edges(edges, num_rings):
+  """Gets the directed edges connecting vertices at most k edges apart.
+
+  Args:
+    edges: A [E, 2] `int` numpy.ndarray of unique directed edges including
+      self-edges, sorted by source and target vertex, as returned by
+      `get_weighted_edges`.
+    num_rings: A positive `int`, the number of rings k.
+
+  Returns:
+    edges: A [E', 2] numpy.ndarray of unique directed edges, with the same type
+      as `edges`, sorted by source and target vertex.
+    weights: A [E'] `float32` numpy.ndarray denoting vertex degree based edge
+      weights, see `get_weighted_edges`.
+  """
+  if num_rings < 1:
+    raise ValueError("'num_rings' must be positive.")
+  num_vertices = np.max(edges) + 1 if edges.size else 1
+  row_splits = np.searchsorted(edges[:, 0], np.arange(num_vertices + 1))
+  rings = edges.astype(np.int64)
+  for _ in range(num_rings - 1):
+    # Appends the 1-ring of the target of each edge to its source.
+    starts = row_splits[rings[:, 1]]
+    counts = row_splits[rings[:, 1] + 1] - starts
+    offsets = np.arange(np.sum(counts)) - np.repeat(
+        np.cumsum(counts) - counts, counts)
+    sources = np.repeat(rings[:, 0], counts)
+    targets = edges[np.repeat(starts, counts) + offsets, 1]
+    keys = np.unique(sources * num_vertices + targets.astype(np.int64))
+    rings = np.stack(np.divmod(keys, num_vertices), axis=-1)
+  degree = np.bincount(rings[:, 0])
+  weights = 1.0 / degree[rings[:, 0]].astype(np.float32)
+  return rings.astype(edges.dtype), weights
+
+
+def _bytes_feature(array, dtype):
+  """Packs a numpy.ndarray as a little-endian raw bytes feature."""
+  array = np.asarray(array).astype(np.dtype(dtype).newbyteorder('<'))
+  return tf.train.Feature(
+      bytes_list=tf.train.BytesList(value=[array.tobytes()]))
+
+
+def _int64_feature(value):
+  """Returns an int64 feature storing a single value."""
+  return tf.train.Feature(int64_list=tf.train.Int64List(value=[int(value)]))
+
+
+def serialize_preprocessed_mesh(vertices, triangles, labels, num_rings=0):
+  """Serializes a mesh with precomputed edges to a preprocessed tf.Example.
+
+  Besides the mesh data stored by the raw format, a preprocessed example stores
+  the unique directed edges of the mesh and their weights, as returned by
+  `get_weighted_edges`, and optionally its k-ring edges, as returned by
+  `get_k_ring_edges`, such that they do not need to be recomputed on every
+  epoch. All the tensors are stored as packed little-endian bytes.
+
+  Args:
+    vertices: A [V, 3] `float` numpy.ndarray of vertex positions.
+    triangles: A [T, 3] `int` numpy.ndarray of triangle vertex indices.
+    labels: A [V] `int` numpy.ndarray of per vertex class labels.
+    num_rings: A non-negative `int`, the number of rings of the stored k-ring
+      edges. If 0, no k-ring edges are stored.
+
+  Returns:
+    A serialized tf.Example proto.
+  """
+  if num_rings < 0:
+    raise ValueError("'num_rings' must be non-negative.")
+  vertices = np.asarray(vertices)
+  triangles = np.asarray(triangles)
+  edges, weights = get_weighted_edges(triangles)
+  features = {
+      'num_vertices': _int64_feature(vertices.shape[0]),
+      'num_triangles': _int64_feature(triangles.shape[0]),
+      'num_edges': _int64_feature(edges.shape[0]),
+      'num_rings': _int64_feature(num_rings),
+      'vertices': _bytes_feature(vertices, np.float32),
+      'triangles': _bytes_feature(triangles, np.int32),
+      'labels': _bytes_feature(labels, np.int32),
+      'edges': _bytes_feature(edges, np.int32),
+      'edge_weights': _bytes_feature(weights, np.float32),
+  }
+  if num_rings > 0:
+    kring_edges, kring_weights = get_k_ring_edges(edges, num_rings)
+    features['num_kring_edges'] = _int64_feature(kring_edges.shape[0])
+    features['kring_edges'] = _bytes_feature(kring_edges, np.int32)
+    features['kring_edge_weights'] = _bytes_feature(kring_weights, np.float32)
+  example = tf.train.Example(features=tf.train.Features(feature=features))
+  return example.SerializeToString()
+
+
+def write_preprocessed_tfrecords(meshes, filename, num_rings=0):
+  """Writes meshes to a TFRecords file in the preprocessed format.
+
+  Args:
+    meshes: An iterable of mesh data dictionaries with 'vertices', 'triangles'
+      and 'labels' numpy.ndarrays, see `serialize_preprocessed_mesh`.
+    filename: The name of the output TFRecords file.
+    num_rings: A non-negative `int`, the number of rings of the stored k-ring
+      edges. If 0, no k-ring edges are stored.
+  """
+  with tf.io.TFRecordWriter(filename) as writer:
+    for mesh in meshes:
+      writer.write(
+          serialize_preprocessed_mesh(mesh['vertices'], mesh['triangles'],
+                                      mesh['labels'], num_rings))
+
+
+def read_raw_tfrecords(tfrecords):
+  """Reads meshes stored in the raw format as numpy.ndarrays.
+
+  Args:
+    tfrecords: A list of TFRecords filenames, see `_parse_tfex_proto`.
+
+  Yields:
+    A mesh data dictionary with 'vertices', 'triangles' and 'labels'
+    numpy.ndarrays, which can be passed to `write_preprocessed_tfrecords`.
+  """
+  if not isinstance(tfrecords, list):
+    tfrecords = [tfrecords]
+  filenames = [
+      filename for pattern in tfrecords
+      for filename in sorted(tf.io.gfile.glob(pattern))
+  ]
+  dataset = tf.data.TFRecordDataset(filenames).map(_parse_tfex_proto)
+  dataset = dataset.map(
+      lambda mesh_data: dict(  # pylint: disable=g-long-lambda
+          vertices=tf.io.parse_tensor(mesh_data['vertices'], tf.float32),
+          triangles=tf.reshape(
+              tf.io.parse_tensor(mesh_data['triangles'], tf.int32), [-1, 3]),
+          labels=tf.io.parse_tensor(mesh_data['labels'], tf.int32)))
+  if tf.executing_eagerly():
+    for mesh_data in dataset:
+      yield {key: value.numpy() for key, value in mesh_data.items()}
+    return
+  next_mesh_data = tf.compat.v1.data.make_one_shot_iterator(dataset).get_next()
+  with tf.compat.v1.Session() as sess:
+    while True:
+      try:
+        yield sess.run(next_mesh_data)
+      except tf.errors.OutOfRangeError:
+        return
 
 
 def _tfrecords_to_dataset(tfrecords,
@@ -219,15 +432,13 @@ def _parse_mesh_data(mesh_data, mean_center=True):
   """
   labels = tf.io.parse_tensor(mesh_data['labels'], tf.int32)
   vertices = tf.io.parse_tensor(mesh_data['vertices'], tf.float32)
-  triangles = tf.io.parse_tensor(mesh_data['triangles'], tf.int32)
+  triangles = tf.reshape(
+      tf.io.parse_tensor(mesh_data['triangles'], tf.int32), [-1, 3])
   if mean_center:
     vertices = vertices - tf.reduce_mean(
         input_tensor=vertices, axis=0, keepdims=True)
 
-  edges, weights = tf.py_function(
-      func=lambda t: get_weighted_edges(t.numpy()),
-      inp=[triangles],
-      Tout=[tf.int32, tf.float32])
+  edges, weights = get_weighted_edges_tf(triangles)
 
   num_edges = tf.shape(input=edges)[0]
   num_vertices = tf.cast(mesh_data['num_vertices'], tf.int32)
@@ -244,6 +455,86 @@ def _parse_mesh_data(mesh_data, mean_center=True):
   return mesh_data
 
 
+def _parse_preprocessed_tfex_proto(example_proto, num_rings=0):
+  """Parses the preprocessed tfexample proto to a raw mesh_data dictionary.
+
+  Args:
+    example_proto: A tf.Example proto storing the packed mesh data, see
+      `serialize_preprocessed_mesh`.
+    num_rings: The number of rings of the stored k-ring edges.
+
+  Returns:
+    A mesh data dictionary with the packed data of the fields of
+    `serialize_preprocessed_mesh`. The edges, and the k-ring edges if num_rings
+    is positive, have no default value, such that parsing a record without them
+    fails instead of producing empty edges.
+  """
+  feature_description = {
+      'num_vertices': tf.io.FixedLenFeature([], tf.int64, default_value=0),
+      'num_triangles': tf.io.FixedLenFeature([], tf.int64, default_value=0),
+      'num_edges': tf.io.FixedLenFeature([], tf.int64, default_value=0),
+      'vertices': tf.io.FixedLenFeature([], tf.string, default_value=''),
+      'triangles': tf.io.FixedLenFeature([], tf.string, default_value=''),
+      'labels': tf.io.FixedLenFeature([], tf.string, default_value=''),
+      'edges': tf.io.FixedLenFeature([], tf.string),
+      'edge_weights': tf.io.FixedLenFeature([], tf.string),
+  }
+  if num_rings > 0:
+    feature_description.update({
+        'num_kring_edges': tf.io.FixedLenFeature([], tf.int64),
+        'kring_edges': tf.io.FixedLenFeature([], tf.string),
+        'kring_edge_weights': tf.io.FixedLenFeature([], tf.string),
+    })
+  return tf.io.parse_single_example(
+      serialized=example_proto, features=feature_description)
+
+
+def _parse_preprocessed_mesh_data(mesh_data, mean_center=True, num_rings=0):
+  """Parses a packed mesh_data dictionary read from preprocessed tf examples.
+
+  Args:
+    mesh_data: A mesh data dictionary with packed data tensors, as output from
+      _parse_preprocessed_tfex_proto()
+    mean_center: If true, centers the mesh vertices to mean(vertices).
+    num_rings: The number of rings of the stored k-ring edges.
+  Returns:
+     A mesh data dictionary with the fields of _parse_mesh_data(), and, if
+     num_rings is positive, the following fields:
+      'num_kring_edges': The `int32` number of unique directed k-ring edges.
+      'kring_edges': A [E', 2] `int32` tensor of unique directed k-ring edges.
+      'kring_edge_weights': A [E'] `float32` tensor of vertex degree based
+        k-ring edge weights.
+  """
+  labels = tf.io.decode_raw(mesh_data['labels'], tf.int32)
+  vertices = tf.reshape(
+      tf.io.decode_raw(mesh_data['vertices'], tf.float32), [-1, 3])
+  triangles = tf.reshape(
+      tf.io.decode_raw(mesh_data['triangles'], tf.int32), [-1, 3])
+  edges = tf.reshape(tf.io.decode_raw(mesh_data['edges'], tf.int32), [-1, 2])
+  weights = tf.io.decode_raw(mesh_data['edge_weights'], tf.float32)
+  if mean_center:
+    vertices = vertices - tf.reduce_mean(
+        input_tensor=vertices, axis=0, keepdims=True)
+
+  parsed_mesh_data = dict(
+      vertices=vertices,
+      labels=labels,
+      triangles=triangles,
+      edges=edges,
+      edge_weights=weights,
+      num_triangles=tf.cast(mesh_data['num_triangles'], tf.int32),
+      num_vertices=tf.cast(mesh_data['num_vertices'], tf.int32),
+      num_edges=tf.cast(mesh_data['num_edges'], tf.int32))
+  if num_rings > 0:
+    parsed_mesh_data['kring_edges'] = tf.reshape(
+        tf.io.decode_raw(mesh_data['kring_edges'], tf.int32), [-1, 2])
+    parsed_mesh_data['kring_edge_weights'] = tf.io.decode_raw(
+        mesh_data['kring_edge_weights'], tf.float32)
+    parsed_mesh_data['num_kring_edges'] = tf.cast(
+        mesh_data['num_kring_edges'], tf.int32)
+  return parsed_mesh_data
+
+
 def create_dataset_from_tfrecords(tfrecords, params):
   """Creates a mesh dataset given a list of tf records filenames.
 
@@ -269,6 +560,23 @@ def create_dataset_from_tfrecords(tfrecords, params):
         in the batch.
       'num_triangles': A [B] `int32` tensor of number of triangles in each mesh
         in the batch.
+      For preprocessed TFRecords with k-ring edges, see
+      write_preprocessed_tfrecords(), the 'kring_edges', 'kring_edge_weights'
+      and 'num_kring_edges' fields are batched the same way.
+
+    All the TFRecords must have the same format. If params['preprocessed'] is
+    true, they are read as preprocessed records, see
+    write_preprocessed_tfrecords(), and params['num_rings'] must be the number
+    of rings of their stored k-ring edges, or 0 to ignore them. Otherwise, they
+    are read as raw records and the edges are computed on the fly.
+
+    If params['bucket_boundaries'] is a list of sizes, meshes are grouped in
+    buckets by their params['bucket_key'], either 'num_vertices' or
+    'num_edges', and every batch only contains meshes of one bucket. This
+    reduces the padding when the mesh sizes vary a lot, see
+    padding_efficiency(). params['bucket_batch_sizes'] optionally sets the
+    batch size of each of the len(bucket_boundaries) + 1 buckets, which
+    otherwise defaults to params['batch_size'].
   """
 
   def _set_default_if_none(param, param_dict, default_val):
@@ -286,27 +594,93 @@ def create_dataset_from_tfrecords(tfrecords, params):
     tfrecords = [tfrecords]
   dataset = _tfrecords_to_dataset(tfrecords, params['parallel_threads'],
                                   shuffle, repeat, sloppy)
-  dataset = dataset.map(_parse_tfex_proto, tf.data.experimental.AUTOTUNE)
-  dataset = dataset.map(
-      lambda x: _parse_mesh_data(x, mean_center=params['mean_center']),
-      tf.data.experimental.AUTOTUNE)
+  preprocessed = _set_default_if_none('preprocessed', params, False)
+  num_rings = _set_default_if_none('num_rings', params, 0) if preprocessed else 0
+  if num_rings < 0:
+    raise ValueError("'num_rings' must be non-negative.")
+  if not preprocessed:
+    dataset = dataset.map(_parse_tfex_proto, tf.data.experimental.AUTOTUNE)
+    dataset = dataset.map(
+        lambda x: _parse_mesh_data(x, mean_center=params['mean_center']),
+        tf.data.experimental.AUTOTUNE)
+  else:
+    # Preprocessed records store the edges, so only the packed data is decoded.
+    dataset = dataset.map(
+        lambda x: _parse_preprocessed_mesh_data(  # pylint: disable=g-long-lambda
+            _parse_preprocessed_tfex_proto(x, num_rings),
+            mean_center=params['mean_center'],
+            num_rings=num_rings),
+        tf.data.experimental.AUTOTUNE)
   if repeat:
     dataset = dataset.repeat()
   if shuffle:
     dataset = dataset.shuffle(params['shuffle_buffer_size'])
-  return dataset.padded_batch(
-      params['batch_size'],
-      padded_shapes={
-          'vertices': [None, 3],
-          'labels': [None],
-          'triangles': [None, 3],
-          'edges': [None, 2],
-          'edge_weights': [None],
-          'num_edges': [],
-          'num_vertices': [],
-          'num_triangles': [],
-      },
-      drop_remainder=is_training)
+  padded_shapes = {
+      'vertices': [None, 3],
+      'labels': [None],
+      'triangles': [None, 3],
+      'edges': [None, 2],
+      'edge_weights': [None],
+      'num_edges': [],
+      'num_vertices': [],
+      'num_triangles': [],
+  }
+  if num_rings:
+    padded_shapes.update({
+        'kring_edges': [None, 2],
+        'kring_edge_weights': [None],
+        'num_kring_edges': [],
+    })
+  bucket_boundaries = _set_default_if_none('bucket_boundaries', params, None)
+  if bucket_boundaries is None:
+    return dataset.padded_batch(
+        params['batch_size'],
+        padded_shapes=padded_shapes,
+        drop_remainder=is_training)
+
+  bucket_key = _set_default_if_none('bucket_key', params, 'num_vertices')
+  if bucket_key not in ('num_vertices', 'num_edges'):
+    raise ValueError("'bucket_key' must be 'num_vertices' or 'num_edges'.")
+  bucket_batch_sizes = _set_default_if_none(
+      'bucket_batch_sizes', params,
+      [params['batch_size']] * (len(bucket_boundaries) + 1))
+  if len(bucket_batch_sizes) != len(bucket_boundaries) + 1:
+    raise ValueError(
+        "'bucket_batch_sizes' must have len('bucket_boundaries') + 1 elements.")
+  return dataset.apply(
+      tf.data.experimental.bucket_by_sequence_length(
+          element_length_func=lambda mesh_data: mesh_data[bucket_key],
+          bucket_boundaries=list(bucket_boundaries),
+          bucket_batch_sizes=list(bucket_batch_sizes),
+          padded_shapes=padded_shapes,
+          drop_remainder=is_training))
+
+
+def padding_efficiency(mesh_data):
+  """Computes the fraction of valid entries in a batch of padded meshes.
+
+  Args:
+    mesh_data: A dictionary of batched mesh data, as output from
+      create_dataset_from_tfrecords().
+
+  Returns:
+    A dictionary with the `float32` fraction of the padded 'vertices', 'edges'
+    and 'triangles' of the batch that belong to a mesh, and 'kring_edges' if
+    present in mesh_data. One minus these values is the fraction of the
+    computations of the downstream ops spent on padding.
+  """
+  efficiency = {}
+  for key, size_key in (('vertices', 'num_vertices'), ('edges', 'num_edges'),
+                        ('triangles', 'num_triangles'),
+                        ('kring_edges', 'num_kring_edges')):
+    if key not in mesh_data:
+      continue
+    padded_shape = tf.shape(input=mesh_data[key])
+    num_padded = tf.cast(padded_shape[0] * padded_shape[1], tf.float32)
+    num_valid = tf.cast(
+        tf.reduce_sum(input_tensor=mesh_data[size_key]), tf.float32)
+    efficiency[key] = num_valid / tf.maximum(num_padded, 1.0)
+  return efficiency
 
 
 def create_input_from_dataset(dataset_fn, files, io_params):
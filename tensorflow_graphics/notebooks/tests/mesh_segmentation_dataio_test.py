@@ -0,0 +1,202 @@
+#Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for mesh_segmentation_dataio."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_graphics.notebooks import mesh_segmentation_dataio as dataio
+from tensorflow_graphics.util import test_case
+
+
+def _random_batch(batch_size, max_num_vertices, num_faces):
+  """Creates the padded edges of a batch of random meshes."""
+  edges = []
+  weights = []
+  num_vertices = np.random.randint(3, max_num_vertices + 1, size=batch_size)
+  for sample_num_vertices in num_vertices:
+    faces = np.random.randint(sample_num_vertices, size=(num_faces, 3))
+    sample_edges, sample_weights = dataio.get_weighted_edges(faces)
+    edges.append(sample_edges)
+    weights.append(sample_weights)
+  num_edges = np.array([sample_edges.shape[0] for sample_edges in edges])
+  max_num_edges = np.max(num_edges)
+  edges = np.stack([
+      np.pad(sample_edges, ((0, max_num_edges - sample_edges.shape[0]),
+                            (0, 0)), mode="constant")
+      for sample_edges in edges
+  ])
+  weights = np.stack([
+      np.pad(sample_weights, (0, max_num_edges - sample_weights.shape[0]),
+             mode="constant") for sample_weights in weights
+  ])
+  return (edges.astype(np.int32), weights, num_edges.astype(np.int32),
+          num_vertices.astype(np.int32))
+
+
+def _mesh(num_vertices=6, num_faces=8, seed=0):
+  """Creates the data of a random mesh."""
+  state = np.random.RandomState(seed)
+  return {
+      "vertices": state.uniform(size=(num_vertices, 3)).astype(np.float32),
+      "triangles": state.randint(num_vertices, size=(num_faces, 3)).astype(
+          np.int32),
+      "labels": state.randint(4, size=(num_vertices,)).astype(np.int32),
+  }
+
+
+class MeshSegmentationDataioTest(test_case.TestCase):
+
+  @parameterized.parameters((1, 10, 4), (4, 30, 20), (8, 100, 1))
+  def test_adjacency_from_edges_preset(self, batch_size, max_num_vertices,
+                                       num_faces):
+    """Tests that the adjacency entries are canonically ordered."""
+    edges, weights, num_edges, num_vertices = _random_batch(
+        batch_size, max_num_vertices, num_faces)
+    true_adjacency = np.zeros(
+        (batch_size, np.max(num_vertices), np.max(num_vertices)))
+    for batch in range(batch_size):
+      sample_edges = edges[batch, :num_edges[batch]]
+      true_adjacency[batch, sample_edges[:, 0],
+                     sample_edges[:, 1]] = weights[batch, :num_edges[batch]]
+
+    adjacency = dataio.adjacency_from_edges(edges, weights, num_edges,
+                                            num_vertices)
+    reordered = tf.sparse.reorder(adjacency)
+
+    self.assertAllEqual(adjacency.indices, reordered.indices)
+    self.assertAllClose(tf.sparse.to_dense(adjacency), true_adjacency)
+
+  def test_adjacency_from_edges_reorder(self):
+    """Tests that unsorted edges are sorted with reorder=True."""
+    edges = np.array((((1, 0), (0, 1), (0, 0)),), dtype=np.int32)
+    weights = np.array(((1., 2., 3.),), dtype=np.float32)
+
+    adjacency = dataio.adjacency_from_edges(
+        edges, weights, (3,), (2,), reorder=True)
+
+    self.assertAllEqual(adjacency.indices, ((0, 0, 0), (0, 0, 1), (0, 1, 0)))
+    self.assertAllEqual(adjacency.values, (3., 2., 1.))
+
+  def _write_raw_tfrecords(self, meshes, filename):
+    """Writes meshes to a TFRecords file in the raw format."""
+    with tf.io.TFRecordWriter(filename) as writer:
+      for mesh in meshes:
+        feature = {
+            "num_vertices":
+                tf.train.Feature(
+                    int64_list=tf.train.Int64List(
+                        value=[mesh["vertices"].shape[0]])),
+            "num_triangles":
+                tf.train.Feature(
+                    int64_list=tf.train.Int64List(
+                        value=[mesh["triangles"].shape[0]])),
+        }
+        for key in ("vertices", "triangles", "labels"):
+          feature[key] = tf.train.Feature(
+              bytes_list=tf.train.BytesList(
+                  value=[self.evaluate(tf.io.serialize_tensor(mesh[key]))]))
+        example = tf.train.Example(
+            features=tf.train.Features(feature=feature))
+        writer.write(example.SerializeToString())
+
+  def _first_batch(self, filename, **params):
+    """Returns the first batch of a dataset created from a TFRecords file."""
+    params.update(batch_size=1, is_training=False, parallel_threads=1,
+                  mean_center=False)
+    dataset = dataio.create_dataset_from_tfrecords([filename], params)
+    return self.evaluate(
+        tf.compat.v1.data.make_one_shot_iterator(dataset).get_next())
+
+  def test_read_raw_tfrecords(self):
+    """Tests that raw records are read back as the written meshes."""
+    meshes = [_mesh(seed=0), _mesh(num_vertices=9, seed=1)]
+    filename = os.path.join(self.get_temp_dir(), "raw_meshes.tfrecords")
+    self._write_raw_tfrecords(meshes, filename)
+
+    read_meshes = list(dataio.read_raw_tfrecords(filename))
+
+    self.assertEqual(len(read_meshes), len(meshes))
+    for read_mesh, mesh in zip(read_meshes, meshes):
+      for key in ("vertices", "triangles", "labels"):
+        self.assertAllEqual(read_mesh[key], mesh[key])
+
+  def test_create_dataset_from_preprocessed_tfrecords(self):
+    """Tests that preprocessed records yield the edges of the raw records."""
+    mesh = _mesh()
+    raw_filename = os.path.join(self.get_temp_dir(), "raw.tfrecords")
+    preprocessed_filename = os.path.join(self.get_temp_dir(),
+                                         "preprocessed.tfrecords")
+    self._write_raw_tfrecords([mesh], raw_filename)
+    dataio.write_preprocessed_tfrecords(
+        dataio.read_raw_tfrecords(raw_filename),
+        preprocessed_filename,
+        num_rings=2)
+    kring_edges, kring_weights = dataio.get_k_ring_edges(
+        dataio.get_weighted_edges(mesh["triangles"])[0], 2)
+
+    raw = self._first_batch(raw_filename)
+    preprocessed = self._first_batch(
+        preprocessed_filename, preprocessed=True, num_rings=2)
+
+    for key in ("vertices", "triangles", "labels", "edges", "num_edges",
+                "num_vertices", "num_triangles"):
+      self.assertAllEqual(preprocessed[key], raw[key])
+    self.assertAllClose(preprocessed["edge_weights"], raw["edge_weights"])
+    self.assertAllEqual(preprocessed["kring_edges"][0], kring_edges)
+    self.assertAllClose(preprocessed["kring_edge_weights"][0], kring_weights)
+
+  def test_create_dataset_from_raw_tfrecords_as_preprocessed_raised(self):
+    """Tests that raw records cannot be read as preprocessed records."""
+    filename = os.path.join(self.get_temp_dir(), "raw_mesh.tfrecords")
+    self._write_raw_tfrecords([_mesh()], filename)
+
+    with self.assertRaises(tf.errors.InvalidArgumentError):
+      self._first_batch(filename, preprocessed=True)
+
+
+class AdjacencyFromEdgesBenchmark(tf.test.Benchmark):
+  """Benchmarks the batched adjacency construction with and without reorder."""
+
+  def _benchmark(self, batch_size, max_num_vertices, reorder):
+    with tf.Graph().as_default(), tf.compat.v1.Session() as sess:
+      edges, weights, num_edges, num_vertices = _random_batch(
+          batch_size, max_num_vertices, 2 * max_num_vertices)
+      adjacency = dataio.adjacency_from_edges(
+          tf.constant(edges), tf.constant(weights), tf.constant(num_edges),
+          tf.constant(num_vertices), reorder=reorder)
+      self.run_op_benchmark(
+          sess,
+          adjacency,
+          min_iters=10,
+          name="adjacency_from_edges_%s_B%d_V%d" %
+          ("reorder" if reorder else "canonical", batch_size,
+           max_num_vertices),
+          extras={"num_edges": int(np.sum(num_edges))})
+
+  def benchmark_adjacency_from_edges(self):
+    for batch_size, max_num_vertices in ((8, 5000), (8, 50000), (32, 5000)):
+      for reorder in (True, False):
+        self._benchmark(batch_size, max_num_vertices, reorder)
+
+
+if __name__ == "__main__":
+  test_case.main()
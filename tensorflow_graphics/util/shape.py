@@ -132,7 +132,7 @@ def _get_dim(tensor, axis):
   if tf.executing_eagerly():
     return int(tf.shape(input=tensor).numpy()[axis])
   else:
-    return tensor.shape[axis].value
+    return tf.compat.v1.dimension_value(tensor.shape[axis])
 
 
 def check_static(tensor,
@@ -342,8 +342,11 @@ def compare_dimensions(tensors, axes, tensor_names=None):
   if tensor_names is None:
     tensor_names = _give_default_names(tensors, 'tensor')
   if not tf.executing_eagerly():
+    # tf.compat.v1.dimension_value supports both v1 and v2 tensor shapes, for
+    # instance in a tf.function.
     dimensions = [
-        int(tensor.shape[axis]) if tensor.shape[axis].value is not None else 1
+        1 if tf.compat.v1.dimension_value(tensor.shape[axis]) is None else
+        tf.compat.v1.dimension_value(tensor.shape[axis])
         for tensor, axis in zip(tensors, axes)
     ]
   else: